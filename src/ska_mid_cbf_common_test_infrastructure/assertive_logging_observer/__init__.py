@@ -9,6 +9,11 @@ test functionality for I&T test repositories so that functionality can be
 flexible to have fatal assertions for test code but be non-fatal for shared
 prototyping usage of code.
 
+Names backed by Tango (FilteredTangoEventTracer, ProcessEventCollector) are
+loaded lazily on first access so that importing this service for basic
+observations with use_event_tracer=False does not import PyTango,
+ska-tango-base or ska-tango-testing.
+
 API documentation is available at https://developer.skao.int/projects/ska-mid-cbf-common-test-infrastructure/en/latest/assertive_logging_observer/assertive_logging_observer.html  # noqa: E501 pylint: disable=line-too-long
 """
 
@@ -16,3 +21,60 @@ from .assertive_logging_observer import (  # noqa: F401
     AssertiveLoggingObserver,
     AssertiveLoggingObserverMode,
 )
+from .attribute_poller import AttributePoller, PollTarget  # noqa: F401
+from .event_filters import EventFilter, EventFilterRegistry  # noqa: F401
+from .event_store import EventRecord, EventStore  # noqa: F401
+from .golden_files import GoldenComparison, compare_golden  # noqa: F401
+from .json_schemas import (  # noqa: F401
+    DEFAULT_SCHEMA_DIR,
+    SchemaRegistry,
+    default_schema_registry,
+)
+from .lrc_progress import (  # noqa: F401
+    LRC_FAILED_STATUSES,
+    LrcProgress,
+    device_timing,
+    lrc_submitted_sec,
+)
+from .observation_coalescer import (  # noqa: F401
+    CoalescedObservation,
+    ObservationCoalescer,
+)
+from .observation_expressions import (  # noqa: F401
+    ObservationExpression,
+    all_of,
+    any_of,
+    change_event,
+    not_within,
+)
+from .observation_hooks import (  # noqa: F401
+    ObservationContext,
+    ObservationHook,
+)
+from .observation_plan import (  # noqa: F401
+    PLAN_SCHEMA,
+    ObservationPlan,
+    load_observation_plan,
+)
+from .timeout_policy import TimeoutPolicy  # noqa: F401
+from .trace_recorder import ChromeTraceRecorder  # noqa: F401
+
+_LAZY_IMPORTS = {
+    "FilteredTangoEventTracer": ".filtered_event_tracer",
+    "ProcessEventCollector": ".event_collector",
+}
+
+
+def __getattr__(name: str):
+    """Import Tango backed names of _LAZY_IMPORTS on first access."""
+    if name in _LAZY_IMPORTS:
+        from importlib import import_module
+
+        value = getattr(import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
@@ -1,16 +1,47 @@
 """
 Code for the AssertiveLoggingObserver which allows optional assertion or only
 reporting of observations within test functionality.
+
+Tango dependencies are only imported when an event tracer is used, so that
+the observer can be imported and used for basic observations without loading
+PyTango, ska-tango-base or ska-tango-testing.
 """
 from __future__ import annotations
 
 import logging
+import threading
+import time
+from datetime import datetime
 from enum import Enum
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional
+
+from assertpy import fail
+
+from .attribute_poller import AttributePoller, PollTarget
+from .golden_files import (
+    DEFAULT_CHUNK_BYTES,
+    GoldenSource,
+    compare_golden,
+    describe_source,
+)
+from .json_schemas import (
+    SchemaRegistry,
+    default_schema_registry,
+    parse_json_value,
+)
+from .lrc_progress import LrcProgress
+from .observation_coalescer import ObservationCoalescer
+from .observation_expressions import ObservationExpression, evaluate
+from .observation_hooks import ObservationContext, ObservationHook
 
-from assertpy import assert_that, fail
-from ska_tango_base.base.base_device import DevVarLongStringArrayType
-from ska_tango_testing.integration import TangoEventTracer
+if TYPE_CHECKING:
+    from ska_tango_base.base.base_device import DevVarLongStringArrayType
+
+    from .event_filters import EventFilter
+    from .event_store import EventRecord
+    from .observation_plan import ObservationPlan
+    from .timeout_policy import TimeoutPolicy
+    from .trace_recorder import ChromeTraceRecorder
 
 
 class AssertiveLoggingObserverMode(Enum):
@@ -37,6 +68,11 @@ class AssertiveLoggingObserver:
     - if in mode AssertiveLoggingObserverMode.ASSERTING report and assert on
       observations
 
+    Observations may be made concurrently from many threads, e.g. one per
+    subarray, and only share the thread safe event store of the event
+    tracer. Subscribing, clearing events and adding hooks are serialized by
+    a lock. Close the observer with close, or use it as a context manager,
+    to unsubscribe and release its event tracer.
     """
 
     def __init__(
@@ -44,17 +80,81 @@ class AssertiveLoggingObserver:
         mode: AssertiveLoggingObserverMode,
         logger: logging.Logger,
         use_event_tracer: bool = True,
+        isolate_event_collection: bool = False,
+        trace_recorder: Optional[ChromeTraceRecorder] = None,
+        coalesce_max_entries: Optional[int] = None,
+        schema_registry: Optional[SchemaRegistry] = None,
+        dev_factory: Optional[Callable[[str], Any]] = None,
+        timeout_policy: Optional[TimeoutPolicy] = None,
     ):
         """
         Initialize a AssertiveLoggingObserver instance.
 
         :param mode: behavior mode for observations.
         :param logger: logger to log observations to.
-        :param use_event_tracer: whether to assosiciate a TangoEventTracer to
-            ALO or not.
+        :param use_event_tracer: whether to assosiciate a
+            FilteredTangoEventTracer to ALO or not.
+        :param isolate_event_collection: if using an event tracer, whether to
+            subscribe to and collect events in a separate process with a
+            ProcessEventCollector instead of a FilteredTangoEventTracer,
+            keeping event callbacks under heavy event load from contending
+            with test code for the GIL.
+        :param trace_recorder: optional ChromeTraceRecorder to record a
+            timeline of observations, change events received by the
+            event_tracer and long running commands to, added as a hook.
+        :param coalesce_max_entries: if given, repeated identical
+            observation log messages are collapsed into one summary line
+            with a repeat count by an ObservationCoalescer tracking at most
+            this many distinct observations.
+        :param schema_registry: SchemaRegistry of JSON schemas to observe
+            JSON values against, by default the registry of the CTI data
+            directory schemas shared by all observers.
+        :param dev_factory: callable making a device proxy from a device
+            name for polling observations, tango.DeviceProxy by default.
+        :param timeout_policy: optional TimeoutPolicy choosing the timeouts
+            of observe_device_attr_change and observe_lrc_ok instead of the
+            timeouts given to them, e.g. an AdaptiveTimeoutPolicy of the
+            latency_history service.
         """
         self.logger = logger
-        self.event_tracer = TangoEventTracer() if use_event_tracer else None
+        # Serializes changes of subscriptions, hooks and lifecycle, which
+        # observations do not take
+        self._lock = threading.RLock()
+        self._closed = False
+        self.schema_registry = (
+            schema_registry
+            if schema_registry is not None
+            else default_schema_registry
+        )
+        self.observation_coalescer = (
+            ObservationCoalescer(logger, coalesce_max_entries)
+            if coalesce_max_entries is not None
+            else None
+        )
+        # Hooks are replaced rather than mutated, so observations can iterate
+        # them without a lock
+        self._hooks: tuple[ObservationHook, ...] = ()
+        self.trace_recorder = trace_recorder
+        if trace_recorder is not None:
+            self.add_hook(trace_recorder)
+        self._dev_factory = dev_factory
+        self.timeout_policy = timeout_policy
+        self._attribute_poller: Optional[AttributePoller] = None
+        self.event_tracer = None
+        if use_event_tracer:
+            # Deferred import of tango dependencies, see module docstring
+            if isolate_event_collection:
+                from .event_collector import ProcessEventCollector
+
+                self.event_tracer = ProcessEventCollector()
+            else:
+                from .filtered_event_tracer import FilteredTangoEventTracer
+
+                self.event_tracer = FilteredTangoEventTracer()
+            if trace_recorder is not None:
+                self.event_tracer.add_event_listener(
+                    trace_recorder.record_change_event
+                )
         self.mode = mode
         if self.mode == AssertiveLoggingObserverMode.ASSERTING:
             logger.info(
@@ -67,12 +167,45 @@ class AssertiveLoggingObserver:
                 f"{AssertiveLoggingObserverMode.REPORTING}"
             )
 
-    def __del__(self: AssertiveLoggingObserver):
-        if self.event_tracer is not None:
-            self.reset_event_tracer()
+    def __enter__(
+        self: AssertiveLoggingObserver,
+    ) -> AssertiveLoggingObserver:
+        return self
+
+    def __exit__(self: AssertiveLoggingObserver, *exc_info):
+        self.close()
+
+    @property
+    def closed(self: AssertiveLoggingObserver) -> bool:
+        """Whether the observer has been closed."""
+        return self._closed
+
+    def close(self: AssertiveLoggingObserver):
+        """
+        Flush coalesced observations, cancel ongoing polls and unsubscribe
+        and close the event tracer. Closing a closed observer does nothing.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self.observation_coalescer is not None:
+                self.observation_coalescer.flush()
+            if self._attribute_poller is not None:
+                self._attribute_poller.cancel()
+            if self.event_tracer is not None:
+                self.event_tracer.clear_events()
+                self.event_tracer.unsubscribe_all()
+                if hasattr(self.event_tracer, "close"):
+                    self.event_tracer.close()
 
     def _check_event_tracer(self: AssertiveLoggingObserver):
-        """Checks if event_tracer exists and throws RuntimeError if not."""
+        """
+        Checks if event_tracer exists and throws RuntimeError if not, or if
+        the observer is closed.
+        """
+        if self._closed:
+            raise RuntimeError("AssertiveLoggingObserver is closed")
         if self.event_tracer is None:
             raise RuntimeError(
                 "No event_tracer associated with AssertiveLoggingObserver"
@@ -82,31 +215,92 @@ class AssertiveLoggingObserver:
         self: AssertiveLoggingObserver,
         device_name: str,
         attr_name: str,
+        event_filter: Optional[EventFilter] = None,
     ):
         """
         Subscribe event tracer to given attr_name for given device_name.
+        Optionally only store events accepted by event_filter, dropping (and
+        counting) all other events for the attribute before they are stored,
+        which keeps tracer memory and matching cost down for high rate
+        attributes.
 
         :param device_name: name of device to track attribute of
         :param attr_name: attribute to track events for
+        :param event_filter: optional predicate on the event attribute value
+            or collection of attribute values of events to store, if None all
+            events are stored.
+        """
+        with self._lock:
+            self._check_event_tracer()
+            if event_filter is None:
+                self.logger.info(
+                    f"ALO event_tracer subscribed to {device_name}: "
+                    f"{attr_name}"
+                )
+            else:
+                self.logger.info(
+                    f"ALO event_tracer subscribed to {device_name}: "
+                    f"{attr_name} with event filter: {event_filter}"
+                )
+            self.event_tracer.subscribe_event(
+                device_name, attr_name, event_filter=event_filter
+            )
+
+    def dropped_event_count(
+        self: AssertiveLoggingObserver,
+        device_name: Optional[str] = None,
+        attr_name: Optional[str] = None,
+    ) -> int:
+        """
+        Number of events dropped by subscription event filters since the last
+        clear_events, optionally restricted to a device and/or attribute.
+
+        :param device_name: optional name of device to count dropped events
+            for.
+        :param attr_name: optional attribute to count dropped events for.
+        :returns: number of dropped events.
+        :raises RuntimeError: error if use method with no event_tracer.
         """
         self._check_event_tracer()
-        self.logger.info(
-            f"ALO event_tracer subscribed to {device_name}: {attr_name}"
-        )
-        self.event_tracer.subscribe_event(device_name, attr_name)
+        dropped_count = 0
+        for (
+            dropped_device,
+            dropped_attr,
+        ), count in self.event_tracer.dropped_events.items():
+            if (
+                device_name is not None
+                and dropped_device != device_name.lower()
+            ):
+                continue
+            if attr_name is not None and dropped_attr != attr_name.lower():
+                continue
+            dropped_count += count
+        return dropped_count
 
-    def clear_events(self: AssertiveLoggingObserver):
+    def clear_events(
+        self: AssertiveLoggingObserver,
+        device_names: Optional[Iterable[str]] = None,
+    ):
         """
-        Clear events in event_tracer.
+        Clear events in event_tracer, of all devices or only of device_names
+        so that threads observing other devices keep their events.
+
+        :param device_names: optional names of devices to clear events of.
         """
-        self.event_tracer.clear_events()
+        with self._lock:
+            self._check_event_tracer()
+            if device_names is None:
+                self.event_tracer.clear_events()
+            else:
+                self.event_tracer.clear_events(device_names)
 
     def reset_event_tracer(self: AssertiveLoggingObserver):
         """
         Reset event_tracer back to original state.
         """
-        self.clear_events()
-        self.event_tracer.unsubscribe_all()
+        with self._lock:
+            self.clear_events()
+            self.event_tracer.unsubscribe_all()
 
     def _log_pass(
         self: AssertiveLoggingObserver, function_name: str, result: str
@@ -114,10 +308,14 @@ class AssertiveLoggingObserver:
         """
         Log message of PASS observation to logger.
         """
-        self.logger.info(
+        message = (
             f"PASS: AssertiveLoggingObserver.{function_name} "
             f"observed: {result}"
         )
+        if self.observation_coalescer is None or (
+            self.observation_coalescer.should_log(logging.INFO, message)
+        ):
+            self.logger.info(message)
 
     def _log_fail(
         self: AssertiveLoggingObserver, function_name: str, result: str
@@ -125,10 +323,75 @@ class AssertiveLoggingObserver:
         """
         Log message of FAIL observation to logger.
         """
-        self.logger.error(
+        message = (
             f"FAIL: AssertiveLoggingObserver.{function_name} "
             f"observed: {result}"
         )
+        if self.observation_coalescer is None or (
+            self.observation_coalescer.should_log(logging.ERROR, message)
+        ):
+            self.logger.error(message)
+
+    def add_hook(self: AssertiveLoggingObserver, hook: ObservationHook):
+        """
+        Add hook to be called around observations, e.g. a profiler or
+        metrics exporter. Observations made while no hooks are added skip
+        all hook dispatch.
+
+        :param hook: ObservationHook to add.
+        """
+        with self._lock:
+            self._hooks = self._hooks + (hook,)
+
+    def remove_hook(self: AssertiveLoggingObserver, hook: ObservationHook):
+        """
+        Remove hook added with add_hook.
+
+        :param hook: ObservationHook to remove.
+        :raises ValueError: if hook was not added.
+        """
+        with self._lock:
+            if hook not in self._hooks:
+                raise ValueError(f"{hook!r} is not a hook of this observer")
+            self._hooks = tuple(
+                added for added in self._hooks if added is not hook
+            )
+
+    def _start_observation(
+        self: AssertiveLoggingObserver, function_name: str, **args: Any
+    ) -> Optional[ObservationContext]:
+        """
+        Start observation function_name for hooks.
+
+        :returns: context of the observation, None if there are no hooks.
+        """
+        hooks = self._hooks
+        if not hooks:
+            return None
+        context = ObservationContext(function_name, time.time(), args, hooks)
+        for hook in hooks:
+            hook.on_observation_start(context)
+        return context
+
+    @staticmethod
+    def _event_matched(
+        context: Optional[ObservationContext], record: Optional[EventRecord]
+    ):
+        """Notify hooks of observation context of matched record."""
+        if context is None or record is None:
+            return
+        for hook in context.hooks:
+            hook.on_event_matched(context, record)
+
+    @staticmethod
+    def _end_observation(context: Optional[ObservationContext], passed: bool):
+        """End observation of context for hooks with result passed."""
+        if context is None:
+            return
+        context.end_sec = time.time()
+        context.passed = passed
+        for hook in context.hooks:
+            hook.on_observation_end(context)
 
     def observe_true(self: AssertiveLoggingObserver, test_bool: bool):
         """
@@ -136,6 +399,9 @@ class AssertiveLoggingObserver:
 
         :param test_bool: bool to observe if is True.
         """
+        self._end_observation(
+            self._start_observation("observe_true"), bool(test_bool)
+        )
         if test_bool:
             self._log_pass("observe_true", test_bool)
         else:
@@ -149,6 +415,9 @@ class AssertiveLoggingObserver:
 
         :param test_bool: bool to observe if is False.
         """
+        self._end_observation(
+            self._start_observation("observe_false"), not test_bool
+        )
         if not test_bool:
             self._log_pass("observe_false", test_bool)
         else:
@@ -165,13 +434,218 @@ class AssertiveLoggingObserver:
         :param test_val1: first value to observe if is equal to test_val2.
         :param test_val2: second value to observe if is equal to test_val1.
         """
-        if test_val1 == test_val2:
+        equal = test_val1 == test_val2
+        self._end_observation(
+            self._start_observation("observe_equality"), equal
+        )
+        if equal:
             self._log_pass("observe_equality", f"{test_val1} == {test_val2}")
         else:
             self._log_fail("observe_equality", f"{test_val1} =/= {test_val2}")
             if self.mode == AssertiveLoggingObserverMode.ASSERTING:
                 fail()
 
+    @staticmethod
+    def _json_schema_error(validator: Any, value: Any) -> Optional[str]:
+        """
+        Validate JSON value with validator, only collecting errors of invalid
+        values so validating valid values stays cheap.
+
+        :returns: description of the best matching error, None if valid.
+        """
+        try:
+            instance = parse_json_value(value)
+        except ValueError as exception:
+            return f"invalid JSON: {exception}"
+        if validator.is_valid(instance):
+            return None
+
+        from jsonschema.exceptions import best_match
+
+        error = best_match(validator.iter_errors(instance))
+        return f"{error.message} at {error.json_path}"
+
+    def observe_json_schema(
+        self: AssertiveLoggingObserver,
+        value: Any,
+        schema_id: str,
+        version: Optional[str] = None,
+    ):
+        """
+        Observes JSON value is valid against schema schema_id of given
+        version in schema_registry, e.g. a JSON valued attribute or LRC
+        argument. The schema is compiled once and reused by later
+        observations.
+
+        :param value: JSON string or bytes, or already parsed value.
+        :param schema_id: ID of schema in schema_registry.
+        :param version: version of schema, None for an unversioned schema.
+        :raises FileNotFoundError: if the schema does not exist.
+        """
+        schema_name = (
+            schema_id if version is None else f"{schema_id}/{version}"
+        )
+        context = self._start_observation(
+            "observe_json_schema", schema=schema_name
+        )
+        validator = self.schema_registry.validator(schema_id, version)
+        error = self._json_schema_error(validator, value)
+        self._end_observation(context, error is None)
+        if error is None:
+            self._log_pass(
+                "observe_json_schema", f"value valid against {schema_name}"
+            )
+        else:
+            self._log_fail(
+                "observe_json_schema",
+                f"value invalid against {schema_name}: {error}",
+            )
+            if self.mode == AssertiveLoggingObserverMode.ASSERTING:
+                fail(f"value invalid against {schema_name}: {error}")
+
+    def observe_json_schema_bulk(
+        self: AssertiveLoggingObserver,
+        values: Iterable[Any],
+        schema_id: str,
+        version: Optional[str] = None,
+        max_reported_errors: int = 5,
+    ):
+        """
+        Observes all JSON values are valid against schema schema_id of given
+        version in schema_registry as a single observation, e.g. every delay
+        model update of a scan. Errors of at most max_reported_errors invalid
+        values are reported.
+
+        :param values: JSON strings or bytes, or already parsed values.
+        :param schema_id: ID of schema in schema_registry.
+        :param version: version of schema, None for an unversioned schema.
+        :param max_reported_errors: maximum number of invalid values to
+            report errors of.
+        :raises FileNotFoundError: if the schema does not exist.
+        """
+        schema_name = (
+            schema_id if version is None else f"{schema_id}/{version}"
+        )
+        context = self._start_observation(
+            "observe_json_schema_bulk", schema=schema_name
+        )
+        validator = self.schema_registry.validator(schema_id, version)
+        count = 0
+        invalid = 0
+        errors = []
+        for index, value in enumerate(values):
+            count += 1
+            error = self._json_schema_error(validator, value)
+            if error is not None:
+                invalid += 1
+                if len(errors) < max_reported_errors:
+                    errors.append(f"[{index}] {error}")
+
+        if context is not None:
+            context.args["count"] = count
+        self._end_observation(context, invalid == 0)
+        if invalid == 0:
+            self._log_pass(
+                "observe_json_schema_bulk",
+                f"{count} values valid against {schema_name}",
+            )
+        else:
+            result = (
+                f"{invalid} of {count} values invalid against "
+                f"{schema_name}: {'; '.join(errors)}"
+            )
+            self._log_fail("observe_json_schema_bulk", result)
+            if self.mode == AssertiveLoggingObserverMode.ASSERTING:
+                fail(result)
+
+    def observe_golden_file(
+        self: AssertiveLoggingObserver,
+        actual: GoldenSource,
+        golden: GoldenSource,
+        dtype: Any = None,
+        rtol: float = 0.0,
+        atol: float = 0.0,
+        golden_sha256: Optional[str] = None,
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+        max_reported_diffs: int = 10,
+    ):
+        """
+        Observes data product actual matches golden reference output golden,
+        e.g. a visibility dump captured from the correlator, comparing them
+        chunk by chunk in constant memory so that multi-GB products can be
+        verified. Comparison stops at the first divergent chunk, of which at
+        most max_reported_diffs differences are reported.
+
+        :param actual: file path, bytes-like object or binary stream of the
+            data product to check.
+        :param golden: file path, bytes-like object or binary stream of the
+            golden reference, e.g. a test_data DataStore view.
+        :param dtype: optional NumPy dtype to compare elements of within
+            rtol and atol instead of comparing bytes.
+        :param rtol: relative tolerance of element comparison.
+        :param atol: absolute tolerance of element comparison.
+        :param golden_sha256: optional hex SHA-256 digest of golden, if
+            given actual is hashed first and golden only read on mismatch.
+        :param chunk_bytes: bytes to compare at a time.
+        :param max_reported_diffs: maximum number of differences to report.
+        """
+        observed = (
+            f"{describe_source(actual)} vs golden {describe_source(golden)}"
+        )
+        context = self._start_observation(
+            "observe_golden_file",
+            actual=describe_source(actual),
+            golden=describe_source(golden),
+        )
+        comparison = compare_golden(
+            actual,
+            golden,
+            dtype=dtype,
+            rtol=rtol,
+            atol=atol,
+            golden_sha256=golden_sha256,
+            chunk_bytes=chunk_bytes,
+            max_reported_diffs=max_reported_diffs,
+        )
+        if context is not None:
+            context.args["bytes_compared"] = comparison.bytes_compared
+        self._end_observation(context, comparison.equal)
+        if comparison.equal:
+            matched = (
+                "sha256 matches golden"
+                if comparison.hash_matched
+                else f"{comparison.bytes_compared} bytes match"
+            )
+            self._log_pass("observe_golden_file", f"{observed}: {matched}")
+        else:
+            result = f"{observed}: {comparison.report}"
+            self._log_fail("observe_golden_file", result)
+            if self.mode == AssertiveLoggingObserverMode.ASSERTING:
+                fail(result)
+
+    def _choose_timeout(
+        self: AssertiveLoggingObserver,
+        observation: str,
+        device_name: str,
+        key: str,
+        timeout_sec: float,
+    ) -> float:
+        """
+        Choose timeout of observation with timeout_policy if there is one,
+        logging the chosen timeout.
+        """
+        if self.timeout_policy is None:
+            return timeout_sec
+        chosen_sec = self.timeout_policy.timeout_sec(
+            observation, device_name, key, timeout_sec
+        )
+        self.logger.info(
+            f"AssertiveLoggingObserver.{observation} timeout for "
+            f"{device_name} {key}: {chosen_sec:.3f}s "
+            f"(given {timeout_sec}s)"
+        )
+        return chosen_sec
+
     def observe_device_attr_change(
         self: AssertiveLoggingObserver,
         device_name: str,
@@ -193,39 +667,50 @@ class AssertiveLoggingObserver:
         :param target_attr_val: attribute value of new attr for
             target_attr_name to change to.
         :param timeout_attr_change_sec: maximum timeout to wait for attr
-            change (seconds).
+            change (seconds), passed to timeout_policy if there is one.
         :raises RuntimeError: error if use method with no event_tracer.
         """
         self._check_event_tracer()
+        timeout_attr_change_sec = self._choose_timeout(
+            "observe_device_attr_change",
+            device_name,
+            target_attr_name,
+            timeout_attr_change_sec,
+        )
+        context = self._start_observation(
+            "observe_device_attr_change",
+            device=device_name,
+            attr=target_attr_name,
+            target_attr_val=target_attr_val,
+            timeout_sec=timeout_attr_change_sec,
+        )
 
-        try:
-
-            assert_that(self.event_tracer).within_timeout(
-                timeout_attr_change_sec
-            ).has_change_event_occurred(
-                device_name=device_name,
-                attribute_name=target_attr_name,
-                attribute_value=target_attr_val,
-            )
+        record = self.event_tracer.store.wait_for_change_event(
+            device_name,
+            target_attr_name,
+            target_attr_val,
+            timeout_attr_change_sec,
+        )
+        captured = record is not None
+        self._event_matched(context, record)
+        self._end_observation(context, captured)
+        observed = (
+            f"(device: {device_name} | "
+            f"state_name: {target_attr_name} | "
+            f"target_attr_val: {target_attr_val} | "
+            f"within timeout: {timeout_attr_change_sec}s)"
+        )
+        if captured:
             self._log_pass(
                 "observe_device_attr_change",
-                f"successfully captured (device: {device_name} | "
-                f"state_name: {target_attr_name} | "
-                f"target_attr_val: {target_attr_val} | "
-                f"within timeout: {timeout_attr_change_sec}s)",
+                f"successfully captured {observed}",
             )
-
-        except AssertionError as exception:
-
+        else:
             self._log_fail(
-                "observe_device_attr_change",
-                f"did not capture (device: {device_name} | "
-                f"state_name: {target_attr_name} | "
-                f"target_attr_val: {target_attr_val} | "
-                f"within timeout: {timeout_attr_change_sec}s)",
+                "observe_device_attr_change", f"did not capture {observed}"
             )
             if self.mode == AssertiveLoggingObserverMode.ASSERTING:
-                raise exception
+                fail(f"observe_device_attr_change did not capture {observed}")
 
     def observe_lrc_ok(
         self: AssertiveLoggingObserver,
@@ -233,6 +718,7 @@ class AssertiveLoggingObserver:
         lrc_cmd_result: DevVarLongStringArrayType,
         lrc_cmd_name: str,
         timeout_lrc_sec: float,
+        stall_timeout_sec: Optional[float] = None,
     ):
         """
         Observes longRunningCommandResult results in
@@ -242,8 +728,17 @@ class AssertiveLoggingObserver:
         otherwise. Long running command (LRC) concept can be found at
         https://developer.skao.int/projects/ska-tango-base/en/latest/concepts/long-running-commands.html.
 
+        Changes of longRunningCommandProgress and longRunningCommandStatus
+        of the command received by the event_tracer are logged as progress
+        milestones. The observation FAILs early if the command completed with
+        a result other than OK, if the command status shows it failed, or, if
+        stall_timeout_sec is given, if neither progress nor status of the
+        command changed within stall_timeout_sec.
+
         REQUIRES: for success requires the event_tracer is set and is
-        subscribed to device_name for longRunningCommandResult.
+        subscribed to device_name for longRunningCommandResult, and for
+        progress tracking and stall detection for longRunningCommandProgress
+        and longRunningCommandStatus.
 
         :param device_name: FQDN of device to observe longRunningCommandResult
             from.
@@ -251,43 +746,353 @@ class AssertiveLoggingObserver:
             second item in iterable.
         :param lrc_cmd_name: basic command name of LRC.
         :param timeout_lrc_sec: maximum timeout to wait for successful
-            longRunningCommandResult (seconds).
+            longRunningCommandResult (seconds), passed to timeout_policy if
+            there is one.
+        :param stall_timeout_sec: optional maximum time without a change of
+            progress or status of the command (seconds).
         :raises RuntimeError: error if use method with no event_tracer.
         """
         self._check_event_tracer()
+        command_id = lrc_cmd_result[1][0]
+        timeout_lrc_sec = self._choose_timeout(
+            "observe_lrc_ok", device_name, lrc_cmd_name, timeout_lrc_sec
+        )
+        context = self._start_observation(
+            "observe_lrc_ok",
+            device=device_name,
+            command=lrc_cmd_name,
+            command_id=lrc_cmd_result[1][0],
+            timeout_sec=timeout_lrc_sec,
+        )
 
-        try:
+        progress = LrcProgress(device_name, f"{command_id}")
+        record, reason = self._wait_for_lrc_result(
+            device_name,
+            (f"{command_id}", f'[0, "{lrc_cmd_name} completed OK"]'),
+            progress,
+            timeout_lrc_sec,
+            stall_timeout_sec,
+        )
+        captured = record is not None
+        self._event_matched(context, record)
+        self._end_observation(context, captured)
+        observed = (
+            f"(device: {device_name} | "
+            f"LRC_command: {command_id} | "
+            f"result: "
+            f'[0, "{lrc_cmd_name} completed OK"]'
+            " | "
+            f"within timeout: {timeout_lrc_sec}s)"
+        )
 
-            assert_that(self.event_tracer).within_timeout(
-                timeout_lrc_sec
-            ).has_change_event_occurred(
-                device_name=device_name,
-                attribute_name="longRunningCommandResult",
-                attribute_value=(
-                    f"{lrc_cmd_result[1][0]}",
-                    f'[0, "{lrc_cmd_name} completed OK"]',
-                ),
-            )
+        if captured:
             self._log_pass(
-                "observe_lrc_ok",
-                f"successfully captured (device: {device_name} | "
-                f"LRC_command: {lrc_cmd_result[1][0]} | "
-                f"result: "
-                f'[0, "{lrc_cmd_name} completed OK"]'
-                " | "
-                f"within timeout: {timeout_lrc_sec}s)",
+                "observe_lrc_ok", f"successfully captured {observed}"
             )
+        else:
+            failure = f"{observed}, {reason} ({progress.describe()})"
+            self._log_fail("observe_lrc_ok", f"did not capture {failure}")
+            if self.mode == AssertiveLoggingObserverMode.ASSERTING:
+                fail(f"observe_lrc_ok did not capture {failure}")
+
+    def _wait_for_lrc_result(
+        self: AssertiveLoggingObserver,
+        device_name: str,
+        result: tuple[str, str],
+        progress: LrcProgress,
+        timeout_sec: float,
+        stall_timeout_sec: Optional[float],
+    ) -> tuple[Optional[EventRecord], str]:
+        """
+        Wait for longRunningCommandResult result of device_name, tracking
+        and logging progress of the LRC, see observe_lrc_ok.
+
+        :returns: matching result record, or None and the reason it was not
+            received.
+        """
+        start = time.monotonic()
+        deadline = start + timeout_sec
+        last_change = start
+        cursor = self.event_tracer.store.cursor()
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                return None, "timed out"
+            wait_until = deadline
+            if stall_timeout_sec is not None:
+                if now - last_change >= stall_timeout_sec:
+                    return None, (
+                        f"stalled without progress for {stall_timeout_sec}s"
+                    )
+                wait_until = min(deadline, last_change + stall_timeout_sec)
 
-        except AssertionError as exception:
+            for record in cursor.next_records(wait_until - now):
+                if record.matches(
+                    device_name, "longRunningCommandResult", result
+                ):
+                    return record, ""
+                # Any other result of the command is decisive too
+                other_result = progress.result_of(record)
+                if other_result is not None:
+                    return None, f"completed with result {other_result}"
+                milestone = progress.update(record)
+                if milestone is None:
+                    continue
+                last_change = time.monotonic()
+                reception_time, attr_name, value = milestone
+                self.logger.info(
+                    f"AssertiveLoggingObserver.observe_lrc_ok LRC "
+                    f"{progress.command_id} {attr_name}: {value} at "
+                    f"{datetime.fromtimestamp(reception_time).isoformat()}"
+                )
+                if progress.failed:
+                    return None, f"failed with status {progress.status}"
 
-            self._log_fail(
-                "observe_lrc_ok",
-                f"did not capture (device: {device_name} | "
-                f"LRC_command: {lrc_cmd_result[1][0]} | "
-                f"result: "
-                f'[0, "{lrc_cmd_name} completed OK"]'
-                " | "
-                f"within timeout: {timeout_lrc_sec}s)",
-            )
+    def observe_expression(
+        self: AssertiveLoggingObserver,
+        expression: ObservationExpression,
+        timeout_sec: float,
+    ) -> Optional[EventRecord]:
+        """
+        Observes expression of change events, see observation_expressions,
+        becoming true within a timeout of timeout_sec seconds shared by all
+        its subexpressions. The expression is matched incrementally against
+        events already stored and then events as they arrive, and the
+        observation finishes as soon as the expression is decided, e.g. on
+        the first of READY or FAULT of any_of, or on FAULT of a not_within
+        operand of all_of. PASS behavior is the expression is true, and FAIL
+        otherwise.
+
+        REQUIRES: for success requires the event_tracer is set and is
+        subscribed to the attributes of the expression.
+
+        :param expression: expression built with change_event, any_of,
+            all_of and not_within.
+        :param timeout_sec: maximum time to wait for the expression to be
+            decided (seconds).
+        :returns: change event which decided the expression, None if it was
+            decided at the timeout.
+        :raises RuntimeError: error if use method with no event_tracer.
+        """
+        self._check_event_tracer()
+        context = self._start_observation(
+            "observe_expression", expression=expression.describe()
+        )
+        passed, record = evaluate(
+            expression, self.event_tracer.store.cursor(), timeout_sec
+        )
+        self._event_matched(context, record)
+        self._end_observation(context, passed)
+
+        observed = (
+            f"({expression.describe()} | "
+            f"decided by: {record if record is not None else 'timeout'} | "
+            f"within timeout: {timeout_sec}s)"
+        )
+        if passed:
+            self._log_pass("observe_expression", f"true {observed}")
+        else:
+            self._log_fail("observe_expression", f"false {observed}")
             if self.mode == AssertiveLoggingObserverMode.ASSERTING:
-                raise exception
+                fail(f"observe_expression false {observed}")
+        return record
+
+    def subscribe_event_tracer_for_plan(
+        self: AssertiveLoggingObserver,
+        plan: ObservationPlan,
+        devices: dict[str, list[str]],
+    ):
+        """
+        Subscribe event tracer to all attributes with expectations in plan for
+        given devices, filtering events of sequence attributes to values in
+        their sequence.
+
+        :param plan: compiled observation plan, see load_observation_plan.
+        :param devices: device FQDNs per device class name in the plan.
+        :raises RuntimeError: error if use method with no event_tracer.
+        """
+        for device_class, device_names in devices.items():
+            event_filters = plan.device_classes[device_class].event_filters()
+            for device_name in device_names:
+                for attr_name, event_filter in event_filters.items():
+                    self.subscribe_event_tracer(
+                        device_name, attr_name, event_filter=event_filter
+                    )
+
+    def observe_plan(
+        self: AssertiveLoggingObserver,
+        plan: ObservationPlan,
+        devices: dict[str, list[str]],
+    ):
+        """
+        Observes all expectations of plan for given devices at once, each
+        within its timeout from the start of the observation. Events are
+        matched incrementally in a single pass as they arrive, and the
+        observation finishes as soon as every expectation is met or has timed
+        out. PASS or FAIL is logged per expectation, and in ASSERTING mode an
+        AssertionError is raised at the end if any expectation FAILed.
+
+        REQUIRES: for success requires the event_tracer is set and is
+        subscribed to the plan attributes of the devices, see
+        subscribe_event_tracer_for_plan.
+
+        :param plan: compiled observation plan, see load_observation_plan.
+        :param devices: device FQDNs per device class name in the plan.
+        :raises RuntimeError: error if use method with no event_tracer.
+        """
+        self._check_event_tracer()
+        start_sec = time.time()
+        start = time.monotonic()
+
+        expectations = plan.expectations(devices)
+        contexts = [
+            self._start_observation(
+                "observe_plan",
+                plan=plan.content_hash[:12],
+                expectation=expectation.describe(),
+            )
+            for expectation in expectations
+        ]
+        by_key: dict[tuple[str, str], list] = {}
+        for expectation in expectations:
+            by_key.setdefault(expectation.key, []).append(expectation)
+
+        cursor = self.event_tracer.store.cursor()
+        open_expectations = expectations
+        while True:
+            now = time.monotonic()
+            open_expectations = [
+                expectation
+                for expectation in open_expectations
+                if not expectation.satisfied
+                and now < start + expectation.timeout_sec
+            ]
+            if not open_expectations:
+                break
+            next_deadline = start + min(
+                expectation.timeout_sec for expectation in open_expectations
+            )
+            for record in cursor.next_records(next_deadline - now):
+                for expectation in by_key.get(
+                    (
+                        record.device_name.lower(),
+                        record.attribute_name.lower(),
+                    ),
+                    (),
+                ):
+                    if (
+                        record.reception_time
+                        <= start_sec + expectation.timeout_sec
+                    ):
+                        expectation.update(record)
+
+        failed = [
+            expectation
+            for expectation in expectations
+            if not expectation.satisfied
+        ]
+        for expectation, context in zip(expectations, contexts):
+            self._event_matched(context, expectation.matched_record)
+            self._end_observation(context, expectation.satisfied)
+            if expectation.satisfied:
+                self._log_pass(
+                    "observe_plan",
+                    f"successfully captured ({expectation.describe()})",
+                )
+            else:
+                self._log_fail(
+                    "observe_plan",
+                    f"did not capture ({expectation.describe()})",
+                )
+
+        if failed and self.mode == AssertiveLoggingObserverMode.ASSERTING:
+            fail(
+                f"observe_plan did not capture {len(failed)} of "
+                f"{len(expectations)} expectations"
+            )
+
+    @property
+    def attribute_poller(self: AssertiveLoggingObserver) -> AttributePoller:
+        """AttributePoller of polling observations, made on first use."""
+        with self._lock:
+            if self._attribute_poller is None:
+                self._attribute_poller = AttributePoller(self._dev_factory)
+            return self._attribute_poller
+
+    def observe_device_attr_values_polled(
+        self: AssertiveLoggingObserver,
+        targets: list[PollTarget],
+        timeout_sec: float,
+    ):
+        """
+        Observes attributes of devices reaching target values within a
+        timeout of timeout_sec seconds by polling, for attributes without
+        change events. All targets are polled together with one
+        read_attributes call per device per poll, at an interval backing
+        off exponentially, and polling stops as soon as all targets are
+        reached. PASS or FAIL is logged per target.
+
+        :param targets: (device_name, attr_name, attr_val) targets to
+            observe.
+        :param timeout_sec: maximum time to poll for targets (seconds).
+        """
+        contexts = [
+            self._start_observation(
+                "observe_device_attr_values_polled",
+                device=device_name,
+                attr=attr_name,
+                target_attr_val=attr_val,
+            )
+            for device_name, attr_name, attr_val in targets
+        ]
+        results = self.attribute_poller.poll(targets, timeout_sec)
+
+        failed = 0
+        for (device_name, attr_name, attr_val), result, context in zip(
+            targets, results, contexts
+        ):
+            self._end_observation(context, result is None)
+            observed = (
+                f"(device: {device_name} | "
+                f"attr: {attr_name} | "
+                f"target_attr_val: {attr_val} | "
+                f"within timeout: {timeout_sec}s)"
+            )
+            if result is None:
+                self._log_pass(
+                    "observe_device_attr_values_polled",
+                    f"successfully polled {observed}",
+                )
+            else:
+                failed += 1
+                self._log_fail(
+                    "observe_device_attr_values_polled",
+                    f"did not poll {observed}, {result}",
+                )
+
+        if failed and self.mode == AssertiveLoggingObserverMode.ASSERTING:
+            fail(
+                f"observe_device_attr_values_polled did not poll {failed} of "
+                f"{len(targets)} targets"
+            )
+
+    def observe_device_attr_value_polled(
+        self: AssertiveLoggingObserver,
+        device_name: str,
+        target_attr_name: str,
+        target_attr_val: Any,
+        timeout_sec: float,
+    ):
+        """
+        Observes attr target_attr_name of device FQDN device_name reaching
+        target_attr_val within a timeout of timeout_sec seconds by polling,
+        see observe_device_attr_values_polled.
+
+        :param device_name: FQDN of device to poll attr of.
+        :param target_attr_name: attribute name of attr to poll.
+        :param target_attr_val: attribute value to poll for.
+        :param timeout_sec: maximum time to poll for value (seconds).
+        """
+        self.observe_device_attr_values_polled(
+            [(device_name, target_attr_name, target_attr_val)], timeout_sec
+        )
@@ -0,0 +1,161 @@
+"""
+Code for the AttributePoller which polls device attributes that have no
+change events configured, for AssertiveLoggingObserver polling observations.
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from .event_store import values_equal
+
+PollTarget = tuple[str, str, Any]
+"""Polled (device_name, attribute_name, attribute_value) to wait for."""
+
+
+class AttributePoller:
+    """
+    Poller of device attributes waiting for targets to reach their values.
+    Each round reads all attributes still awaited with one read_attributes
+    call per device, and rounds are spaced by an exponentially increasing
+    interval with random jitter, capped at max_interval_sec, so that slow
+    changes are not polled at a high rate and polls of concurrent tests do
+    not align.
+    """
+
+    def __init__(
+        self: AttributePoller,
+        dev_factory: Optional[Callable[[str], Any]] = None,
+        initial_interval_sec: float = 0.05,
+        max_interval_sec: float = 2.0,
+        backoff: float = 2.0,
+        jitter: float = 0.2,
+    ):
+        """
+        Initialize an AttributePoller instance.
+
+        :param dev_factory: callable making a device proxy from a device
+            name, tango.DeviceProxy by default.
+        :param initial_interval_sec: interval between the first poll rounds.
+        :param max_interval_sec: cap of the interval between poll rounds.
+        :param backoff: factor the interval grows by every round.
+        :param jitter: fraction of the interval randomly subtracted from it.
+        """
+        if dev_factory is None:
+            # Deferred import of tango, see assertive_logging_observer
+            from tango import DeviceProxy
+
+            dev_factory = DeviceProxy
+        self._dev_factory = dev_factory
+        self.initial_interval_sec = initial_interval_sec
+        self.max_interval_sec = max_interval_sec
+        self.backoff = backoff
+        self.jitter = jitter
+        self._proxies: dict[str, Any] = {}
+        self._lock = threading.Lock()
+        # Cancellation event of each ongoing poll, so that polls from
+        # several threads can be cancelled without racing on one event
+        self._polls: set[threading.Event] = set()
+
+    def _proxy(self: AttributePoller, device_name: str) -> Any:
+        """Get cached device proxy of device_name."""
+        with self._lock:
+            proxy = self._proxies.get(device_name)
+            if proxy is None:
+                proxy = self._proxies[device_name] = self._dev_factory(
+                    device_name
+                )
+            return proxy
+
+    def cancel(self: AttributePoller):
+        """Cancel ongoing polls, e.g. from another thread."""
+        with self._lock:
+            for cancelled in self._polls:
+                cancelled.set()
+
+    def poll(
+        self: AttributePoller,
+        targets: list[PollTarget],
+        timeout_sec: float,
+    ) -> list[Optional[str]]:
+        """
+        Poll until all targets have their value, timeout_sec passes or the
+        poll is cancelled.
+
+        :param targets: attributes and values to wait for.
+        :param timeout_sec: maximum time to poll (seconds).
+        :returns: for each target in order None if it reached its value,
+            else a description of its last read value or read error.
+        """
+        cancelled = threading.Event()
+        with self._lock:
+            self._polls.add(cancelled)
+        try:
+            return self._poll(targets, timeout_sec, cancelled)
+        finally:
+            with self._lock:
+                self._polls.discard(cancelled)
+
+    def _poll(
+        self: AttributePoller,
+        targets: list[PollTarget],
+        timeout_sec: float,
+        cancelled: threading.Event,
+    ) -> list[Optional[str]]:
+        """Poll targets until done, timed out or cancelled is set."""
+        deadline = time.monotonic() + timeout_sec
+        results: list[Optional[str]] = ["not read"] * len(targets)
+        interval = self.initial_interval_sec
+        while True:
+            # Indices of targets not reached yet per device
+            pending: dict[str, list[int]] = {}
+            for index, result in enumerate(results):
+                if result is not None:
+                    pending.setdefault(targets[index][0], []).append(index)
+            if not pending:
+                break
+
+            for device_name, indices in pending.items():
+                self._read(device_name, targets, indices, results)
+            if all(result is None for result in results):
+                break
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            delay = interval * random.uniform(1.0 - self.jitter, 1.0)
+            if cancelled.wait(min(delay, remaining)):
+                break
+            interval = min(interval * self.backoff, self.max_interval_sec)
+        return results
+
+    def _read(
+        self: AttributePoller,
+        device_name: str,
+        targets: list[PollTarget],
+        indices: list[int],
+        results: list[Optional[str]],
+    ):
+        """Read targets at indices of device_name in one call."""
+        attr_names = list(dict.fromkeys(targets[i][1] for i in indices))
+        try:
+            attrs = self._proxy(device_name).read_attributes(attr_names)
+        except Exception as exception:  # pylint: disable=broad-except
+            for index in indices:
+                results[index] = f"read failed: {exception}"
+            return
+
+        values = {
+            attr_name.lower(): attr.value
+            for attr_name, attr in zip(attr_names, attrs)
+        }
+        for index in indices:
+            _, attr_name, target_value = targets[index]
+            value = values[attr_name.lower()]
+            results[index] = (
+                None
+                if values_equal(value, target_value)
+                else f"last read value: {value}"
+            )
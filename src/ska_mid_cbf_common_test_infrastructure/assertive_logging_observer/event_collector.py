@@ -0,0 +1,366 @@
+"""
+Code for the ProcessEventCollector which subscribes to and collects Tango
+change events in a separate collector process, so that event callbacks under
+heavy event load do not contend for the GIL with test code.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import queue
+import threading
+import time
+from multiprocessing.connection import Connection
+from typing import Any, Iterable, Optional
+
+import tango
+
+from .event_filters import (
+    EventFilter,
+    EventFilterRegistry,
+    event_key,
+    filter_values,
+    values_kept,
+)
+from .event_store import EventRecord, EventStore
+
+_COMMAND_TIMEOUT_SEC = 30.0
+
+
+class _DevStateValue:
+    """
+    Picklable stand-in for a DevState value sent from the collector process.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self: _DevStateValue, value: int):
+        self.value = value
+
+
+def _encode_value(value: Any) -> Any:
+    """Encode attribute value to be sent between processes."""
+    if isinstance(value, tango.DevState):
+        return _DevStateValue(int(value))
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    """Decode attribute value sent by _encode_value."""
+    if isinstance(value, _DevStateValue):
+        return tango.DevState.values[value.value]
+    return value
+
+
+def _collector_main(
+    connection: Connection, batch_interval_sec: float
+):  # pragma: no cover - runs in collector process
+    """
+    Main function of the collector process. Serves subscribe, unsubscribe_all
+    and stop commands received on connection, and sends batches of compact
+    (device_name, attr_name, value, reception_time) event tuples every
+    batch_interval_sec, along with counts of events dropped by value filters.
+
+    Events of attributes only subscribed to with value collection filters are
+    dropped here, so that they are neither pickled nor handled by the
+    receiving process. Predicate filters can not be sent to the collector
+    process, so they are applied by the receiving process.
+    """
+    send_lock = threading.Lock()
+    pending: list[tuple] = []
+    # Counts of events dropped by value filters keyed by (device, attribute)
+    dropped: dict[tuple[str, str], int] = {}
+    pending_lock = threading.Lock()
+    stop = threading.Event()
+    proxies: dict[str, tango.DeviceProxy] = {}
+    subscriptions: list[tuple[tango.DeviceProxy, int]] = []
+    # Values to keep per subscribed attribute, None to keep all events
+    value_filters: dict[tuple[str, str], Optional[list]] = {}
+
+    def send(message: tuple):
+        with send_lock:
+            connection.send(message)
+
+    def flush():
+        with pending_lock:
+            batch = pending[:]
+            pending.clear()
+            dropped_batch = dict(dropped)
+            dropped.clear()
+        if batch or dropped_batch:
+            send(("events", (batch, dropped_batch)))
+
+    def event_callback(event: tango.EventData):
+        if event.err or event.attr_value is None:
+            return
+        reception_time = time.time()
+        device_name = event.device.dev_name()
+        attr_name = event.attr_value.name
+        value = event.attr_value.value
+        key = event_key(device_name, attr_name)
+        values = value_filters.get(key)
+        if values is not None and not values_kept(values, value):
+            with pending_lock:
+                dropped[key] = dropped.get(key, 0) + 1
+            return
+        record = (
+            device_name,
+            attr_name,
+            _encode_value(value),
+            reception_time,
+        )
+        with pending_lock:
+            pending.append(record)
+
+    def sender():
+        while not stop.wait(batch_interval_sec):
+            flush()
+
+    threading.Thread(target=sender, daemon=True).start()
+
+    while not stop.is_set():
+        command, *args = connection.recv()
+        try:
+            if command == "subscribe":
+                device_name, attr_name, values = args
+                key = event_key(device_name, attr_name)
+                if values is not None:
+                    values = [_decode_value(value) for value in values]
+                subscribed = key in value_filters
+                if subscribed:
+                    # Keep values of the additional filter too, or all
+                    # events if it is not a value filter
+                    kept = value_filters[key]
+                    values = (
+                        None
+                        if kept is None or values is None
+                        else (kept + values)
+                    )
+                # Entries are replaced rather than mutated as they are read
+                # by event callbacks without a lock
+                value_filters[key] = values
+                if not subscribed:
+                    if device_name not in proxies:
+                        proxies[device_name] = tango.DeviceProxy(device_name)
+                    proxy = proxies[device_name]
+                    subscriptions.append(
+                        (
+                            proxy,
+                            proxy.subscribe_event(
+                                attr_name,
+                                tango.EventType.CHANGE_EVENT,
+                                event_callback,
+                            ),
+                        )
+                    )
+            elif command == "unsubscribe_all":
+                for proxy, subscription_id in subscriptions:
+                    proxy.unsubscribe_event(subscription_id)
+                subscriptions.clear()
+                value_filters.clear()
+            elif command == "stop":
+                stop.set()
+            # Events received so far, e.g. the initial event of a
+            # subscription, are sent before the command is acknowledged
+            flush()
+            send(("ack", None))
+        except Exception as exception:  # pylint: disable=broad-except
+            send(("error", f"{command} {args} failed: {exception}"))
+
+    connection.close()
+
+
+class ProcessEventCollector:
+    """
+    Collector of Tango change events running subscriptions in a separate
+    process. Value collection event filters are applied in the collector
+    process, kept events are sent to this process as compact records in
+    batches over a pipe, filtered with predicate event filters and stored in
+    an EventStore for matching.
+
+    Exposes the subscription interface and the store of
+    FilteredTangoEventTracer used by AssertiveLoggingObserver, which matches
+    events on store.
+    """
+
+    def __init__(
+        self: ProcessEventCollector,
+        batch_interval_sec: float = 0.005,
+        start_method: str = "spawn",
+    ):
+        """
+        Initialize a ProcessEventCollector instance, starting its collector
+        process.
+
+        :param batch_interval_sec: interval at which the collector process
+            sends batches of events.
+        :param start_method: multiprocessing start method of the collector
+            process, spawn by default as forking a process using Tango is
+            unsafe.
+        """
+        self.store = EventStore()
+        self._event_filters = EventFilterRegistry()
+        self._event_listeners: list = []
+        self._command_lock = threading.Lock()
+        self._responses: queue.Queue = queue.Queue()
+
+        context = multiprocessing.get_context(start_method)
+        self._connection, child_connection = context.Pipe()
+        self._process = context.Process(
+            target=_collector_main,
+            args=(child_connection, batch_interval_sec),
+            name="ProcessEventCollector",
+            daemon=True,
+        )
+        self._process.start()
+        child_connection.close()
+
+        self._receiver = threading.Thread(
+            target=self._receive, name="ProcessEventCollector", daemon=True
+        )
+        self._receiver.start()
+
+    def _receive(self: ProcessEventCollector):
+        """Receive event batches and command responses until pipe closes."""
+        while True:
+            try:
+                message, payload = self._connection.recv()
+            except (EOFError, OSError):
+                return
+            if message == "events":
+                batch, dropped = payload
+                for (device_name, attr_name), count in dropped.items():
+                    self._event_filters.add_dropped(
+                        device_name, attr_name, count
+                    )
+                self._store_events(batch)
+            else:
+                self._responses.put((message, payload))
+
+    def _store_events(self: ProcessEventCollector, batch: list[tuple]):
+        """Filter, store and notify listeners of a batch of events."""
+        records = []
+        for device_name, attr_name, value, reception_time in batch:
+            value = _decode_value(value)
+            if self._event_filters.should_keep(device_name, attr_name, value):
+                records.append(
+                    EventRecord(device_name, attr_name, value, reception_time)
+                )
+        if not records:
+            return
+
+        self.store.extend(records)
+        listeners = self._event_listeners
+        for record in records:
+            for listener in listeners:
+                listener(
+                    record.device_name,
+                    record.attribute_name,
+                    record.attribute_value,
+                    record.reception_time,
+                )
+
+    def _command(self: ProcessEventCollector, command: str, *args: Any):
+        """
+        Send command to collector process and wait for it to complete.
+
+        :raises RuntimeError: if the command fails or times out.
+        """
+        with self._command_lock:
+            if not self._process.is_alive():
+                raise RuntimeError("ProcessEventCollector process has exited")
+            self._connection.send((command, *args))
+            try:
+                message, payload = self._responses.get(
+                    timeout=_COMMAND_TIMEOUT_SEC
+                )
+            except queue.Empty as exception:
+                raise RuntimeError(
+                    f"ProcessEventCollector {command} timed out"
+                ) from exception
+        if message == "error":
+            raise RuntimeError(payload)
+
+    def subscribe_event(
+        self: ProcessEventCollector,
+        device_name: str,
+        attribute_name: str,
+        event_filter: Optional[EventFilter] = None,
+    ):
+        """
+        Subscribe to change events of attribute_name for device_name in the
+        collector process keeping only events accepted by event_filter.
+        Subscribing again to an already subscribed attribute only registers
+        the additional filter. Value collection filters are sent to the
+        collector process, which drops events they reject before sending.
+
+        :param device_name: name of device to track attribute of.
+        :param attribute_name: attribute to track events for.
+        :param event_filter: optional predicate or collection of values of
+            events to keep, if None all events are kept.
+        """
+        self._event_filters.register(device_name, attribute_name, event_filter)
+        values = filter_values(event_filter)
+        self._command(
+            "subscribe",
+            device_name,
+            attribute_name,
+            None if values is None else [_encode_value(v) for v in values],
+        )
+
+    def unsubscribe_all(self: ProcessEventCollector):
+        """
+        Unsubscribe from all events and forget all registered filters.
+        """
+        self._event_filters.clear_filters()
+        if self._process.is_alive():
+            self._command("unsubscribe_all")
+
+    def clear_events(
+        self: ProcessEventCollector,
+        device_names: Optional[Iterable[str]] = None,
+    ):
+        """
+        Clear stored events and dropped event counts, of all devices or only
+        of device_names.
+
+        :param device_names: optional names of devices to clear events of.
+        """
+        self._event_filters.clear_dropped(device_names)
+        self.store.clear(device_names)
+
+    @property
+    def dropped_events(
+        self: ProcessEventCollector,
+    ) -> dict[tuple[str, str], int]:
+        """
+        Counts of events dropped by filters keyed by (device_name, attr_name)
+        in lowercase.
+        """
+        return self._event_filters.dropped_events
+
+    def add_event_listener(self: ProcessEventCollector, listener):
+        """
+        Add listener to be called for every event stored by the collector,
+        from its receiver thread.
+
+        :param listener: callable taking device name, attribute name,
+            attribute value and reception time of the event.
+        """
+        self._event_listeners = self._event_listeners + [listener]
+
+    def close(self: ProcessEventCollector):
+        """
+        Unsubscribe from all events and stop the collector process.
+        """
+        if self._process.is_alive():
+            try:
+                self._command("unsubscribe_all")
+                self._command("stop")
+            except RuntimeError:
+                pass
+            self._process.join(_COMMAND_TIMEOUT_SEC)
+            if self._process.is_alive():
+                self._process.terminate()
+        # Receiver exits on end of file once the collector process has exited
+        self._receiver.join(_COMMAND_TIMEOUT_SEC)
+        self._connection.close()
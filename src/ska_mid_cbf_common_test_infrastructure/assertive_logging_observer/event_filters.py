@@ -0,0 +1,193 @@
+"""
+Code for subscription time event filters shared by the event collectors of
+AssertiveLoggingObserver.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Collection, Iterable, Optional, Union
+
+from .event_store import values_equal
+
+EventFilter = Union[Callable[[Any], bool], Collection[Any]]
+"""
+Filter of events given at subscription time, either a predicate taking the
+event attribute value and returning whether to keep the event, or a collection
+of attribute values to keep events for.
+"""
+
+
+def filter_values(
+    event_filter: Optional[EventFilter],
+) -> Optional[tuple[Any, ...]]:
+    """
+    Get attribute values kept by given event_filter, if it is a collection of
+    values rather than a predicate.
+
+    :param event_filter: optional predicate or collection of values to keep.
+    :returns: tuple of values to keep, None if event_filter is None or a
+        predicate.
+    """
+    if event_filter is None or callable(event_filter):
+        return None
+    if isinstance(event_filter, (str, bytes)):
+        return (event_filter,)
+    return tuple(event_filter)
+
+
+def values_kept(values: Iterable[Any], value: Any) -> bool:
+    """
+    Check whether value is one of values kept by a value collection filter.
+
+    :param values: values to keep, see filter_values.
+    :param value: attribute value of an event.
+    :returns: whether value equals any of values.
+    """
+    return any(values_equal(value, keep) for keep in values)
+
+
+def _to_predicate(event_filter: EventFilter) -> Callable[[Any], bool]:
+    """
+    Convert given event_filter into a predicate on attribute values.
+
+    :param event_filter: predicate or collection of values to keep.
+    :returns: predicate returning True for attribute values to keep.
+    """
+    if callable(event_filter):
+        return event_filter
+
+    values = filter_values(event_filter)
+
+    # Compare with values_equal rather than hashing as attribute values such
+    # as DevState or numpy arrays are not reliably hashable, and == of numpy
+    # arrays is elementwise
+    return lambda value: values_kept(values, value)
+
+
+def event_key(device_name: str, attr_name: str) -> tuple[str, str]:
+    """Tango names are case insensitive, so key on lowercase names."""
+    return (device_name.lower(), attr_name.lower())
+
+
+class EventFilterRegistry:
+    """
+    Registry of event filters per subscribed attribute. Events of an attribute
+    are kept if at least one filter registered for the attribute accepts the
+    event value, or if the attribute was registered without a filter. Dropped
+    events are counted per attribute.
+    """
+
+    def __init__(self: EventFilterRegistry):
+        self._lock = threading.Lock()
+        # None in a list of filters means events are kept unconditionally
+        self._filters: dict[
+            tuple[str, str], list[Optional[Callable[[Any], bool]]]
+        ] = {}
+        self._dropped_events: dict[tuple[str, str], int] = {}
+
+    def register(
+        self: EventFilterRegistry,
+        device_name: str,
+        attr_name: str,
+        event_filter: Optional[EventFilter] = None,
+    ) -> bool:
+        """
+        Register event_filter for attribute attr_name of device_name.
+
+        :param device_name: name of device of attribute.
+        :param attr_name: attribute to filter events of.
+        :param event_filter: optional predicate or collection of values of
+            events to keep, if None all events are kept.
+        :returns: whether attribute was already registered, i.e. whether it
+            is already subscribed to.
+        """
+        key = event_key(device_name, attr_name)
+        predicate = (
+            None if event_filter is None else _to_predicate(event_filter)
+        )
+        with self._lock:
+            already_registered = key in self._filters
+            self._filters.setdefault(key, []).append(predicate)
+        return already_registered
+
+    def clear_filters(self: EventFilterRegistry):
+        """Forget all registered filters."""
+        with self._lock:
+            self._filters.clear()
+
+    def clear_dropped(
+        self: EventFilterRegistry,
+        device_names: Optional[Iterable[str]] = None,
+    ):
+        """
+        Reset dropped event counts, of all devices or only of device_names.
+
+        :param device_names: optional names of devices to reset counts of.
+        """
+        with self._lock:
+            if device_names is None:
+                self._dropped_events.clear()
+                return
+            removed = {device_name.lower() for device_name in device_names}
+            for key in list(self._dropped_events):
+                if key[0] in removed:
+                    del self._dropped_events[key]
+
+    def add_dropped(
+        self: EventFilterRegistry,
+        device_name: str,
+        attr_name: str,
+        count: int,
+    ):
+        """
+        Count events dropped before reaching the registry, e.g. by an event
+        collector process.
+
+        :param device_name: name of device the events are from.
+        :param attr_name: attribute the events are for.
+        :param count: number of dropped events.
+        """
+        key = event_key(device_name, attr_name)
+        with self._lock:
+            self._dropped_events[key] = (
+                self._dropped_events.get(key, 0) + count
+            )
+
+    @property
+    def dropped_events(
+        self: EventFilterRegistry,
+    ) -> dict[tuple[str, str], int]:
+        """
+        Counts of events dropped by filters keyed by (device_name, attr_name)
+        in lowercase.
+        """
+        with self._lock:
+            return dict(self._dropped_events)
+
+    def should_keep(
+        self: EventFilterRegistry,
+        device_name: str,
+        attr_name: str,
+        value: Any,
+    ) -> bool:
+        """
+        Check whether an event is accepted by any filter of its attribute,
+        counting it as dropped otherwise.
+
+        :param device_name: name of device the event is from.
+        :param attr_name: attribute the event is for.
+        :param value: attribute value of the event.
+        :returns: whether to keep the event.
+        """
+        key = event_key(device_name, attr_name)
+        with self._lock:
+            predicates = tuple(self._filters.get(key, ()))
+            if not predicates or None in predicates:
+                return True
+
+        if any(predicate(value) for predicate in predicates):
+            return True
+
+        with self._lock:
+            self._dropped_events[key] = self._dropped_events.get(key, 0) + 1
+        return False
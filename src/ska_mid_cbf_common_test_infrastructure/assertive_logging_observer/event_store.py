@@ -0,0 +1,305 @@
+"""
+Code for the EventStore holding change events collected for
+AssertiveLoggingObserver matching.
+"""
+from __future__ import annotations
+
+import array
+import bisect
+import sys
+import threading
+import time
+from typing import Any, Callable, Iterable, Optional
+
+
+def values_equal(value: Any, target: Any) -> bool:
+    """
+    Compare an attribute value to a target value, reducing elementwise
+    comparisons of array values to a single bool.
+
+    :param value: attribute value.
+    :param target: target value to compare to.
+    :returns: whether value equals target.
+    """
+    if isinstance(value, (list, tuple)) and isinstance(target, (list, tuple)):
+        # Spectrum attribute values may be delivered as lists or tuples
+        return len(value) == len(target) and all(
+            values_equal(item, target_item)
+            for item, target_item in zip(value, target)
+        )
+    try:
+        equal = value == target
+        if isinstance(equal, bool):
+            return equal
+        # Elementwise comparison, e.g. of numpy arrays
+        return bool(equal.all())
+    except (AttributeError, ValueError, TypeError):
+        return False
+
+
+class EventRecord:
+    """
+    Compact change event of a device attribute as stored for matching.
+
+    Records use __slots__ and interned device and attribute names, so that
+    a record costs little more than its attribute value, as opposed to
+    kilobytes for the tango.EventData it is made from.
+    """
+
+    __slots__ = (
+        "device_name",
+        "attribute_name",
+        "attribute_value",
+        "reception_time",
+    )
+
+    def __init__(
+        self: EventRecord,
+        device_name: str,
+        attribute_name: str,
+        attribute_value: Any,
+        reception_time: float,
+    ):
+        """
+        Initialize an EventRecord instance.
+
+        :param device_name: name of device the event is from.
+        :param attribute_name: attribute the event is for.
+        :param attribute_value: attribute value of the event.
+        :param reception_time: time.time() the event was received.
+        """
+        self.device_name = sys.intern(device_name)
+        self.attribute_name = sys.intern(attribute_name)
+        self.attribute_value = attribute_value
+        self.reception_time = reception_time
+
+    def __repr__(self: EventRecord) -> str:
+        return (
+            f"EventRecord({self.device_name}/{self.attribute_name} = "
+            f"{self.attribute_value!r} at {self.reception_time})"
+        )
+
+    def has_device(self: EventRecord, device_name: Any) -> bool:
+        """
+        Whether record is from device_name, a name or device proxy, like
+        ska_tango_testing ReceivedEvent.has_device.
+
+        :param device_name: device name or device proxy.
+        :returns: whether the device matches, ignoring case.
+        """
+        if hasattr(device_name, "dev_name"):
+            device_name = device_name.dev_name()
+        return self.device_name.lower() == str(device_name).lower()
+
+    def has_attribute(self: EventRecord, attribute_name: str) -> bool:
+        """
+        Whether record is for attribute_name, like ska_tango_testing
+        ReceivedEvent.has_attribute.
+
+        :param attribute_name: attribute name.
+        :returns: whether the attribute matches, ignoring case.
+        """
+        return self.attribute_name.lower() == attribute_name.lower()
+
+    def matches(
+        self: EventRecord,
+        device_name: str,
+        attribute_name: str,
+        attribute_value: Any,
+    ) -> bool:
+        """
+        Whether record is a change event of attribute_name of device_name to
+        attribute_value, comparing names case insensitively.
+        """
+        return (
+            self.attribute_name.lower() == attribute_name.lower()
+            and self.device_name.lower() == device_name.lower()
+            and values_equal(self.attribute_value, attribute_value)
+        )
+
+
+class EventStore:
+    """
+    Thread safe append only store of EventRecords which can be waited on for
+    a record matching a predicate. Stored records are numbered in order of
+    reception, so that cursors keep their position across clears.
+    """
+
+    def __init__(self: EventStore):
+        self._condition = threading.Condition()
+        self._records: list[EventRecord] = []
+        # Sequence number of each stored record, increasing
+        self._sequences = array.array("Q")
+        self._next_sequence = 0
+
+    def __len__(self: EventStore) -> int:
+        return len(self._records)
+
+    @property
+    def records(self: EventStore) -> list[EventRecord]:
+        """Copy of stored records in order of reception."""
+        with self._condition:
+            return list(self._records)
+
+    def append(self: EventStore, record: EventRecord):
+        """
+        Store record and wake up waiters.
+
+        :param record: record to store.
+        """
+        with self._condition:
+            self._records.append(record)
+            self._sequences.append(self._next_sequence)
+            self._next_sequence += 1
+            self._condition.notify_all()
+
+    def extend(self: EventStore, records: Iterable[EventRecord]):
+        """
+        Store records and wake up waiters.
+
+        :param records: records to store.
+        """
+        with self._condition:
+            count = len(self._records)
+            self._records.extend(records)
+            added = len(self._records) - count
+            self._sequences.extend(
+                range(self._next_sequence, self._next_sequence + added)
+            )
+            self._next_sequence += added
+            self._condition.notify_all()
+
+    def clear(self: EventStore, device_names: Optional[Iterable[str]] = None):
+        """
+        Remove stored records, of all devices or only of device_names so
+        that threads observing other devices keep their records.
+
+        :param device_names: optional names of devices to remove records
+            of, if None all records are removed.
+        """
+        removed = (
+            None
+            if device_names is None
+            else {device_name.lower() for device_name in device_names}
+        )
+        with self._condition:
+            # Replace rather than clear the list so waiters scanning a
+            # previous list outside the lock are not affected, cursors find
+            # their position in the kept records by sequence number
+            if removed is None:
+                self._records = []
+                self._sequences = array.array("Q")
+            else:
+                kept = [
+                    index
+                    for index, record in enumerate(self._records)
+                    if record.device_name.lower() not in removed
+                ]
+                self._records = [self._records[index] for index in kept]
+                self._sequences = array.array(
+                    "Q", [self._sequences[index] for index in kept]
+                )
+            self._condition.notify_all()
+
+    def cursor(self: EventStore) -> EventCursor:
+        """
+        Get a cursor over stored records starting at the first record.
+
+        :returns: new EventCursor of this store.
+        """
+        return EventCursor(self)
+
+    def wait_for(
+        self: EventStore,
+        predicate: Callable[[EventRecord], bool],
+        timeout_sec: float,
+    ) -> Optional[EventRecord]:
+        """
+        Wait for a stored record matching predicate, checking records already
+        stored first and then records as they arrive.
+
+        :param predicate: predicate on records to wait for.
+        :param timeout_sec: maximum time to wait (seconds).
+        :returns: first matching record, or None if none arrived in time.
+        """
+        deadline = time.monotonic() + timeout_sec
+        cursor = self.cursor()
+        while True:
+            for record in cursor.next_records(deadline - time.monotonic()):
+                if predicate(record):
+                    return record
+            if time.monotonic() >= deadline:
+                return None
+
+    def wait_for_change_event(
+        self: EventStore,
+        device_name: str,
+        attribute_name: str,
+        attribute_value: Any,
+        timeout_sec: float,
+    ) -> Optional[EventRecord]:
+        """
+        Wait for a change event of attribute_name of device_name to
+        attribute_value.
+
+        :param device_name: name of device to wait for event from.
+        :param attribute_name: attribute to wait for event of.
+        :param attribute_value: attribute value to wait for.
+        :param timeout_sec: maximum time to wait (seconds).
+        :returns: first matching record, or None if none arrived in time.
+        """
+        return self.wait_for(
+            lambda record: record.matches(
+                device_name, attribute_name, attribute_value
+            ),
+            timeout_sec,
+        )
+
+
+class EventCursor:
+    """
+    Cursor incrementally reading records of an EventStore in order of
+    reception. Clearing the store never delivers a record again, the cursor
+    continues with the kept records stored after its last record.
+    """
+
+    def __init__(self: EventCursor, store: EventStore):
+        self._store = store
+        self._records: list[EventRecord] = []
+        self._index = 0
+        # Sequence number of the next record to deliver
+        self._next_sequence = 0
+
+    def next_records(
+        self: EventCursor, timeout_sec: float = 0.0
+    ) -> list[EventRecord]:
+        """
+        Get records stored since the last call, waiting up to timeout_sec
+        for new records if there are none.
+
+        :param timeout_sec: maximum time to wait for new records (seconds).
+        :returns: new records, empty if none arrived in time.
+        """
+        store = self._store
+        deadline = time.monotonic() + timeout_sec
+        # pylint: disable=protected-access
+        with store._condition:
+            while True:
+                if self._records is not store._records:
+                    self._records = store._records
+                    self._index = bisect.bisect_left(
+                        store._sequences, self._next_sequence
+                    )
+                end = len(self._records)
+                if self._index < end:
+                    self._next_sequence = store._sequences[end - 1] + 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                store._condition.wait(remaining)
+
+        # Slice outside the lock so event delivery is not blocked, records
+        # are only ever appended to a list so indices below end are stable
+        start, self._index = self._index, end
+        return self._records[start:end]
@@ -0,0 +1,186 @@
+"""
+Code for the FilteredTangoEventTracer which extends TangoEventTracer with
+subscription time event filtering, so that events which can not match any
+observation of interest are dropped before they are stored, and compact
+storage of events as EventRecords.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Iterable, Optional
+
+import tango
+from ska_tango_testing.integration import TangoEventTracer
+
+from .event_filters import EventFilter, EventFilterRegistry
+from .event_store import EventRecord, EventStore
+
+EventListener = Callable[[str, str, Any, float], None]
+"""
+Listener called with device name, attribute name, attribute value and
+reception time.time() of every event stored by the tracer.
+"""
+
+
+class FilteredTangoEventTracer(TangoEventTracer):
+    """
+    TangoEventTracer which takes optional event filters when subscribing to an
+    attribute. Events for a subscribed attribute are only stored if at least
+    one filter registered for that attribute accepts the event value, or if
+    the attribute was subscribed to without a filter. Dropped events are
+    counted per attribute.
+
+    Kept events are converted to compact EventRecords stored in store, and the
+    raw tango.EventData is released immediately rather than kept in
+    TangoEventTracer storage. events and query_events are backed by store,
+    so that assertpy assertions on the tracer such as
+    has_change_event_occurred see the stored EventRecords.
+    """
+
+    def __init__(self: FilteredTangoEventTracer, *args, **kwargs):
+        """
+        Initialize a FilteredTangoEventTracer instance, arguments are passed
+        through to TangoEventTracer.
+        """
+        super().__init__(*args, **kwargs)
+        self.store = EventStore()
+        self._event_filters = EventFilterRegistry()
+        self._event_listeners: list[EventListener] = []
+
+    def subscribe_event(
+        self: FilteredTangoEventTracer,
+        device_name: str,
+        attribute_name: str,
+        dev_factory: Optional[Callable[[str], tango.DeviceProxy]] = None,
+        event_filter: Optional[EventFilter] = None,
+    ):
+        """
+        Subscribe to change events of attribute_name for device_name keeping
+        only events accepted by event_filter. Subscribing again to an already
+        subscribed attribute only registers the additional filter.
+
+        :param device_name: name of device to track attribute of.
+        :param attribute_name: attribute to track events for.
+        :param dev_factory: optional device proxy factory passed through to
+            TangoEventTracer.
+        :param event_filter: optional predicate or collection of values of
+            events to keep, if None all events are kept.
+        """
+        if not self._event_filters.register(
+            device_name, attribute_name, event_filter
+        ):
+            super().subscribe_event(
+                device_name, attribute_name, dev_factory=dev_factory
+            )
+
+    def unsubscribe_all(self: FilteredTangoEventTracer):
+        """
+        Unsubscribe from all events and forget all registered filters.
+        """
+        self._event_filters.clear_filters()
+        super().unsubscribe_all()
+
+    def clear_events(
+        self: FilteredTangoEventTracer,
+        device_names: Optional[Iterable[str]] = None,
+    ):
+        """
+        Clear stored events and dropped event counts, of all devices or only
+        of device_names.
+
+        :param device_names: optional names of devices to clear events of.
+        """
+        self._event_filters.clear_dropped(device_names)
+        self.store.clear(device_names)
+        if device_names is None:
+            super().clear_events()
+
+    def add_event_listener(
+        self: FilteredTangoEventTracer, listener: EventListener
+    ):
+        """
+        Add listener to be called for every event stored by the tracer, from
+        the thread delivering the event.
+
+        :param listener: callable taking device name, attribute name,
+            attribute value and reception time of the event.
+        """
+        self._event_listeners = self._event_listeners + [listener]
+
+    @property
+    def dropped_events(
+        self: FilteredTangoEventTracer,
+    ) -> dict[tuple[str, str], int]:
+        """
+        Counts of events dropped by filters keyed by (device_name, attr_name)
+        in lowercase.
+        """
+        return self._event_filters.dropped_events
+
+    @property
+    def events(self: FilteredTangoEventTracer) -> list[EventRecord]:
+        """Copy of stored events in order of reception."""
+        return self.store.records
+
+    def query_events(
+        self: FilteredTangoEventTracer,
+        predicate: Callable[[EventRecord], bool],
+        timeout: Any = None,
+        target_n_events: int = 1,
+    ) -> list[EventRecord]:
+        """
+        Wait for target_n_events stored events matching predicate, checking
+        events already stored first, as TangoEventTracer.query_events does
+        for the assertpy assertions on tracers.
+
+        :param predicate: predicate on stored events.
+        :param timeout: maximum time to wait (seconds), or a timeout of
+            within_timeout chained assertions, None not to wait.
+        :param target_n_events: number of matching events to wait for.
+        :returns: matching events, fewer than target_n_events if they did
+            not arrive in time.
+        """
+        if hasattr(timeout, "get_remaining_timeout"):
+            timeout = timeout.get_remaining_timeout()
+        deadline = time.monotonic() + (
+            0.0 if timeout is None else float(timeout)
+        )
+        matched: list[EventRecord] = []
+        cursor = self.store.cursor()
+        while True:
+            remaining = max(deadline - time.monotonic(), 0.0)
+            for record in cursor.next_records(remaining):
+                if predicate(record):
+                    matched.append(record)
+                    if len(matched) >= target_n_events:
+                        return matched
+            if time.monotonic() >= deadline:
+                return matched
+
+    def _event_callback(
+        self: FilteredTangoEventTracer, event: tango.EventData
+    ):
+        """
+        Event callback passed to tango subscriptions, drops events rejected by
+        filters and stores kept events as EventRecords. Error events are
+        passed on to TangoEventTracer for reporting.
+        """
+        if event.err or event.attr_value is None:
+            super()._event_callback(event)
+            return
+
+        device_name = event.device.dev_name()
+        attr_name = event.attr_value.name
+        value = event.attr_value.value
+        if not self._event_filters.should_keep(device_name, attr_name, value):
+            return
+
+        reception_time = time.time()
+        self.store.append(
+            EventRecord(device_name, attr_name, value, reception_time)
+        )
+
+        # Listeners list is replaced rather than mutated so can be read
+        # without a lock
+        for listener in self._event_listeners:
+            listener(device_name, attr_name, value, reception_time)
@@ -0,0 +1,373 @@
+"""
+Code for comparing large data products, e.g. PCAP or visibility dumps
+captured from the correlator, against golden reference outputs chunk by
+chunk in constant memory, for AssertiveLoggingObserver.observe_golden_file.
+
+Files are read through read only memory maps and streams into one reused
+buffer per side, so that multi-GB products are compared without being
+loaded. Comparison stops at the first divergent chunk and reports at most a
+bounded number of differences in it.
+"""
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+from typing import Any, BinaryIO, Optional, Union
+
+DEFAULT_CHUNK_BYTES = 1 << 24
+"""Bytes compared at a time by default."""
+
+GoldenSource = Union[
+    str, os.PathLike, bytes, bytearray, memoryview, mmap.mmap, BinaryIO
+]
+"""File path, bytes-like object or binary stream to compare."""
+
+# Chunks are compared in blocks copied to bytes, which compare with memcmp
+# unlike memoryviews, small enough to stay in cache
+_BLOCK_BYTES = 1 << 16
+
+
+def describe_source(source: GoldenSource) -> str:
+    """
+    Short description of a source for logging.
+
+    :param source: compared source.
+    :returns: path of files and streams with a name, else type and size.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    name = getattr(source, "name", None)
+    if isinstance(name, str):
+        return name
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return f"{type(source).__name__} of {memoryview(source).nbytes} bytes"
+    return type(source).__name__
+
+
+class _ChunkReader:
+    """
+    Reader of consecutive chunks of a source. Chunks are views which are
+    only valid until the next read, as streams are read into one buffer.
+    """
+
+    def __init__(self: _ChunkReader, source: GoldenSource, chunk_bytes: int):
+        self._source = source
+        self._chunk_bytes = chunk_bytes
+        self._file: Optional[BinaryIO] = None
+        self._map: Optional[mmap.mmap] = None
+        self._view: Optional[memoryview] = None
+        self._buffer: Optional[bytearray] = None
+        self._stream: Optional[BinaryIO] = None
+        self._start_position = 0
+        self._position = 0
+
+    def __enter__(self: _ChunkReader) -> _ChunkReader:
+        source = self._source
+        if isinstance(source, (str, os.PathLike)):
+            # pylint: disable-next=consider-using-with
+            self._file = open(source, "rb")
+            if os.fstat(self._file.fileno()).st_size:
+                self._map = mmap.mmap(
+                    self._file.fileno(), 0, access=mmap.ACCESS_READ
+                )
+                if hasattr(self._map, "madvise"):
+                    self._map.madvise(mmap.MADV_SEQUENTIAL)
+                self._view = memoryview(self._map)
+            else:
+                self._view = memoryview(b"")
+        elif isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+            self._view = memoryview(source).cast("B")
+        else:
+            self._stream = source
+            self._buffer = bytearray(self._chunk_bytes)
+            if self.rewindable:
+                self._start_position = source.tell()
+        return self
+
+    def __exit__(self: _ChunkReader, *exc_info):
+        if self._view is not None:
+            self._view.release()
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # Chunks still referenced by the caller, unmapped once freed
+                pass
+        if self._file is not None:
+            self._file.close()
+
+    @property
+    def rewindable(self: _ChunkReader) -> bool:
+        """Whether the source can be read again from the start."""
+        return self._stream is None or self._stream.seekable()
+
+    def rewind(self: _ChunkReader):
+        """Read the source again from the start."""
+        self._position = 0
+        if self._stream is not None:
+            self._stream.seek(self._start_position)
+
+    def read(self: _ChunkReader) -> memoryview:
+        """
+        Read next chunk, which is only shorter than chunk_bytes at the end.
+
+        :returns: view of the chunk, empty at the end of the source.
+        """
+        if self._view is not None:
+            start = self._position
+            end = self._position = min(
+                start + self._chunk_bytes, len(self._view)
+            )
+            return self._view[start:end]
+
+        # Streams such as pipes may return fewer bytes than requested
+        buffer = memoryview(self._buffer)
+        filled = 0
+        while filled < len(buffer):
+            count = self._stream.readinto(buffer[filled:])
+            if not count:
+                break
+            filled += count
+        self._position += filled
+        return buffer[:filled]
+
+
+def _sha256(reader: _ChunkReader) -> str:
+    """Hex SHA-256 digest of the remaining chunks of reader."""
+    digest = hashlib.sha256()
+    chunk = reader.read()
+    while chunk:
+        digest.update(chunk)
+        chunk = reader.read()
+    return digest.hexdigest()
+
+
+def _views_equal(actual: memoryview, golden: memoryview) -> bool:
+    """Whether equal length views are equal, compared block by block."""
+    for start in range(0, len(actual), _BLOCK_BYTES):
+        end = start + _BLOCK_BYTES
+        if actual[start:end].tobytes() != golden[start:end].tobytes():
+            return False
+    return True
+
+
+def _byte_differences(
+    actual: memoryview, golden: memoryview, offset: int, max_reported: int
+) -> list[str]:
+    """Describe up to max_reported differing bytes of equal length views."""
+    differences: list[str] = []
+    for start in range(0, len(actual), _BLOCK_BYTES):
+        end = start + _BLOCK_BYTES
+        actual_block = actual[start:end].tobytes()
+        golden_block = golden[start:end].tobytes()
+        if actual_block == golden_block:
+            continue
+        for index, (actual_byte, golden_byte) in enumerate(
+            zip(actual_block, golden_block), start
+        ):
+            if actual_byte != golden_byte:
+                differences.append(
+                    f"byte {offset + index}: {actual_byte:#04x} != "
+                    f"{golden_byte:#04x}"
+                )
+                if len(differences) == max_reported:
+                    return differences
+    return differences
+
+
+def _element_differences(
+    actual: memoryview,
+    golden: memoryview,
+    offset: int,
+    dtype: Any,
+    rtol: float,
+    atol: float,
+    max_reported: int,
+) -> tuple[int, list[str]]:
+    """
+    Count and describe up to max_reported elements of dtype of equal length
+    views which are not close within rtol and atol.
+    """
+    import numpy  # pylint: disable=import-outside-toplevel
+
+    actual_values = numpy.frombuffer(actual, dtype=dtype)
+    golden_values = numpy.frombuffer(golden, dtype=dtype)
+    close = numpy.isclose(
+        actual_values, golden_values, rtol=rtol, atol=atol, equal_nan=True
+    )
+    if close.all():
+        return 0, []
+    indices = numpy.flatnonzero(~close)
+    first_element = offset // dtype.itemsize
+    return len(indices), [
+        f"element {first_element + index}: {actual_values[index]} != "
+        f"{golden_values[index]} "
+        f"(|diff| {abs(actual_values[index] - golden_values[index]):.6g})"
+        for index in indices[:max_reported]
+    ]
+
+
+class GoldenComparison:
+    """
+    Result of comparing an actual data product against a golden one.
+    """
+
+    __slots__ = ("equal", "bytes_compared", "hash_matched", "report")
+
+    def __init__(
+        self: GoldenComparison,
+        equal: bool,
+        bytes_compared: int,
+        hash_matched: bool = False,
+        report: str = "",
+    ):
+        """
+        Initialize a GoldenComparison instance.
+
+        :param equal: whether actual matches golden.
+        :param bytes_compared: bytes of actual compared chunk by chunk, 0
+            if the hash pre-check matched.
+        :param hash_matched: whether actual matched the golden digest.
+        :param report: description of the first divergent chunk.
+        """
+        self.equal = equal
+        self.bytes_compared = bytes_compared
+        self.hash_matched = hash_matched
+        self.report = report
+
+
+def compare_golden(
+    actual: GoldenSource,
+    golden: GoldenSource,
+    dtype: Any = None,
+    rtol: float = 0.0,
+    atol: float = 0.0,
+    golden_sha256: Optional[str] = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    max_reported_diffs: int = 10,
+) -> GoldenComparison:
+    """
+    Compare actual against golden chunk by chunk, stopping at the first
+    divergent chunk.
+
+    Without dtype bytes must be equal. With dtype, e.g. complex64 for
+    visibilities, chunks are compared as NumPy arrays of dtype which are
+    equal if numpy.isclose within rtol and atol, with NaNs equal.
+
+    If golden_sha256 is given, e.g. the digest of the golden file in the
+    test_data manifest, actual is hashed first and golden is only read if
+    the digests differ.
+
+    :param actual: data product to check.
+    :param golden: golden reference data product.
+    :param dtype: optional NumPy dtype to compare elements of.
+    :param rtol: relative tolerance of element comparison.
+    :param atol: absolute tolerance of element comparison.
+    :param golden_sha256: optional hex SHA-256 digest of golden.
+    :param chunk_bytes: bytes to compare at a time, rounded down to a
+        multiple of the dtype item size.
+    :param max_reported_diffs: maximum number of differences to report.
+    :returns: result of the comparison.
+    """
+    if dtype is not None:
+        import numpy  # pylint: disable=import-outside-toplevel
+
+        dtype = numpy.dtype(dtype)
+        chunk_bytes = max(chunk_bytes // dtype.itemsize, 1) * dtype.itemsize
+
+    with _ChunkReader(actual, chunk_bytes) as actual_reader:
+        if golden_sha256 is not None:
+            actual_sha256 = _sha256(actual_reader)
+            if actual_sha256 == golden_sha256.lower():
+                return GoldenComparison(True, 0, hash_matched=True)
+            if not actual_reader.rewindable:
+                return GoldenComparison(
+                    False,
+                    0,
+                    report=f"sha256 {actual_sha256} != golden sha256 "
+                    f"{golden_sha256}, actual stream can not be reread to "
+                    "locate differences",
+                )
+            actual_reader.rewind()
+
+        with _ChunkReader(golden, chunk_bytes) as golden_reader:
+            return _compare_chunks(
+                actual_reader,
+                golden_reader,
+                dtype,
+                rtol,
+                atol,
+                max_reported_diffs,
+            )
+
+
+def _compare_chunks(
+    actual_reader: _ChunkReader,
+    golden_reader: _ChunkReader,
+    dtype: Any,
+    rtol: float,
+    atol: float,
+    max_reported: int,
+) -> GoldenComparison:
+    """Compare chunks of readers until the first divergent chunk."""
+    offset = 0
+    while True:
+        actual = actual_reader.read()
+        golden = golden_reader.read()
+        length = min(len(actual), len(golden))
+        common_actual, common_golden = actual[:length], golden[:length]
+        if not _views_equal(common_actual, common_golden):
+            if dtype is None:
+                count = None
+                differences = _byte_differences(
+                    common_actual, common_golden, offset, max_reported
+                )
+            else:
+                # Trailing bytes of a partial element are compared as bytes
+                elements = length - length % dtype.itemsize
+                count, differences = _element_differences(
+                    common_actual[:elements],
+                    common_golden[:elements],
+                    offset,
+                    dtype,
+                    rtol,
+                    atol,
+                    max_reported,
+                )
+                trailing = _byte_differences(
+                    common_actual[elements:],
+                    common_golden[elements:],
+                    offset + elements,
+                    dtype.itemsize,
+                )
+                count += len(trailing)
+                differences = (differences + trailing)[:max_reported]
+            if differences:
+                return GoldenComparison(
+                    False,
+                    offset + length,
+                    report=_chunk_report(offset, length, count, differences),
+                )
+        offset += length
+        if len(actual) != len(golden):
+            side = "actual" if len(actual) < len(golden) else "golden"
+            return GoldenComparison(
+                False,
+                offset,
+                report=f"{side} ends at byte {offset} before the other, "
+                "data is equal up to there",
+            )
+        if not actual:
+            return GoldenComparison(True, offset)
+
+
+def _chunk_report(
+    offset: int, length: int, count: Optional[int], differences: list[str]
+) -> str:
+    """Bounded report of differences of the chunk at offset."""
+    counted = "" if count is None else f"{count} differences, "
+    return (
+        f"chunk at bytes [{offset}, {offset + length}) differs, {counted}"
+        f"first {len(differences)}: {'; '.join(differences)}"
+    )
@@ -0,0 +1,115 @@
+"""
+Code for the SchemaRegistry of compiled JSON schema validators used by
+AssertiveLoggingObserver to observe JSON valued attributes and LRC payloads,
+e.g. scan configurations and delay models.
+
+Schemas are JSON files in a schema directory, ``{schema_id}.json`` for
+unversioned schemas and ``{schema_id}/{version}.json`` for versioned ones.
+"""
+from __future__ import annotations
+
+import importlib.resources
+import json
+import os
+import pathlib
+import threading
+from typing import Any, Optional
+
+DEFAULT_SCHEMA_DIR = pathlib.Path(
+    str(
+        importlib.resources.files("ska_mid_cbf_common_test_infrastructure")
+        / "data"
+        / "schemas"
+    )
+)
+"""Schema directory of the CTI data directory shipped as package data."""
+
+
+def parse_json_value(value: Any) -> Any:
+    """
+    Parse value if it is a JSON string or bytes, as JSON valued attributes
+    and LRC arguments are, otherwise return it as is.
+
+    :param value: JSON string or bytes, or already parsed value.
+    :returns: parsed value.
+    :raises ValueError: if value is a string but not valid JSON.
+    """
+    if isinstance(value, (str, bytes, bytearray)):
+        return json.loads(value)
+    return value
+
+
+class SchemaRegistry:
+    """
+    Thread safe registry of JSON schema validators compiled once per schema
+    ID and version, so that validating many payloads against a schema does
+    not reload or recompile it.
+    """
+
+    def __init__(
+        self: SchemaRegistry,
+        schema_dir: str | os.PathLike = DEFAULT_SCHEMA_DIR,
+    ):
+        """
+        Initialize a SchemaRegistry instance.
+
+        :param schema_dir: directory to load schemas from.
+        """
+        self.schema_dir = pathlib.Path(schema_dir)
+        self._lock = threading.Lock()
+        self._validators: dict[tuple[str, Optional[str]], Any] = {}
+
+    def schema_path(
+        self: SchemaRegistry, schema_id: str, version: Optional[str] = None
+    ) -> pathlib.Path:
+        """
+        Get path of schema file of schema_id and version.
+
+        :param schema_id: ID of schema.
+        :param version: version of schema, None for an unversioned schema.
+        :returns: path of schema file.
+        """
+        if version is None:
+            return self.schema_dir / f"{schema_id}.json"
+        return self.schema_dir / schema_id / f"{version}.json"
+
+    def validator(
+        self: SchemaRegistry, schema_id: str, version: Optional[str] = None
+    ) -> Any:
+        """
+        Get compiled validator of schema_id and version, loading, checking
+        and compiling the schema on first use.
+
+        :param schema_id: ID of schema.
+        :param version: version of schema, None for an unversioned schema.
+        :returns: jsonschema validator of the schema.
+        :raises FileNotFoundError: if the schema file does not exist.
+        :raises jsonschema.SchemaError: if the schema is invalid.
+        """
+        key = (schema_id, version)
+        with self._lock:
+            validator = self._validators.get(key)
+        if validator is not None:
+            return validator
+
+        # Deferred import so jsonschema is only loaded when schemas are used
+        import jsonschema  # pylint: disable=import-outside-toplevel
+
+        with open(
+            self.schema_path(schema_id, version), encoding="utf-8"
+        ) as schema_file:
+            schema = json.load(schema_file)
+        validator_class = jsonschema.validators.validator_for(schema)
+        validator_class.check_schema(schema)
+        validator = validator_class(schema)
+        with self._lock:
+            return self._validators.setdefault(key, validator)
+
+    def clear(self: SchemaRegistry):
+        """Forget all compiled validators, e.g. after schemas changed."""
+        with self._lock:
+            self._validators.clear()
+
+
+default_schema_registry = SchemaRegistry()
+"""SchemaRegistry of DEFAULT_SCHEMA_DIR shared by observers by default."""
@@ -0,0 +1,155 @@
+"""
+Code for tracking the progress of a long running command (LRC) from
+longRunningCommandProgress and longRunningCommandStatus change events, for
+AssertiveLoggingObserver.observe_lrc_ok stall detection.
+"""
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from .event_store import EventRecord
+from .observation_hooks import ObservationContext
+
+LRC_PROGRESS_ATTR = "longRunningCommandProgress"
+LRC_STATUS_ATTR = "longRunningCommandStatus"
+LRC_RESULT_ATTR = "longRunningCommandResult"
+
+LRC_FAILED_STATUSES = frozenset({"ABORTED", "FAILED", "REJECTED", "NOT_FOUND"})
+"""LRC statuses after which a command will not complete OK."""
+
+
+def lrc_entries(value: Any) -> dict[str, str]:
+    """
+    Parse value of longRunningCommandProgress or longRunningCommandStatus,
+    flattened (command_id, value) pairs, into a dict.
+
+    :param value: attribute value.
+    :returns: dict of value per command ID.
+    """
+    if not isinstance(value, (list, tuple)):
+        return {}
+    return {
+        str(command_id): str(entry)
+        for command_id, entry in zip(value[::2], value[1::2])
+    }
+
+
+def lrc_submitted_sec(command_id: str) -> Optional[float]:
+    """
+    Get submission time of an LRC from its ID, which ska-tango-base prefixes
+    with the time.time() the command was submitted, e.g.
+    1700000000.123_140245_ConfigureScan.
+
+    :param command_id: LRC ID of the command.
+    :returns: submission time, None if command_id has no time prefix.
+    """
+    try:
+        return float(str(command_id).split("_", 1)[0])
+    except ValueError:
+        return None
+
+
+def device_timing(
+    context: ObservationContext, reception_time: Optional[float] = None
+) -> tuple[float, float]:
+    """
+    Get start and end of the device behaviour timed by an ended observation,
+    rather than of the observer waiting for it: from the submission time in
+    the LRC ID of observe_lrc_ok observations, else the start of the
+    observation, to reception of the matched change event, else the end of
+    the observation.
+
+    :param context: context of the ended observation.
+    :param reception_time: time.time() the change event matched by the
+        observation was received, if any.
+    :returns: start and end time.time() of the device behaviour.
+    """
+    start_sec = context.start_sec
+    submitted_sec = lrc_submitted_sec(context.args.get("command_id", ""))
+    if submitted_sec is not None:
+        start_sec = min(submitted_sec, start_sec)
+    end_sec = context.end_sec if reception_time is None else reception_time
+    return start_sec, end_sec
+
+
+class LrcProgress:
+    """
+    Progress and status of one LRC tracked from change events of its device,
+    recording each change as a milestone.
+    """
+
+    def __init__(self: LrcProgress, device_name: str, command_id: str):
+        """
+        Initialize an LrcProgress instance.
+
+        :param device_name: FQDN of device the LRC was issued to.
+        :param command_id: LRC ID of the command.
+        """
+        self.device_name = device_name.lower()
+        self.command_id = command_id
+        self.progress: Optional[str] = None
+        self.status: Optional[str] = None
+        # (reception_time, attribute name, value) of every change
+        self.milestones: list[tuple[float, str, str]] = []
+
+    @property
+    def failed(self: LrcProgress) -> bool:
+        """Whether the LRC status shows it will not complete OK."""
+        return self.status in LRC_FAILED_STATUSES
+
+    def describe(self: LrcProgress) -> str:
+        """Description of the last progress and status for logging."""
+        return f"last progress: {self.progress} | last status: {self.status}"
+
+    def result_of(self: LrcProgress, record: EventRecord) -> Optional[str]:
+        """
+        Get result of the LRC from a change event of the LRC device.
+
+        :param record: change event of any attribute.
+        :returns: result of the LRC if record is a longRunningCommandResult
+            (command_id, result) event of the LRC, else None.
+        """
+        if (
+            record.device_name.lower() != self.device_name
+            or record.attribute_name.lower() != LRC_RESULT_ATTR.lower()
+        ):
+            return None
+        value = record.attribute_value
+        if (
+            not isinstance(value, (list, tuple))
+            or len(value) != 2
+            or str(value[0]) != self.command_id
+        ):
+            return None
+        return str(value[1])
+
+    def update(
+        self: LrcProgress, record: EventRecord
+    ) -> Optional[tuple[float, str, str]]:
+        """
+        Update progress or status with change event of the LRC device.
+
+        :param record: change event of any attribute.
+        :returns: new milestone if record changed progress or status of the
+            LRC, else None.
+        """
+        if record.device_name.lower() != self.device_name:
+            return None
+        attribute_name = record.attribute_name.lower()
+        if attribute_name == LRC_PROGRESS_ATTR.lower():
+            current = self.progress
+        elif attribute_name == LRC_STATUS_ATTR.lower():
+            current = self.status
+        else:
+            return None
+
+        value = lrc_entries(record.attribute_value).get(self.command_id)
+        if value is None or value == current:
+            return None
+        if attribute_name == LRC_PROGRESS_ATTR.lower():
+            self.progress = value
+        else:
+            self.status = value
+        milestone = (record.reception_time, record.attribute_name, value)
+        self.milestones.append(milestone)
+        return milestone
@@ -0,0 +1,121 @@
+"""
+Code for the ObservationCoalescer which collapses repeated identical
+AssertiveLoggingObserver observations, such as those made by polling loops,
+into a single record with a repeat count.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+
+class CoalescedObservation:
+    """
+    Record of an observation message logged once and the number of times and
+    period over which it was observed.
+    """
+
+    __slots__ = ("level", "message", "count", "first_sec", "last_sec")
+
+    def __init__(
+        self: CoalescedObservation, level: int, message: str, now_sec: float
+    ):
+        self.level = level
+        self.message = message
+        self.count = 1
+        self.first_sec = now_sec
+        self.last_sec = now_sec
+
+    def summary(self: CoalescedObservation) -> str:
+        """Message summarizing repeats of the observation."""
+        first = datetime.fromtimestamp(self.first_sec).isoformat(sep=" ")
+        last = datetime.fromtimestamp(self.last_sec).isoformat(sep=" ")
+        return (
+            f"{self.message} (observed {self.count} times between "
+            f"{first} and {last})"
+        )
+
+
+class ObservationCoalescer:
+    """
+    LRU bounded cache of observation messages. The first occurrence of a
+    message is logged as normal while identical repeats are only counted.
+    Repeated observations are logged as one summary line with their repeat
+    count and first/last timestamps when evicted from the cache or flushed.
+    """
+
+    def __init__(
+        self: ObservationCoalescer,
+        logger: logging.Logger,
+        max_entries: int = 1024,
+    ):
+        """
+        Initialize an ObservationCoalescer instance.
+
+        :param logger: logger to log summaries of repeated observations to.
+        :param max_entries: maximum number of distinct observations to track.
+        :raises ValueError: if max_entries is less than 1.
+        """
+        if max_entries < 1:
+            raise ValueError(
+                f"max_entries must be at least 1, got {max_entries}"
+            )
+        self.logger = logger
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._records: OrderedDict[
+            tuple[int, str], CoalescedObservation
+        ] = OrderedDict()
+
+    def should_log(
+        self: ObservationCoalescer, level: int, message: str
+    ) -> bool:
+        """
+        Register an observation message and return whether it should be
+        logged, which is only the case if it is not a repeat of a tracked
+        observation.
+
+        :param level: logging level of the message.
+        :param message: observation message.
+        :returns: True if message is not a repeat and should be logged.
+        """
+        key = (level, message)
+        now_sec = time.time()
+        evicted = None
+        with self._lock:
+            record = self._records.get(key)
+            if record is not None:
+                record.count += 1
+                record.last_sec = now_sec
+                self._records.move_to_end(key)
+                return False
+
+            self._records[key] = CoalescedObservation(level, message, now_sec)
+            if len(self._records) > self.max_entries:
+                _, evicted = self._records.popitem(last=False)
+
+        if evicted is not None and evicted.count > 1:
+            self.logger.log(evicted.level, evicted.summary())
+        return True
+
+    @property
+    def records(self: ObservationCoalescer) -> list[CoalescedObservation]:
+        """Tracked observation records, least recently observed first."""
+        with self._lock:
+            return list(self._records.values())
+
+    def flush(self: ObservationCoalescer):
+        """
+        Log summaries of all tracked repeated observations and stop tracking
+        them.
+        """
+        with self._lock:
+            records = list(self._records.values())
+            self._records.clear()
+
+        for record in records:
+            if record.count > 1:
+                self.logger.log(record.level, record.summary())
@@ -0,0 +1,284 @@
+"""
+Code for composable observation expressions over change events, e.g.
+"READY or FAULT, whichever comes first" or "all of these, unless FAULT",
+evaluated incrementally against the event stream with a shared deadline by
+AssertiveLoggingObserver.observe_expression.
+
+Example::
+
+    observer.observe_expression(
+        all_of(
+            change_event(fsp, "obsState", ObsState.READY),
+            change_event(vcc, "obsState", ObsState.READY),
+            not_within(change_event(fsp, "obsState", ObsState.FAULT)),
+        ),
+        timeout_sec=30,
+    )
+"""
+from __future__ import annotations
+
+import abc
+import time
+from typing import Any, Optional
+
+from .event_store import EventCursor, EventRecord
+
+
+class ObservationExpression(abc.ABC):
+    """
+    Expression over change events which is decided incrementally. Once an
+    expression is decided, i.e. its result is True or False, its result no
+    longer changes. Expressions undecided at the deadline are decided by
+    finish.
+    """
+
+    def __init__(self: ObservationExpression):
+        self.result: Optional[bool] = None
+
+    def reset(self: ObservationExpression):
+        """Reset expression to undecided for a new evaluation."""
+        self.result = None
+
+    def update(self: ObservationExpression, record: EventRecord) -> bool:
+        """
+        Update expression with the next change event.
+
+        :param record: next change event.
+        :returns: whether the expression is decided.
+        """
+        if self.result is None:
+            self.result = self._update(record)
+        return self.result is not None
+
+    def finish(self: ObservationExpression) -> bool:
+        """
+        Decide expression at the deadline if it is undecided.
+
+        :returns: result of the expression.
+        """
+        if self.result is None:
+            self.result = self._finish()
+        return self.result
+
+    @abc.abstractmethod
+    def _update(
+        self: ObservationExpression, record: EventRecord
+    ) -> Optional[bool]:
+        """Result of expression after record, None if still undecided."""
+
+    @abc.abstractmethod
+    def _finish(self: ObservationExpression) -> bool:
+        """Result of undecided expression at the deadline."""
+
+    @abc.abstractmethod
+    def describe(self: ObservationExpression) -> str:
+        """Description of the expression for logging."""
+
+
+class _ChangeEvent(ObservationExpression):
+    """Expression true once a matching change event is received."""
+
+    def __init__(
+        self: _ChangeEvent,
+        device_name: str,
+        attribute_name: str,
+        attribute_value: Any,
+    ):
+        super().__init__()
+        self.device_name = device_name
+        self.attribute_name = attribute_name
+        self.attribute_value = attribute_value
+
+    def _update(self: _ChangeEvent, record: EventRecord) -> Optional[bool]:
+        if record.matches(
+            self.device_name, self.attribute_name, self.attribute_value
+        ):
+            return True
+        return None
+
+    def _finish(self: _ChangeEvent) -> bool:
+        return False
+
+    def describe(self: _ChangeEvent) -> str:
+        return (
+            f"{self.device_name}/{self.attribute_name} == "
+            f"{self.attribute_value}"
+        )
+
+
+class _AnyOf(ObservationExpression):
+    """Expression true once any operand is true."""
+
+    def __init__(self: _AnyOf, operands: tuple[ObservationExpression, ...]):
+        super().__init__()
+        self.operands = operands
+
+    def reset(self: _AnyOf):
+        super().reset()
+        for operand in self.operands:
+            operand.reset()
+
+    def _update(self: _AnyOf, record: EventRecord) -> Optional[bool]:
+        for operand in self.operands:
+            if operand.update(record) and operand.result:
+                return True
+        if all(operand.result is False for operand in self.operands):
+            return False
+        return None
+
+    def _finish(self: _AnyOf) -> bool:
+        # Finish all operands so their results can be reported
+        return any([operand.finish() for operand in self.operands])
+
+    def describe(self: _AnyOf) -> str:
+        return f"any_of({', '.join(op.describe() for op in self.operands)})"
+
+
+class _AllOf(ObservationExpression):
+    """
+    Expression true once all operands are true, false once any is false.
+
+    not_within operands are guards: once all other operands are true the
+    expression is true if no guard has been false so far, rather than
+    waiting for the guards to be decided at the deadline.
+    """
+
+    def __init__(self: _AllOf, operands: tuple[ObservationExpression, ...]):
+        super().__init__()
+        self.operands = operands
+        self._positives = tuple(
+            operand
+            for operand in operands
+            if not isinstance(operand, _NotWithin)
+        )
+
+    def reset(self: _AllOf):
+        super().reset()
+        for operand in self.operands:
+            operand.reset()
+
+    def _update(self: _AllOf, record: EventRecord) -> Optional[bool]:
+        for operand in self.operands:
+            if operand.update(record) and not operand.result:
+                return False
+        # With only guards, the expression is decided at the deadline
+        if self._positives and all(
+            operand.result for operand in self._positives
+        ):
+            return True
+        if all(operand.result for operand in self.operands):
+            return True
+        return None
+
+    def _finish(self: _AllOf) -> bool:
+        return all([operand.finish() for operand in self.operands])
+
+    def describe(self: _AllOf) -> str:
+        return f"all_of({', '.join(op.describe() for op in self.operands)})"
+
+
+class _NotWithin(ObservationExpression):
+    """
+    Expression false once its operand is true, true if the operand is not
+    true by the deadline.
+    """
+
+    def __init__(self: _NotWithin, operand: ObservationExpression):
+        super().__init__()
+        self.operand = operand
+
+    def reset(self: _NotWithin):
+        super().reset()
+        self.operand.reset()
+
+    def _update(self: _NotWithin, record: EventRecord) -> Optional[bool]:
+        if self.operand.update(record):
+            return not self.operand.result
+        return None
+
+    def _finish(self: _NotWithin) -> bool:
+        return not self.operand.finish()
+
+    def describe(self: _NotWithin) -> str:
+        return f"not_within({self.operand.describe()})"
+
+
+def change_event(
+    device_name: str, attribute_name: str, attribute_value: Any
+) -> ObservationExpression:
+    """
+    Expression true once a change event of attribute_name of device_name to
+    attribute_value is received, false if none is by the deadline.
+
+    :param device_name: FQDN of device of the event.
+    :param attribute_name: attribute of the event.
+    :param attribute_value: attribute value of the event.
+    :returns: change event expression.
+    """
+    return _ChangeEvent(device_name, attribute_name, attribute_value)
+
+
+def any_of(*operands: ObservationExpression) -> ObservationExpression:
+    """
+    Expression true as soon as any operand is true, e.g. READY or FAULT
+    whichever comes first, false once all operands are false.
+
+    :param operands: expressions to combine.
+    :returns: any_of expression.
+    :raises ValueError: if no operands are given.
+    """
+    if not operands:
+        raise ValueError("any_of needs at least one operand")
+    return _AnyOf(operands)
+
+
+def all_of(*operands: ObservationExpression) -> ObservationExpression:
+    """
+    Expression true once all operands are true, false as soon as any
+    operand is false, e.g. a not_within operand seeing FAULT. not_within
+    operands guard the others, i.e. the expression is true as soon as all
+    other operands are true without any guard having been false.
+
+    :param operands: expressions to combine.
+    :returns: all_of expression.
+    :raises ValueError: if no operands are given.
+    """
+    if not operands:
+        raise ValueError("all_of needs at least one operand")
+    return _AllOf(operands)
+
+
+def not_within(operand: ObservationExpression) -> ObservationExpression:
+    """
+    Expression false as soon as operand is true, true if operand is not true
+    by the deadline.
+
+    :param operand: expression which must not become true.
+    :returns: not_within expression.
+    """
+    return _NotWithin(operand)
+
+
+def evaluate(
+    expression: ObservationExpression,
+    cursor: EventCursor,
+    timeout_sec: float,
+) -> tuple[bool, Optional[EventRecord]]:
+    """
+    Evaluate expression incrementally over the records of cursor until it is
+    decided or timeout_sec passes.
+
+    :param expression: expression to evaluate, reset before evaluation.
+    :param cursor: cursor over change events to evaluate against.
+    :param timeout_sec: shared deadline of all subexpressions (seconds).
+    :returns: result of expression and the change event which decided it,
+        None if decided at the deadline.
+    """
+    expression.reset()
+    deadline = time.monotonic() + timeout_sec
+    while True:
+        for record in cursor.next_records(deadline - time.monotonic()):
+            if expression.update(record):
+                return expression.result, record
+        if time.monotonic() >= deadline:
+            return expression.finish(), None
@@ -0,0 +1,91 @@
+"""
+Code for ObservationHooks which instrument AssertiveLoggingObserver
+observations, e.g. for tracing, profiling or metrics, without subclassing the
+observer.
+"""
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from .event_store import EventRecord
+
+
+class ObservationContext:
+    """
+    Context of one observation passed to the ObservationHooks of an
+    AssertiveLoggingObserver, from the start to the end of the observation.
+    Hooks may store their own state for the observation in state.
+    """
+
+    __slots__ = (
+        "function_name",
+        "start_sec",
+        "end_sec",
+        "passed",
+        "args",
+        "state",
+        "hooks",
+    )
+
+    def __init__(
+        self: ObservationContext,
+        function_name: str,
+        start_sec: float,
+        args: dict[str, Any],
+        hooks: tuple[ObservationHook, ...] = (),
+    ):
+        """
+        Initialize an ObservationContext instance.
+
+        :param function_name: name of observation, e.g. observe_lrc_ok.
+        :param start_sec: time.time() the observation started.
+        :param args: details of the observation, e.g. device and attr.
+        :param hooks: hooks of the observer when the observation started,
+            which the whole observation is dispatched to.
+        """
+        self.function_name = function_name
+        self.start_sec = start_sec
+        self.end_sec: Optional[float] = None
+        self.passed: Optional[bool] = None
+        self.args = args
+        self.state: dict[Any, Any] = {}
+        self.hooks = hooks
+
+
+class ObservationHook:
+    """
+    Base class of hooks called by AssertiveLoggingObserver around its
+    observations, see AssertiveLoggingObserver.add_hook. All methods do
+    nothing by default, so hooks only override the ones they need. Hooks are
+    called from the thread making the observation and exceptions they raise
+    propagate to the observation.
+    """
+
+    def on_observation_start(
+        self: ObservationHook, context: ObservationContext
+    ):
+        """
+        Called when an observation starts.
+
+        :param context: context of the observation.
+        """
+
+    def on_event_matched(
+        self: ObservationHook,
+        context: ObservationContext,
+        record: EventRecord,
+    ):
+        """
+        Called when an observation waiting on change events matches one.
+
+        :param context: context of the observation.
+        :param record: matched change event.
+        """
+
+    def on_observation_end(self: ObservationHook, context: ObservationContext):
+        """
+        Called when an observation ends, with end_sec and passed set in
+        context, before its result is logged.
+
+        :param context: context of the observation.
+        """
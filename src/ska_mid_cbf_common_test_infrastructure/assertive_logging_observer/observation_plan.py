@@ -0,0 +1,402 @@
+"""
+Code for declarative observation plans, which describe expected attribute
+change sequences, value tolerances and long running command (LRC) timeouts
+per device class in YAML or JSON files (e.g. shared in the CTI data
+directory), and are compiled once into expectations which are waited on
+together by AssertiveLoggingObserver.observe_plan.
+
+Example plan::
+
+    timeout_sec: 30
+    device_classes:
+      fsp:
+        sequences:
+          obsState: [CONFIGURING, READY]
+        tolerances:
+          delayModelValidity: {value: 10.0, abs_tol: 0.5}
+        lrc_timeouts_sec:
+          ConfigureScan: 60
+"""
+from __future__ import annotations
+
+import abc
+import hashlib
+import json
+import math
+import os
+import threading
+from typing import Any, Callable, Optional
+
+from .event_store import EventRecord, values_equal
+
+PLAN_SCHEMA = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "title": "ALO observation plan",
+    "type": "object",
+    "required": ["device_classes"],
+    "additionalProperties": False,
+    "properties": {
+        "timeout_sec": {"type": "number", "exclusiveMinimum": 0},
+        "device_classes": {
+            "type": "object",
+            "additionalProperties": {
+                "type": "object",
+                "additionalProperties": False,
+                "properties": {
+                    "timeout_sec": {"type": "number", "exclusiveMinimum": 0},
+                    "sequences": {
+                        "type": "object",
+                        "additionalProperties": {
+                            "type": "array",
+                            "minItems": 1,
+                        },
+                    },
+                    "tolerances": {
+                        "type": "object",
+                        "additionalProperties": {
+                            "type": "object",
+                            "required": ["value"],
+                            "additionalProperties": False,
+                            "properties": {
+                                "value": {"type": "number"},
+                                "abs_tol": {"type": "number", "minimum": 0},
+                                "rel_tol": {"type": "number", "minimum": 0},
+                            },
+                        },
+                    },
+                    "lrc_timeouts_sec": {
+                        "type": "object",
+                        "additionalProperties": {
+                            "type": "number",
+                            "exclusiveMinimum": 0,
+                        },
+                    },
+                },
+            },
+        },
+    },
+}
+"""JSON schema observation plans are validated against."""
+
+DEFAULT_TIMEOUT_SEC = 10.0
+"""Timeout of expectations of plans which do not specify one."""
+
+_compiled_plans: dict[str, ObservationPlan] = {}
+_compiled_plans_lock = threading.Lock()
+_plan_validator = None
+
+
+def _value_matches(value: Any, expected: Any) -> bool:
+    """
+    Whether attribute value matches expected plan value. Plan strings also
+    match enum values by name or string, e.g. "ON" matches DevState.ON.
+    """
+    if values_equal(value, expected):
+        return True
+    if isinstance(expected, str):
+        return getattr(value, "name", None) == expected or (
+            str(value) == expected
+        )
+    return False
+
+
+class Expectation(abc.ABC):
+    """
+    Expectation on change events of an attribute of a device, matched
+    incrementally against events in order of reception.
+    """
+
+    def __init__(
+        self: Expectation,
+        device_name: str,
+        attribute_name: str,
+        timeout_sec: float,
+    ):
+        self.device_name = device_name
+        self.attribute_name = attribute_name
+        self.timeout_sec = timeout_sec
+        self.satisfied = False
+        self.matched_record: Optional[EventRecord] = None
+
+    @property
+    def key(self: Expectation) -> tuple[str, str]:
+        """Lowercase (device_name, attribute_name) the expectation is on."""
+        return (self.device_name.lower(), self.attribute_name.lower())
+
+    @abc.abstractmethod
+    def update(self: Expectation, record: EventRecord):
+        """
+        Update expectation with a change event of its attribute, setting
+        satisfied and matched_record once it is met.
+        """
+
+    @abc.abstractmethod
+    def describe(self: Expectation) -> str:
+        """Description of the expectation for logging."""
+
+
+class SequenceExpectation(Expectation):
+    """
+    Expectation that an attribute takes a sequence of values in order, other
+    values may occur in between.
+    """
+
+    def __init__(
+        self: SequenceExpectation,
+        device_name: str,
+        attribute_name: str,
+        timeout_sec: float,
+        values: list[Any],
+    ):
+        super().__init__(device_name, attribute_name, timeout_sec)
+        self.values = values
+        self._next = 0
+
+    def update(self: SequenceExpectation, record: EventRecord):
+        if self.satisfied:
+            return
+        if _value_matches(record.attribute_value, self.values[self._next]):
+            self._next += 1
+            if self._next == len(self.values):
+                self.satisfied = True
+                self.matched_record = record
+
+    def describe(self: SequenceExpectation) -> str:
+        return (
+            f"device: {self.device_name} | "
+            f"attr: {self.attribute_name} | "
+            f"sequence: {self.values} | "
+            f"within timeout: {self.timeout_sec}s"
+        )
+
+
+class ToleranceExpectation(Expectation):
+    """
+    Expectation that a numeric attribute takes a value within an absolute
+    and/or relative tolerance of a target value.
+    """
+
+    def __init__(
+        self: ToleranceExpectation,
+        device_name: str,
+        attribute_name: str,
+        timeout_sec: float,
+        value: float,
+        abs_tol: float = 0.0,
+        rel_tol: float = 0.0,
+    ):
+        super().__init__(device_name, attribute_name, timeout_sec)
+        self.value = value
+        self.abs_tol = abs_tol
+        self.rel_tol = rel_tol
+
+    def update(self: ToleranceExpectation, record: EventRecord):
+        if self.satisfied:
+            return
+        try:
+            within = math.isclose(
+                float(record.attribute_value),
+                self.value,
+                rel_tol=self.rel_tol,
+                abs_tol=self.abs_tol,
+            )
+        except (TypeError, ValueError):
+            return
+        if within:
+            self.satisfied = True
+            self.matched_record = record
+
+    def describe(self: ToleranceExpectation) -> str:
+        return (
+            f"device: {self.device_name} | "
+            f"attr: {self.attribute_name} | "
+            f"value: {self.value} (abs_tol: {self.abs_tol}, "
+            f"rel_tol: {self.rel_tol}) | "
+            f"within timeout: {self.timeout_sec}s"
+        )
+
+
+class DeviceClassPlan:
+    """
+    Compiled plan of one device class.
+    """
+
+    def __init__(
+        self: DeviceClassPlan, name: str, spec: dict, default_timeout: float
+    ):
+        self.name = name
+        self.timeout_sec = spec.get("timeout_sec", default_timeout)
+        self.sequences: dict[str, list[Any]] = dict(spec.get("sequences", {}))
+        self.tolerances: dict[str, dict] = dict(spec.get("tolerances", {}))
+        self.lrc_timeouts_sec: dict[str, float] = dict(
+            spec.get("lrc_timeouts_sec", {})
+        )
+
+    def event_filters(
+        self: DeviceClassPlan,
+    ) -> dict[str, Optional[Callable[[Any], bool]]]:
+        """
+        Subscription event filters of attributes with expectations in this
+        plan. Sequence attributes only need events of values in their
+        sequence, while tolerance attributes need all events.
+
+        :returns: event filter, or None for no filter, per attribute name.
+        """
+        event_filters: dict[str, Optional[Callable[[Any], bool]]] = {
+            attr_name: (
+                lambda value, values=tuple(values): any(
+                    _value_matches(value, expected) for expected in values
+                )
+            )
+            for attr_name, values in self.sequences.items()
+        }
+        event_filters.update(
+            {attr_name: None for attr_name in self.tolerances}
+        )
+        return event_filters
+
+    def expectations(
+        self: DeviceClassPlan, device_name: str
+    ) -> list[Expectation]:
+        """
+        Make fresh expectations of this plan for device_name.
+
+        :param device_name: FQDN of a device of this class.
+        :returns: list of expectations.
+        """
+        expectations: list[Expectation] = [
+            SequenceExpectation(
+                device_name, attr_name, self.timeout_sec, list(values)
+            )
+            for attr_name, values in self.sequences.items()
+        ]
+        expectations.extend(
+            ToleranceExpectation(
+                device_name,
+                attr_name,
+                self.timeout_sec,
+                tolerance["value"],
+                tolerance.get("abs_tol", 0.0),
+                tolerance.get("rel_tol", 0.0),
+            )
+            for attr_name, tolerance in self.tolerances.items()
+        )
+        return expectations
+
+
+class ObservationPlan:
+    """
+    Observation plan compiled from a validated plan document.
+    """
+
+    def __init__(self: ObservationPlan, document: dict, content_hash: str):
+        """
+        Initialize an ObservationPlan instance from a validated document.
+
+        :param document: plan document validated against PLAN_SCHEMA.
+        :param content_hash: sha256 hex digest of the plan file content.
+        """
+        self.content_hash = content_hash
+        default_timeout = document.get("timeout_sec", DEFAULT_TIMEOUT_SEC)
+        self.device_classes = {
+            name: DeviceClassPlan(name, spec, default_timeout)
+            for name, spec in document["device_classes"].items()
+        }
+
+    def lrc_timeout(
+        self: ObservationPlan,
+        device_class: str,
+        lrc_cmd_name: str,
+        default: Optional[float] = None,
+    ) -> float:
+        """
+        Get LRC timeout of lrc_cmd_name for device_class from the plan.
+
+        :param device_class: device class name in the plan.
+        :param lrc_cmd_name: basic command name of LRC.
+        :param default: timeout to return if plan has none for the command.
+        :returns: LRC timeout (seconds).
+        :raises KeyError: if plan has no timeout and no default is given.
+        """
+        timeouts = self.device_classes[device_class].lrc_timeouts_sec
+        if lrc_cmd_name in timeouts:
+            return timeouts[lrc_cmd_name]
+        if default is None:
+            raise KeyError(
+                f"No LRC timeout for {lrc_cmd_name} of {device_class}"
+            )
+        return default
+
+    def expectations(
+        self: ObservationPlan, devices: dict[str, list[str]]
+    ) -> list[Expectation]:
+        """
+        Make fresh expectations of the plan for given devices.
+
+        :param devices: device FQDNs per device class name in the plan.
+        :returns: list of expectations.
+        :raises KeyError: if a device class is not in the plan.
+        """
+        return [
+            expectation
+            for device_class, device_names in devices.items()
+            for device_name in device_names
+            for expectation in self.device_classes[device_class].expectations(
+                device_name
+            )
+        ]
+
+
+def _validate(document: Any):
+    """
+    Validate plan document against PLAN_SCHEMA, with the validator compiled
+    once per process.
+
+    :raises jsonschema.ValidationError: if document is invalid.
+    """
+    global _plan_validator  # pylint: disable=global-statement
+    if _plan_validator is None:
+        import jsonschema  # pylint: disable=import-outside-toplevel
+
+        _plan_validator = jsonschema.Draft7Validator(PLAN_SCHEMA)
+    _plan_validator.validate(document)
+
+
+def _parse(content: bytes, path: str) -> Any:
+    """Parse plan content as YAML if path has a YAML suffix, else JSON."""
+    if path.endswith((".yaml", ".yml")):
+        try:
+            import yaml  # pylint: disable=import-outside-toplevel
+        except ImportError as exception:
+            raise ImportError(
+                "PyYAML is required to load YAML observation plans"
+            ) from exception
+        return yaml.safe_load(content)
+    return json.loads(content)
+
+
+def load_observation_plan(path: str | os.PathLike) -> ObservationPlan:
+    """
+    Load, validate and compile observation plan at path, a YAML (.yaml/.yml)
+    or JSON file. Compiled plans are cached by content hash, so loading the
+    same plan again, from any path, only costs reading and hashing the file.
+
+    :param path: path to plan file.
+    :returns: compiled ObservationPlan.
+    :raises jsonschema.ValidationError: if plan does not match PLAN_SCHEMA.
+    """
+    path = os.fspath(path)
+    with open(path, "rb") as plan_file:
+        content = plan_file.read()
+    content_hash = hashlib.sha256(content).hexdigest()
+
+    with _compiled_plans_lock:
+        plan = _compiled_plans.get(content_hash)
+    if plan is not None:
+        return plan
+
+    document = _parse(content, path)
+    _validate(document)
+    plan = ObservationPlan(document, content_hash)
+    with _compiled_plans_lock:
+        return _compiled_plans.setdefault(content_hash, plan)
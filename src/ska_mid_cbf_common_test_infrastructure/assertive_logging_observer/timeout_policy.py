@@ -0,0 +1,31 @@
+"""
+Code for TimeoutPolicies which choose the timeouts of AssertiveLoggingObserver
+event waiting observations, e.g. adaptively from historical latencies.
+"""
+from __future__ import annotations
+
+
+class TimeoutPolicy:
+    """
+    Base class of policies choosing timeouts of observe_device_attr_change
+    and observe_lrc_ok, see AssertiveLoggingObserver timeout_policy. The base
+    policy keeps the timeouts given to observations.
+    """
+
+    def timeout_sec(
+        self: TimeoutPolicy,
+        observation: str,
+        device_name: str,
+        key: str,
+        timeout_sec: float,
+    ) -> float:
+        """
+        Choose timeout of an observation.
+
+        :param observation: name of observation, e.g. observe_lrc_ok.
+        :param device_name: FQDN of observed device.
+        :param key: observed attribute name or LRC command name.
+        :param timeout_sec: timeout given to the observation (seconds).
+        :returns: timeout to use (seconds).
+        """
+        return timeout_sec
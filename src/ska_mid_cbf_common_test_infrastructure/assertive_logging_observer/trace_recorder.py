@@ -0,0 +1,285 @@
+"""
+Code for the ChromeTraceRecorder which streams a timeline of
+AssertiveLoggingObserver observations, received change events and long
+running commands to a file in Chrome Trace Event format, viewable in
+chrome://tracing or https://ui.perfetto.dev.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Any, Optional
+
+from .event_store import EventRecord
+from .lrc_progress import device_timing
+from .observation_hooks import ObservationContext, ObservationHook
+
+OBSERVATION_CATEGORY = "observation"
+EVENT_CATEGORY = "change_event"
+LRC_CATEGORY = "lrc"
+
+_OBSERVATIONS_TID = 0
+_MAX_ARG_LENGTH = 200
+
+
+def _now_us() -> int:
+    """Wall clock time in microseconds, the Chrome trace time unit."""
+    return time.time_ns() // 1000
+
+
+def _to_us(timestamp_sec: float) -> int:
+    """Convert time.time() style timestamp to microseconds."""
+    return int(timestamp_sec * 1e6)
+
+
+def _trace_arg(value: Any) -> Any:
+    """Make given value JSON serializable and bounded in size."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    value_str = str(value)
+    if len(value_str) > _MAX_ARG_LENGTH:
+        return f"{value_str[:_MAX_ARG_LENGTH]}..."
+    return value_str
+
+
+class ChromeTraceRecorder(ObservationHook):
+    """
+    Streams trace events in Chrome Trace Event JSON array format to a file.
+    Observations are recorded as an ObservationHook of the observer.
+
+    Observations are recorded as complete spans on an "observations" track,
+    change events as instant events on one track per device, and long running
+    commands as async spans from submission to result. Events are written
+    through a buffered file as they are recorded so that long test runs do
+    not hold the timeline in memory, call close (or use as a context manager)
+    to terminate the JSON array. Files of runs which did not close are still
+    readable by trace viewers.
+    """
+
+    def __init__(
+        self: ChromeTraceRecorder,
+        path: str | os.PathLike,
+        buffer_size: int = 1 << 20,
+    ):
+        """
+        Initialize a ChromeTraceRecorder instance writing to path.
+
+        :param path: file to write trace to, overwritten if it exists.
+        :param buffer_size: size of write buffer in bytes.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(  # pylint: disable=consider-using-with
+            path, "w", encoding="utf-8", buffering=buffer_size
+        )
+        self._file.write("[\n")
+        self._first_event = True
+        self._pid = os.getpid()
+        self._device_tids: dict[str, int] = {}
+        self._write_event(
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": self._pid,
+                "tid": _OBSERVATIONS_TID,
+                "args": {"name": "observations"},
+            }
+        )
+
+    def __enter__(self: ChromeTraceRecorder) -> ChromeTraceRecorder:
+        return self
+
+    def __exit__(self: ChromeTraceRecorder, *exc_info):
+        self.close()
+
+    @property
+    def closed(self: ChromeTraceRecorder) -> bool:
+        """Whether the recorder has been closed."""
+        return self._file.closed
+
+    def close(self: ChromeTraceRecorder):
+        """
+        Terminate the trace JSON array and close the trace file.
+        """
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write("\n]\n")
+            self._file.close()
+
+    def _write_event(self: ChromeTraceRecorder, trace_event: dict):
+        """Write given trace event, must be called holding _lock."""
+        if self._file.closed:
+            return
+        if not self._first_event:
+            self._file.write(",\n")
+        self._first_event = False
+        self._file.write(json.dumps(trace_event, separators=(",", ":")))
+
+    def _device_tid(self: ChromeTraceRecorder, device_name: str) -> int:
+        """
+        Get track id of given device, naming the track on first use. Must be
+        called holding _lock.
+        """
+        tid = self._device_tids.get(device_name)
+        if tid is None:
+            tid = len(self._device_tids) + 1
+            self._device_tids[device_name] = tid
+            self._write_event(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": self._pid,
+                    "tid": tid,
+                    "args": {"name": device_name},
+                }
+            )
+        return tid
+
+    def on_event_matched(
+        self: ChromeTraceRecorder,
+        context: ObservationContext,
+        record: EventRecord,
+    ):
+        """
+        Keep reception time of the change event matched by observation.
+
+        :param context: context of the observation.
+        :param record: matched change event.
+        """
+        context.state[self] = record.reception_time
+
+    def on_observation_end(
+        self: ChromeTraceRecorder, context: ObservationContext
+    ):
+        """
+        Record ended observation, and the long running command of
+        observe_lrc_ok observations. LRC IDs generated by ska-tango-base are
+        prefixed with their submission time, which is used as the start of
+        the LRC span where available. The LRC span ends at the reception of
+        its result, else at the end of the observation.
+
+        :param context: context of the observation.
+        """
+        self.record_observation(
+            context.function_name,
+            context.start_sec,
+            context.end_sec,
+            context.passed,
+            **context.args,
+        )
+        if context.function_name != "observe_lrc_ok":
+            return
+
+        start_sec, end_sec = device_timing(context, context.state.get(self))
+        self.record_lrc(
+            context.args["device"],
+            context.args["command_id"],
+            start_sec,
+            end_sec,
+            context.passed,
+        )
+
+    def record_observation(
+        self: ChromeTraceRecorder,
+        name: str,
+        start_sec: float,
+        end_sec: float,
+        passed: bool,
+        **args: Any,
+    ):
+        """
+        Record an observation as a span on the observations track.
+
+        :param name: name of observation, e.g. observe_lrc_ok.
+        :param start_sec: time.time() the observation started.
+        :param end_sec: time.time() the observation finished.
+        :param passed: whether the observation passed.
+        :param args: additional details of the observation to record.
+        """
+        trace_args = {key: _trace_arg(value) for key, value in args.items()}
+        trace_args["result"] = "PASS" if passed else "FAIL"
+        with self._lock:
+            self._write_event(
+                {
+                    "name": name,
+                    "cat": OBSERVATION_CATEGORY,
+                    "ph": "X",
+                    "ts": _to_us(start_sec),
+                    "dur": max(_to_us(end_sec) - _to_us(start_sec), 0),
+                    "pid": self._pid,
+                    "tid": _OBSERVATIONS_TID,
+                    "args": trace_args,
+                }
+            )
+
+    def record_change_event(
+        self: ChromeTraceRecorder,
+        device_name: str,
+        attr_name: str,
+        attr_value: Any,
+        timestamp_sec: Optional[float] = None,
+    ):
+        """
+        Record a received change event as an instant event on the track of
+        its device.
+
+        :param device_name: name of device the event is from.
+        :param attr_name: name of attribute the event is for.
+        :param attr_value: value of attribute in the event.
+        :param timestamp_sec: time.time() the event was received, defaults to
+            now.
+        """
+        ts = _now_us() if timestamp_sec is None else _to_us(timestamp_sec)
+        with self._lock:
+            self._write_event(
+                {
+                    "name": attr_name,
+                    "cat": EVENT_CATEGORY,
+                    "ph": "i",
+                    "s": "t",
+                    "ts": ts,
+                    "pid": self._pid,
+                    "tid": self._device_tid(device_name),
+                    "args": {"value": _trace_arg(attr_value)},
+                }
+            )
+
+    def record_lrc(
+        self: ChromeTraceRecorder,
+        device_name: str,
+        command_id: str,
+        start_sec: float,
+        end_sec: float,
+        passed: bool,
+    ):
+        """
+        Record a long running command as an async span from submission to
+        result on the track of its device.
+
+        :param device_name: name of device the command was issued to.
+        :param command_id: LRC ID of the command.
+        :param start_sec: time.time() the command was submitted.
+        :param end_sec: time.time() the command result was observed.
+        :param passed: whether the command completed OK.
+        """
+        with self._lock:
+            tid = self._device_tid(device_name)
+            common = {
+                "name": command_id,
+                "cat": LRC_CATEGORY,
+                "id": command_id,
+                "pid": self._pid,
+                "tid": tid,
+            }
+            self._write_event({**common, "ph": "b", "ts": _to_us(start_sec)})
+            self._write_event(
+                {
+                    **common,
+                    "ph": "e",
+                    "ts": _to_us(end_sec),
+                    "args": {"result": "OK" if passed else "NOT OK"},
+                }
+            )
@@ -0,0 +1,38 @@
+"""
+The latency_history service keeps a persistent local history of
+AssertiveLoggingObserver observation latencies in a SQLite LatencyHistory,
+keyed by git SHA, test ID, device class and command, recorded by a
+LatencyRecorder observation hook. detect_regressions, also run as
+``python -m ska_mid_cbf_common_test_infrastructure.latency_history``, flags
+statistically significant slowdowns of a git SHA against a rolling baseline
+of previous git SHAs, so that releases slowing down Mid.CBF command handling
+are caught without any external service. An AdaptiveTimeoutPolicy derives
+observation timeouts from the recorded latencies.
+
+Example::
+
+    history = LatencyHistory("build/latency_history.sqlite")
+    recorder = LatencyRecorder(history)
+    observer.add_hook(recorder)
+    ...  # observations
+    recorder.close()
+
+    observer = AssertiveLoggingObserver(
+        mode, logger, timeout_policy=AdaptiveTimeoutPolicy(history)
+    )
+"""
+
+from .adaptive_timeouts import AdaptiveTimeoutPolicy, quantile  # noqa: F401
+from .recorder import (  # noqa: F401
+    RECORDED_OBSERVATIONS,
+    LatencyRecorder,
+    current_git_sha,
+    current_test_id,
+    device_family,
+)
+from .regression import (  # noqa: F401
+    Regression,
+    detect_regressions,
+    mann_whitney_greater,
+)
+from .store import LatencyHistory, LatencyKey, LatencyRecord  # noqa: F401
@@ -0,0 +1,76 @@
+"""
+Report latency regressions of a git SHA in a LatencyHistory database, exiting
+with status 1 if any are found so that CI jobs fail on regressions.
+
+Usage::
+
+    python -m ska_mid_cbf_common_test_infrastructure.latency_history \\
+        build/latency_history.sqlite --git-sha $CI_COMMIT_SHA
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import Optional
+
+from .regression import detect_regressions
+from .store import LatencyHistory
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Run the regression report.
+
+    :param argv: command line arguments, defaults to sys.argv[1:].
+    :returns: exit status, 1 if regressions were found.
+    """
+    parser = argparse.ArgumentParser(
+        prog=f"python -m {__package__}",
+        description="Report observation latency regressions of a git SHA "
+        "against a rolling baseline of previous git SHAs.",
+    )
+    parser.add_argument("database", help="LatencyHistory SQLite database")
+    parser.add_argument(
+        "--git-sha", help="git SHA to check, defaults to the latest recorded"
+    )
+    parser.add_argument(
+        "--baseline-shas",
+        type=int,
+        default=10,
+        help="number of preceding git SHAs forming the baseline",
+    )
+    parser.add_argument(
+        "--alpha", type=float, default=0.01, help="significance level"
+    )
+    parser.add_argument(
+        "--min-samples",
+        type=int,
+        default=5,
+        help="minimum samples of git SHA and baseline to test a key",
+    )
+    args = parser.parse_args(argv)
+
+    with LatencyHistory(args.database) as history:
+        try:
+            regressions = detect_regressions(
+                history,
+                args.git_sha,
+                baseline_shas=args.baseline_shas,
+                alpha=args.alpha,
+                min_samples=args.min_samples,
+            )
+        except ValueError as exception:
+            print(exception, file=sys.stderr)
+            return 2
+
+    if not regressions:
+        print("No latency regressions found")
+        return 0
+    print(f"{len(regressions)} latency regressions found:")
+    for regression in regressions:
+        print(f"- {regression.describe()}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
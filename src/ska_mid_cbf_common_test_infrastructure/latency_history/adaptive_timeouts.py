@@ -0,0 +1,128 @@
+"""
+Code for the AdaptiveTimeoutPolicy which derives AssertiveLoggingObserver
+timeouts from latencies recorded in a LatencyHistory.
+"""
+from __future__ import annotations
+
+import math
+import threading
+from typing import Callable, Optional
+
+from ..assertive_logging_observer import TimeoutPolicy
+from .recorder import device_family
+from .store import LatencyHistory, LatencyKey
+
+
+def quantile(values: list[float], fraction: float) -> float:
+    """
+    Quantile of values by linear interpolation between closest ranks.
+
+    :param values: non empty values.
+    :param fraction: quantile fraction in [0, 1], e.g. 0.999 for p99.9.
+    :returns: quantile of values.
+    """
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (
+        position - lower
+    )
+
+
+class AdaptiveTimeoutPolicy(TimeoutPolicy):
+    """
+    TimeoutPolicy choosing the timeout of an observation of a (device class,
+    attribute or command) key as the quantile of its passed latencies in the
+    last baseline_shas git SHAs of a LatencyHistory times margin, bounded by
+    floor_sec and ceiling_sec. Keys with fewer than min_samples recorded
+    latencies keep the timeout given to the observation.
+
+    Latencies are device latencies as recorded by LatencyRecorder, which
+    skips attribute observations satisfied by events received before they
+    started, so that such observations do not shrink timeouts to floor_sec.
+
+    Latencies are loaded from the history once, call refresh to reload them.
+    """
+
+    def __init__(
+        self: AdaptiveTimeoutPolicy,
+        history: LatencyHistory,
+        fraction: float = 0.999,
+        margin: float = 1.5,
+        floor_sec: float = 1.0,
+        ceiling_sec: Optional[float] = None,
+        min_samples: int = 20,
+        baseline_shas: int = 10,
+        device_class_of: Callable[[str], str] = device_family,
+    ):
+        """
+        Initialize an AdaptiveTimeoutPolicy instance.
+
+        :param history: history of recorded latencies.
+        :param fraction: quantile fraction of latencies, 0.999 for p99.9.
+        :param margin: factor applied to the latency quantile.
+        :param floor_sec: minimum timeout (seconds).
+        :param ceiling_sec: maximum timeout (seconds), by default the timeout
+            given to the observation, so that adaptive timeouts only ever
+            shorten hand picked timeouts.
+        :param min_samples: minimum number of latencies of a key to adapt
+            its timeout.
+        :param baseline_shas: number of latest git SHAs to use latencies of.
+        :param device_class_of: callable getting device class from device
+            FQDN, as used when recording the history.
+        """
+        self.history = history
+        self.fraction = fraction
+        self.margin = margin
+        self.floor_sec = floor_sec
+        self.ceiling_sec = ceiling_sec
+        self.min_samples = min_samples
+        self.baseline_shas = baseline_shas
+        self.device_class_of = device_class_of
+        self._lock = threading.Lock()
+        self._durations: Optional[dict[LatencyKey, list[float]]] = None
+
+    def refresh(self: AdaptiveTimeoutPolicy):
+        """Reload latencies from the history on next use."""
+        with self._lock:
+            self._durations = None
+
+    def _latencies(
+        self: AdaptiveTimeoutPolicy, key: LatencyKey
+    ) -> list[float]:
+        """Get recorded latencies of key, loading the history once."""
+        with self._lock:
+            if self._durations is None:
+                git_shas = self.history.git_shas()
+                start = max(len(git_shas) - self.baseline_shas, 0)
+                self._durations = self.history.durations(git_shas[start:])
+            return self._durations.get(key, [])
+
+    def timeout_sec(
+        self: AdaptiveTimeoutPolicy,
+        observation: str,
+        device_name: str,
+        key: str,
+        timeout_sec: float,
+    ) -> float:
+        """
+        Choose timeout of an observation from its recorded latencies.
+
+        :param observation: name of observation, e.g. observe_lrc_ok.
+        :param device_name: FQDN of observed device.
+        :param key: observed attribute name or LRC command name.
+        :param timeout_sec: timeout given to the observation (seconds).
+        :returns: adapted timeout, or timeout_sec if there are too few
+            recorded latencies.
+        """
+        latencies = self._latencies(
+            (observation, self.device_class_of(device_name), key)
+        )
+        if len(latencies) < self.min_samples:
+            return timeout_sec
+        ceiling_sec = (
+            timeout_sec if self.ceiling_sec is None else self.ceiling_sec
+        )
+        adapted_sec = quantile(latencies, self.fraction) * self.margin
+        return min(max(adapted_sec, self.floor_sec), ceiling_sec)
@@ -0,0 +1,178 @@
+"""
+Code for the LatencyRecorder hook which records latencies of
+AssertiveLoggingObserver observations to a LatencyHistory.
+"""
+from __future__ import annotations
+
+import os
+import subprocess
+import threading
+from typing import Callable, Optional
+
+from ..assertive_logging_observer import (
+    EventRecord,
+    ObservationContext,
+    ObservationHook,
+    device_timing,
+)
+from .store import LatencyHistory, LatencyRecord
+
+RECORDED_OBSERVATIONS = frozenset(
+    {"observe_lrc_ok", "observe_device_attr_change"}
+)
+"""Observations recorded by default, i.e. those timing device behaviour."""
+
+
+def current_git_sha(cwd: Optional[str | os.PathLike] = None) -> str:
+    """
+    Get git SHA of the code under test, from CI_COMMIT_SHA as set by GitLab
+    CI if set, else from git.
+
+    :param cwd: directory of the git repository, defaults to the current
+        directory.
+    :returns: git SHA, or "unknown" if it cannot be determined.
+    """
+    git_sha = os.environ.get("CI_COMMIT_SHA")
+    if git_sha:
+        return git_sha
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=cwd,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def current_test_id() -> str:
+    """
+    Get ID of the running pytest test from PYTEST_CURRENT_TEST, without its
+    test phase.
+
+    :returns: test node ID, or "" outside of tests.
+    """
+    return os.environ.get("PYTEST_CURRENT_TEST", "").rsplit(" (", 1)[0]
+
+
+def device_family(device_name: str) -> str:
+    """
+    Get Tango family of device FQDN domain/family/member, e.g. fsp of
+    mid_csp_cbf/fsp/01, used as device class by default.
+
+    :param device_name: device FQDN.
+    :returns: device family, or the device name if it has no family.
+    """
+    parts = device_name.rsplit("/", 3)
+    return parts[-2].lower() if len(parts) >= 3 else device_name.lower()
+
+
+class LatencyRecorder(ObservationHook):
+    """
+    ObservationHook appending a LatencyRecord of every recorded observation
+    to a LatencyHistory. Records are buffered and appended in batches of
+    flush_every records and when flushed or closed.
+
+    Latencies are device latencies rather than the time the observer waited:
+    from the submission time in the LRC ID of observe_lrc_ok observations,
+    else the start of the observation, to the reception time of the matched
+    change event, else the end of the observation. Observations satisfied by
+    a change event received before they started, other than LRC results,
+    do not time the device and are not recorded. Failed observations which
+    waited out their timeout are recorded as timed out, their latency is at
+    least the recorded duration.
+    """
+
+    def __init__(
+        self: LatencyRecorder,
+        history: LatencyHistory,
+        git_sha: Optional[str] = None,
+        device_class_of: Callable[[str], str] = device_family,
+        observations: frozenset[str] = RECORDED_OBSERVATIONS,
+        flush_every: int = 100,
+    ):
+        """
+        Initialize a LatencyRecorder instance.
+
+        :param history: history to append records to.
+        :param git_sha: git SHA of the code under test, see current_git_sha
+            for the default.
+        :param device_class_of: callable getting device class from device
+            FQDN.
+        :param observations: names of observations to record.
+        :param flush_every: number of buffered records to append at once.
+        """
+        self.history = history
+        self.git_sha = current_git_sha() if git_sha is None else git_sha
+        self.device_class_of = device_class_of
+        self.observations = observations
+        self.flush_every = flush_every
+        self._lock = threading.Lock()
+        self._buffer: list[LatencyRecord] = []
+
+    def on_event_matched(
+        self: LatencyRecorder,
+        context: ObservationContext,
+        record: EventRecord,
+    ):
+        """
+        Keep reception time of the change event matched by observation.
+
+        :param context: context of the observation.
+        :param record: matched change event.
+        """
+        context.state[self] = record.reception_time
+
+    def on_observation_end(self: LatencyRecorder, context: ObservationContext):
+        """
+        Buffer record of observation if it is recorded.
+
+        :param context: context of the observation.
+        """
+        if context.function_name not in self.observations:
+            return
+        start_sec, end_sec = device_timing(context, context.state.get(self))
+        if end_sec < start_sec:
+            # Satisfied by an event stored before the observation started,
+            # which does not time the device
+            return
+
+        timeout_sec = context.args.get("timeout_sec")
+        timed_out = (
+            not context.passed
+            and timeout_sec is not None
+            and context.end_sec - context.start_sec >= timeout_sec
+        )
+
+        device = str(context.args.get("device", ""))
+        record = LatencyRecord(
+            self.git_sha,
+            current_test_id(),
+            self.device_class_of(device),
+            str(context.args.get("command") or context.args.get("attr", "")),
+            context.function_name,
+            device,
+            end_sec - start_sec,
+            bool(context.passed),
+            recorded_at=context.start_sec,
+            timed_out=timed_out,
+        )
+        with self._lock:
+            self._buffer.append(record)
+            if len(self._buffer) < self.flush_every:
+                return
+            records, self._buffer = self._buffer, []
+        self.history.append(records)
+
+    def flush(self: LatencyRecorder):
+        """Append buffered records to the history."""
+        with self._lock:
+            records, self._buffer = self._buffer, []
+        if records:
+            self.history.append(records)
+
+    def close(self: LatencyRecorder):
+        """Flush buffered records, the history is left open."""
+        self.flush()
@@ -0,0 +1,177 @@
+"""
+Code for detecting latency regressions of a git SHA against a rolling
+baseline of previous git SHAs in a LatencyHistory, with a one sided
+Mann-Whitney U test.
+"""
+from __future__ import annotations
+
+import math
+import statistics
+from typing import Optional
+
+from .store import LatencyHistory, LatencyKey
+
+
+def mann_whitney_greater(samples: list[float], baseline: list[float]) -> float:
+    """
+    One sided Mann-Whitney U test of samples being stochastically greater
+    than baseline, using the normal approximation with tie and continuity
+    corrections.
+
+    :param samples: sample values, e.g. durations of a git SHA.
+    :param baseline: baseline values.
+    :returns: p-value, 1.0 if either sample is empty or all values are tied.
+    """
+    n_samples, n_baseline = len(samples), len(baseline)
+    if not n_samples or not n_baseline:
+        return 1.0
+
+    # Rank all values, giving tied values their average rank
+    values = sorted(
+        [(value, 0) for value in samples] + [(value, 1) for value in baseline]
+    )
+    rank_sum = 0.0
+    tie_term = 0.0
+    index = 0
+    while index < len(values):
+        end = index
+        while end < len(values) and values[end][0] == values[index][0]:
+            end += 1
+        ties = end - index
+        average_rank = (index + end + 1) / 2
+        rank_sum += average_rank * sum(
+            1 for _, group in values[index:end] if group == 0
+        )
+        tie_term += ties**3 - ties
+        index = end
+
+    total = n_samples + n_baseline
+    u_statistic = rank_sum - n_samples * (n_samples + 1) / 2
+    mean = n_samples * n_baseline / 2
+    variance = (
+        n_samples
+        * n_baseline
+        / 12
+        * ((total + 1) - tie_term / (total * (total - 1)))
+    )
+    if variance <= 0:
+        return 1.0
+    z_score = (u_statistic - mean - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z_score / math.sqrt(2))
+
+
+class Regression:
+    """
+    Latency regression of a key at a git SHA against its baseline.
+    """
+
+    __slots__ = (
+        "key",
+        "p_value",
+        "median_sec",
+        "baseline_median_sec",
+        "samples",
+        "baseline_samples",
+        "timed_out",
+        "baseline_timed_out",
+    )
+
+    def __init__(
+        self: Regression,
+        key: LatencyKey,
+        p_value: float,
+        samples: list[float],
+        baseline: list[float],
+        timed_out: int = 0,
+        baseline_timed_out: int = 0,
+    ):
+        self.key = key
+        self.p_value = p_value
+        self.median_sec = statistics.median(samples)
+        self.baseline_median_sec = statistics.median(baseline)
+        self.samples = len(samples)
+        self.baseline_samples = len(baseline)
+        self.timed_out = timed_out
+        self.baseline_timed_out = baseline_timed_out
+
+    @property
+    def slowdown(self: Regression) -> float:
+        """Ratio of median to baseline median duration."""
+        if self.baseline_median_sec <= 0:
+            return math.inf
+        return self.median_sec / self.baseline_median_sec
+
+    def describe(self: Regression) -> str:
+        """Description of the regression for reports."""
+        observation, device_class, command = self.key
+        return (
+            f"{observation} | device_class: {device_class} | "
+            f"command: {command} | median: {self.median_sec:.3f}s vs "
+            f"{self.baseline_median_sec:.3f}s ({self.slowdown:.2f}x) | "
+            f"samples: {self.samples} vs {self.baseline_samples} | "
+            f"timed out: {self.timed_out} vs {self.baseline_timed_out} | "
+            f"p: {self.p_value:.2g}"
+        )
+
+
+def detect_regressions(
+    history: LatencyHistory,
+    git_sha: Optional[str] = None,
+    baseline_shas: int = 10,
+    alpha: float = 0.01,
+    min_samples: int = 5,
+    min_slowdown: float = 1.05,
+) -> list[Regression]:
+    """
+    Detect keys whose durations at git_sha are significantly greater than
+    at the previous baseline_shas git SHAs in history. Observations which
+    timed out are included as samples censored at their duration, i.e. the
+    timeout, so that slowdowns up to timing out are still detected.
+
+    :param history: history to query.
+    :param git_sha: git SHA to check, defaults to the latest in history.
+    :param baseline_shas: number of preceding git SHAs forming the rolling
+        baseline.
+    :param alpha: significance level of the one sided Mann-Whitney U test.
+    :param min_samples: minimum number of samples at git_sha and in the
+        baseline for a key to be tested.
+    :param min_slowdown: minimum ratio of medians to report, so that
+        significant but negligible slowdowns are not reported.
+    :returns: regressions ordered by p-value.
+    :raises ValueError: if git_sha has no records in history.
+    """
+    git_shas = history.git_shas()
+    if git_sha is None:
+        if not git_shas:
+            return []
+        git_sha = git_shas[-1]
+    if git_sha not in git_shas:
+        raise ValueError(f"No latency records of git SHA {git_sha}")
+
+    position = git_shas.index(git_sha)
+    baseline_start = max(position - baseline_shas, 0)
+    baseline_git_shas = git_shas[baseline_start:position]
+    baseline = history.durations(baseline_git_shas, timed_out=True)
+    current = history.durations([git_sha], timed_out=True)
+    baseline_timed_out = history.timed_out_counts(baseline_git_shas)
+    current_timed_out = history.timed_out_counts([git_sha])
+
+    regressions = []
+    for key, samples in current.items():
+        baseline_samples = baseline.get(key, [])
+        if min(len(samples), len(baseline_samples)) < min_samples:
+            continue
+        p_value = mann_whitney_greater(samples, baseline_samples)
+        if p_value >= alpha:
+            continue
+        regression = Regression(
+            key,
+            p_value,
+            samples,
+            baseline_samples,
+            current_timed_out.get(key, 0),
+            baseline_timed_out.get(key, 0),
+        )
+        if regression.slowdown >= min_slowdown:
+            regressions.append(regression)
+    return sorted(regressions, key=lambda regression: regression.p_value)
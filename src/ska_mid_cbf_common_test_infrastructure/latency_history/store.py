@@ -0,0 +1,247 @@
+"""
+Code for the LatencyHistory SQLite store of observation latencies keyed by
+git SHA, test ID, device class and command.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS latencies (
+    recorded_at REAL NOT NULL,
+    git_sha TEXT NOT NULL,
+    test_id TEXT NOT NULL,
+    device_class TEXT NOT NULL,
+    command TEXT NOT NULL,
+    observation TEXT NOT NULL,
+    device TEXT NOT NULL,
+    duration_sec REAL NOT NULL,
+    passed INTEGER NOT NULL,
+    timed_out INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS latencies_key
+    ON latencies (observation, device_class, command, git_sha);
+CREATE INDEX IF NOT EXISTS latencies_sha ON latencies (git_sha, recorded_at);
+"""
+
+LatencyKey = tuple[str, str, str]
+"""(observation, device_class, command) latencies are compared by."""
+
+
+class LatencyRecord:
+    """
+    Timing record of one observation.
+    """
+
+    __slots__ = (
+        "recorded_at",
+        "git_sha",
+        "test_id",
+        "device_class",
+        "command",
+        "observation",
+        "device",
+        "duration_sec",
+        "passed",
+        "timed_out",
+    )
+
+    def __init__(
+        self: LatencyRecord,
+        git_sha: str,
+        test_id: str,
+        device_class: str,
+        command: str,
+        observation: str,
+        device: str,
+        duration_sec: float,
+        passed: bool,
+        recorded_at: Optional[float] = None,
+        timed_out: bool = False,
+    ):
+        """
+        Initialize a LatencyRecord instance.
+
+        :param git_sha: git SHA of the code under test.
+        :param test_id: ID of the test making the observation.
+        :param device_class: class of the observed device, e.g. fsp.
+        :param command: LRC or attribute name observed.
+        :param observation: name of observation, e.g. observe_lrc_ok.
+        :param device: FQDN of the observed device.
+        :param duration_sec: duration of the observation (seconds).
+        :param passed: whether the observation passed.
+        :param recorded_at: time.time() of the observation, defaults to now.
+        :param timed_out: whether the observation failed by waiting out its
+            timeout, so that duration_sec is a lower bound of the latency.
+        """
+        self.recorded_at = time.time() if recorded_at is None else recorded_at
+        self.git_sha = git_sha
+        self.test_id = test_id
+        self.device_class = device_class
+        self.command = command
+        self.observation = observation
+        self.device = device
+        self.duration_sec = duration_sec
+        self.passed = passed
+        self.timed_out = timed_out
+
+    @property
+    def key(self: LatencyRecord) -> LatencyKey:
+        """(observation, device_class, command) of the record."""
+        return (self.observation, self.device_class, self.command)
+
+
+class LatencyHistory:
+    """
+    Thread safe local SQLite store of LatencyRecords, appended to by test
+    runs and queried for regression detection.
+    """
+
+    def __init__(self: LatencyHistory, path: str | os.PathLike):
+        """
+        Initialize a LatencyHistory instance, creating the database at path
+        if it does not exist.
+
+        :param path: SQLite database file.
+        """
+        self.path = os.fspath(path)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.executescript(_SCHEMA)
+            columns = {
+                row[1]
+                for row in self._connection.execute(
+                    "PRAGMA table_info(latencies)"
+                )
+            }
+            # Histories recorded before timed out observations were flagged
+            if "timed_out" not in columns:
+                self._connection.execute(
+                    "ALTER TABLE latencies "
+                    "ADD COLUMN timed_out INTEGER NOT NULL DEFAULT 0"
+                )
+
+    def __enter__(self: LatencyHistory) -> LatencyHistory:
+        return self
+
+    def __exit__(self: LatencyHistory, *exc_info):
+        self.close()
+
+    def close(self: LatencyHistory):
+        """Close the database."""
+        with self._lock:
+            self._connection.close()
+
+    def append(self: LatencyHistory, records: Iterable[LatencyRecord]):
+        """
+        Append records in one transaction.
+
+        :param records: records to append.
+        """
+        rows = [
+            (
+                record.recorded_at,
+                record.git_sha,
+                record.test_id,
+                record.device_class,
+                record.command,
+                record.observation,
+                record.device,
+                record.duration_sec,
+                int(record.passed),
+                int(record.timed_out),
+            )
+            for record in records
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT INTO latencies VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def git_shas(self: LatencyHistory) -> list[str]:
+        """
+        Get git SHAs with records in order of their first record.
+
+        :returns: list of git SHAs.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT git_sha FROM latencies GROUP BY git_sha "
+                "ORDER BY MIN(recorded_at)"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def durations(
+        self: LatencyHistory,
+        git_shas: Iterable[str],
+        passed_only: bool = True,
+        timed_out: bool = False,
+    ) -> dict[LatencyKey, list[float]]:
+        """
+        Get observation durations of git_shas per key.
+
+        :param git_shas: git SHAs to get durations of.
+        :param passed_only: whether to only get durations of observations
+            which passed, as failed observations typically time out.
+        :param timed_out: whether to also get durations of observations
+            which timed out when passed_only, i.e. latencies censored at the
+            timeout.
+        :returns: durations (seconds) per (observation, device_class,
+            command).
+        """
+        git_shas = list(git_shas)
+        if not git_shas:
+            return {}
+        query = (
+            "SELECT observation, device_class, command, duration_sec "
+            "FROM latencies WHERE git_sha IN "
+            f"({', '.join('?' * len(git_shas))})"
+        )
+        if passed_only:
+            query += (
+                " AND (passed = 1 OR timed_out = 1)"
+                if timed_out
+                else " AND passed = 1"
+            )
+        with self._lock:
+            rows = self._connection.execute(query, git_shas).fetchall()
+
+        durations: dict[LatencyKey, list[float]] = {}
+        for observation, device_class, command, duration_sec in rows:
+            durations.setdefault(
+                (observation, device_class, command), []
+            ).append(duration_sec)
+        return durations
+
+    def timed_out_counts(
+        self: LatencyHistory, git_shas: Iterable[str]
+    ) -> dict[LatencyKey, int]:
+        """
+        Count observations of git_shas which timed out per key.
+
+        :param git_shas: git SHAs to count timed out observations of.
+        :returns: counts per (observation, device_class, command), keys
+            without timed out observations are omitted.
+        """
+        git_shas = list(git_shas)
+        if not git_shas:
+            return {}
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT observation, device_class, command, COUNT(*) "
+                "FROM latencies WHERE timed_out = 1 AND git_sha IN "
+                f"({', '.join('?' * len(git_shas))}) "
+                "GROUP BY observation, device_class, command",
+                git_shas,
+            ).fetchall()
+        return {
+            (observation, device_class, command): count
+            for observation, device_class, command, count in rows
+        }
@@ -0,0 +1,33 @@
+"""
+The memory_profiling service finds the source of memory growth in soak runs
+using AssertiveLoggingObserver. A MemoryProfiler observation hook traces
+allocations with tracemalloc and takes sampled snapshots at observation and
+test boundaries. It attributes growth to AssertiveLoggingObserver internals
+(event storage, subscriptions and message formatting) or to caller code,
+and reports the top differences to the baseline snapshot.
+
+Example::
+
+    profiler = MemoryProfiler(observation_sample_every=100)
+    profiler.start()
+    observer.add_hook(profiler)
+    ...  # observations
+    profiler.stop()
+    profiler.write_report("build/memory_report.txt")
+
+or enable the pytest plugin in conftest.py with::
+
+    pytest_plugins = [
+        "ska_mid_cbf_common_test_infrastructure.memory_profiling.plugin"
+    ]
+
+see the plugin module for its options.
+"""
+
+from .profiler import (  # noqa: F401
+    CALLER_CATEGORY,
+    DEFAULT_CATEGORIES,
+    FORMATTING_CATEGORY,
+    MemoryCheckpoint,
+    MemoryProfiler,
+)
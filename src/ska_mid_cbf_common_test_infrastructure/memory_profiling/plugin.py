@@ -0,0 +1,157 @@
+"""
+pytest plugin profiling memory of a test session with a MemoryProfiler,
+taking snapshots at sampled test and AssertiveLoggingObserver observation
+boundaries and writing a report of memory growth at session teardown.
+
+Enable it in the conftest.py of a test repository with::
+
+    pytest_plugins = [
+        "ska_mid_cbf_common_test_infrastructure.memory_profiling.plugin"
+    ]
+
+and attach the memory_profiler fixture to observers::
+
+    observer.add_hook(memory_profiler)
+
+then profile a run with ``--cti-memory-report memory_report.txt``. Sampling
+is set with ``--cti-memory-sample-tests N`` and
+``--cti-memory-sample-observations N`` to snapshot every nth test or
+observation, and ``--cti-memory-frames N`` sets the traceback frames stored
+per allocation. Without ``--cti-memory-report`` memory is not traced. With
+pytest-xdist, each worker writes its own report suffixed with its ID.
+"""
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+import pytest
+
+from .profiler import CALLER_CATEGORY, MemoryProfiler
+
+PLUGIN_NAME = "cti_memory_profiling"
+"""Name the MemoryProfilingPlugin is registered under."""
+
+
+def pytest_addoption(parser: pytest.Parser):
+    """Add command line options of the plugin."""
+    group = parser.getgroup(PLUGIN_NAME, "CTI memory profiling")
+    group.addoption(
+        "--cti-memory-report",
+        metavar="PATH",
+        help="trace memory allocations and write a report of memory growth "
+        "to PATH",
+    )
+    group.addoption(
+        "--cti-memory-frames",
+        type=int,
+        default=1,
+        metavar="N",
+        help="traceback frames stored per allocation, default 1",
+    )
+    group.addoption(
+        "--cti-memory-sample-tests",
+        type=int,
+        default=10,
+        metavar="N",
+        help="snapshot memory after every nth test, 0 for none, default 10",
+    )
+    group.addoption(
+        "--cti-memory-sample-observations",
+        type=int,
+        default=0,
+        metavar="N",
+        help="snapshot memory after every nth observation of observers "
+        "with the memory_profiler hook, 0 for none, default 0",
+    )
+    group.addoption(
+        "--cti-memory-top",
+        type=int,
+        default=20,
+        metavar="N",
+        help="number of top differences to report, default 20",
+    )
+
+
+def pytest_configure(config: pytest.Config):
+    """Register the MemoryProfilingPlugin of the session."""
+    config.pluginmanager.register(MemoryProfilingPlugin(config), PLUGIN_NAME)
+
+
+@pytest.fixture(scope="session")
+def memory_profiler(request: pytest.FixtureRequest) -> MemoryProfiler:
+    """
+    MemoryProfiler to add as hook to AssertiveLoggingObservers, which does
+    nothing unless --cti-memory-report is given.
+    """
+    return request.config.pluginmanager.get_plugin(PLUGIN_NAME).profiler
+
+
+def _report_path(config: pytest.Config) -> Optional[str]:
+    """Get report path, suffixed with the worker ID on xdist workers."""
+    path = config.getoption("cti_memory_report")
+    workerinput = getattr(config, "workerinput", None)
+    if path is None or workerinput is None:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}.{workerinput['workerid']}{extension}"
+
+
+class MemoryProfilingPlugin:
+    """
+    Plugin state of a pytest session: the MemoryProfiler of the session and
+    where to report.
+    """
+
+    def __init__(self: MemoryProfilingPlugin, config: pytest.Config):
+        """
+        Initialize a MemoryProfilingPlugin instance from the options of
+        config.
+
+        :param config: pytest config of the session.
+        """
+        self.report_path = _report_path(config)
+        self.top_n = config.getoption("cti_memory_top")
+        self.profiler = MemoryProfiler(
+            frames=config.getoption("cti_memory_frames"),
+            observation_sample_every=config.getoption(
+                "cti_memory_sample_observations"
+            ),
+            test_sample_every=config.getoption("cti_memory_sample_tests"),
+        )
+
+    def pytest_collection_finish(self: MemoryProfilingPlugin):
+        """Start profiling once tests are collected."""
+        if self.report_path is not None:
+            self.profiler.start()
+
+    def pytest_runtest_logfinish(self: MemoryProfilingPlugin, nodeid: str):
+        """Snapshot memory at the end of sampled tests."""
+        self.profiler.on_test_end(nodeid)
+
+    def pytest_sessionfinish(self: MemoryProfilingPlugin):
+        """Stop profiling and write the report."""
+        if self.report_path is None or not self.profiler.started:
+            return
+        self.profiler.stop()
+        self.profiler.write_report(self.report_path, self.top_n)
+
+    def pytest_terminal_summary(
+        self: MemoryProfilingPlugin,
+        terminalreporter: pytest.TerminalReporter,
+    ):
+        """Summarize memory growth and where it is reported."""
+        checkpoints = self.profiler.checkpoints
+        if self.report_path is None or not checkpoints:
+            return
+        first, last = checkpoints[0], checkpoints[-1]
+        growth = ", ".join(
+            f"{category} {size - first.category_bytes[category]:+,} B"
+            for category, size in last.category_bytes.items()
+            if category == CALLER_CATEGORY
+            or size != first.category_bytes[category]
+        )
+        terminalreporter.write_line(
+            f"cti memory growth: {growth}, report written to "
+            f"{self.report_path}"
+        )
@@ -0,0 +1,375 @@
+"""
+Code for the MemoryProfiler hook which takes tracemalloc snapshots at
+AssertiveLoggingObserver observation and test boundaries and attributes
+memory growth to AssertiveLoggingObserver internals or caller code.
+"""
+from __future__ import annotations
+
+import ast
+import collections
+import linecache
+import os
+import threading
+import time
+import tracemalloc
+from typing import Optional
+
+from ..assertive_logging_observer import ObservationContext, ObservationHook
+
+CALLER_CATEGORY = "caller"
+"""Category of allocations not made by AssertiveLoggingObserver internals."""
+
+FORMATTING_CATEGORY = "message formatting"
+"""
+Category of allocations on lines of string formatting expressions, i.e.
+f-strings, % and str.format, of files in other categories.
+"""
+
+DEFAULT_CATEGORIES = {
+    "event storage": (
+        "ska_mid_cbf_common_test_infrastructure/assertive_logging_observer/"
+        "event_store.py",
+        "ska_mid_cbf_common_test_infrastructure/assertive_logging_observer/"
+        "event_collector.py",
+        "/ska_tango_testing/",
+    ),
+    "subscriptions": (
+        "ska_mid_cbf_common_test_infrastructure/assertive_logging_observer/"
+        "filtered_event_tracer.py",
+        "ska_mid_cbf_common_test_infrastructure/assertive_logging_observer/"
+        "attribute_poller.py",
+        "/tango/",
+    ),
+    FORMATTING_CATEGORY: (
+        "/logging/",
+        "ska_mid_cbf_common_test_infrastructure/test_logging/",
+    ),
+    "alo other": (
+        "ska_mid_cbf_common_test_infrastructure/assertive_logging_observer/",
+    ),
+}
+"""
+Path fragments of the files allocating memory of each
+AssertiveLoggingObserver internals category, matched in order.
+"""
+
+
+def _formatting_lines(filename: str) -> frozenset[int]:
+    """
+    Get line numbers of string formatting expressions in a Python file.
+
+    :param filename: path of the file.
+    :returns: lines spanned by f-strings, % formatting of string literals
+        and str.format calls on string literals, empty if the file can not
+        be parsed.
+    """
+    try:
+        tree = ast.parse("".join(linecache.getlines(filename)))
+    except (SyntaxError, ValueError):
+        return frozenset()
+
+    def is_str(node: ast.AST) -> bool:
+        return isinstance(node, ast.JoinedStr) or (
+            isinstance(node, ast.Constant) and isinstance(node.value, str)
+        )
+
+    lines: set[int] = set()
+    for node in ast.walk(tree):
+        formatting = (
+            isinstance(node, ast.JoinedStr)
+            or (
+                isinstance(node, ast.BinOp)
+                and isinstance(node.op, ast.Mod)
+                and is_str(node.left)
+            )
+            or (
+                isinstance(node, ast.Call)
+                and isinstance(node.func, ast.Attribute)
+                and node.func.attr == "format"
+                and is_str(node.func.value)
+            )
+        )
+        if formatting:
+            lines.update(range(node.lineno, node.end_lineno + 1))
+    return frozenset(lines)
+
+
+# Allocations of tracemalloc and the profiler itself are not reported
+_IGNORED_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class MemoryCheckpoint:
+    """
+    Traced memory at a snapshot, in total and per category.
+    """
+
+    __slots__ = ("label", "time_sec", "traced_bytes", "category_bytes")
+
+    def __init__(
+        self: MemoryCheckpoint,
+        label: str,
+        traced_bytes: int,
+        category_bytes: dict[str, int],
+    ):
+        """
+        Initialize a MemoryCheckpoint instance.
+
+        :param label: boundary of the snapshot, e.g. a test ID.
+        :param traced_bytes: total size of traced memory blocks.
+        :param category_bytes: size of traced memory blocks per category.
+        """
+        self.label = label
+        self.time_sec = time.time()
+        self.traced_bytes = traced_bytes
+        self.category_bytes = category_bytes
+
+
+class MemoryProfiler(ObservationHook):
+    """
+    ObservationHook tracing memory allocations with tracemalloc and taking
+    snapshots at sampled observation and test boundaries, so that growth in
+    soak runs is attributed to AssertiveLoggingObserver internals, i.e.
+    event storage, subscriptions and message formatting, or to caller code.
+
+    An allocation is attributed to the category of the most recent frame of
+    its traceback in a category, else to the caller category. Frames on
+    lines of string formatting expressions, e.g. the f-string log messages
+    of AssertiveLoggingObserver, are in the message formatting category if
+    their file is in another category, so messages are attributed with
+    frames=1. With frames=1 only the allocating line is known, more frames
+    attribute e.g. builtin allocations called from AssertiveLoggingObserver
+    to it, at more overhead.
+
+    Tracing slows allocations down, and snapshots take time proportional to
+    the number of traced blocks, so sample boundaries sparsely to leave
+    profiling on in nightly runs.
+    """
+
+    def __init__(
+        self: MemoryProfiler,
+        frames: int = 1,
+        observation_sample_every: int = 0,
+        test_sample_every: int = 1,
+        categories: Optional[dict[str, tuple[str, ...]]] = None,
+        max_checkpoints: int = 10000,
+    ):
+        """
+        Initialize a MemoryProfiler instance.
+
+        :param frames: number of traceback frames tracemalloc stores per
+            allocation, if it is not already tracing.
+        :param observation_sample_every: take a snapshot at the end of every
+            nth observation, 0 for none.
+        :param test_sample_every: take a snapshot at the end of every nth
+            test, 0 for none.
+        :param categories: path fragments of the files allocating memory of
+            each category, defaults to DEFAULT_CATEGORIES.
+        :param max_checkpoints: number of most recent checkpoints kept.
+        """
+        self.frames = frames
+        self.observation_sample_every = observation_sample_every
+        self.test_sample_every = test_sample_every
+        self.categories = (
+            DEFAULT_CATEGORIES if categories is None else categories
+        )
+        self.checkpoints: collections.deque[
+            MemoryCheckpoint
+        ] = collections.deque(maxlen=max_checkpoints)
+        self._lock = threading.Lock()
+        self._started_tracing = False
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._latest: Optional[tracemalloc.Snapshot] = None
+        self._peak_bytes = 0
+        self._observations = 0
+        self._tests = 0
+        # Caches of category_of, filled by checkpoints without the lock as
+        # concurrent fills store equal values
+        self._file_categories: dict[str, str] = {}
+        self._file_formatting_lines: dict[str, frozenset[int]] = {}
+
+    @property
+    def started(self: MemoryProfiler) -> bool:
+        """Whether the profiler is started and not stopped."""
+        return self._baseline is not None and tracemalloc.is_tracing()
+
+    def start(self: MemoryProfiler):
+        """
+        Start tracing if tracemalloc is not already tracing, and take the
+        baseline snapshot growth is reported against.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        tracemalloc.reset_peak()
+        with self._lock:
+            self._baseline = None
+            self._peak_bytes = 0
+            self.checkpoints.clear()
+        self.checkpoint("start")
+
+    def stop(self: MemoryProfiler):
+        """
+        Take a last snapshot and stop tracing if it was started by start.
+        Reports can still be made once stopped.
+        """
+        if not self.started:
+            return
+        self.checkpoint("stop")
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def checkpoint(self: MemoryProfiler, label: str) -> MemoryCheckpoint:
+        """
+        Take a snapshot, the baseline if it is the first. The snapshot is
+        taken and categorized without holding the lock, so that observations
+        ending concurrently on other threads are not blocked by it.
+
+        :param label: boundary of the snapshot, e.g. a test ID.
+        :returns: checkpoint of the snapshot.
+        :raises RuntimeError: if tracemalloc is not tracing.
+        """
+        snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED_FILTERS)
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        category_bytes = dict.fromkeys([*self.categories, CALLER_CATEGORY], 0)
+        for statistic in snapshot.statistics("traceback"):
+            category = self.category_of(statistic.traceback)
+            category_bytes[category] += statistic.size
+        checkpoint = MemoryCheckpoint(
+            label, sum(category_bytes.values()), category_bytes
+        )
+        with self._lock:
+            if self._baseline is None:
+                self._baseline = snapshot
+            self._latest = snapshot
+            self._peak_bytes = max(self._peak_bytes, peak_bytes)
+            self.checkpoints.append(checkpoint)
+        return checkpoint
+
+    def category_of(
+        self: MemoryProfiler, traceback: tracemalloc.Traceback
+    ) -> str:
+        """
+        Get category of an allocation.
+
+        :param traceback: traceback of the allocation, oldest frame first.
+        :returns: category of the most recent frame in a category, else
+            CALLER_CATEGORY.
+        """
+        for frame in reversed(traceback):
+            category = self._file_categories.get(frame.filename)
+            if category is None:
+                path = frame.filename.replace(os.sep, "/")
+                category = next(
+                    (
+                        name
+                        for name, fragments in self.categories.items()
+                        if any(fragment in path for fragment in fragments)
+                    ),
+                    CALLER_CATEGORY,
+                )
+                self._file_categories[frame.filename] = category
+            if category == CALLER_CATEGORY:
+                continue
+            if FORMATTING_CATEGORY in self.categories:
+                lines = self._file_formatting_lines.get(frame.filename)
+                if lines is None:
+                    lines = _formatting_lines(frame.filename)
+                    self._file_formatting_lines[frame.filename] = lines
+                if frame.lineno in lines:
+                    return FORMATTING_CATEGORY
+            return category
+        return CALLER_CATEGORY
+
+    def on_observation_end(self: MemoryProfiler, context: ObservationContext):
+        """
+        Take a snapshot at the end of every observation_sample_every
+        observations.
+
+        :param context: context of the observation.
+        """
+        if not self.observation_sample_every or not self.started:
+            return
+        with self._lock:
+            self._observations += 1
+            sampled = self._observations % self.observation_sample_every == 0
+        if sampled:
+            self.checkpoint(context.function_name)
+
+    def on_test_end(self: MemoryProfiler, test_id: str):
+        """
+        Take a snapshot at the end of every test_sample_every tests.
+
+        :param test_id: ID of the test which ended.
+        """
+        if not self.test_sample_every or not self.started:
+            return
+        with self._lock:
+            self._tests += 1
+            sampled = self._tests % self.test_sample_every == 0
+        if sampled:
+            self.checkpoint(test_id)
+
+    def report(
+        self: MemoryProfiler, top_n: int = 20, group_by: str = "lineno"
+    ) -> str:
+        """
+        Report growth from the baseline to the latest snapshot per category
+        and the top_n differences of the latest snapshot to the baseline.
+
+        :param top_n: number of differences to report.
+        :param group_by: tracemalloc key type to group differences by,
+            "lineno", "filename" or "traceback".
+        :returns: report text.
+        """
+        if self._baseline is None:
+            return "Memory profiler was not started\n"
+        with self._lock:
+            first, last = self.checkpoints[0], self.checkpoints[-1]
+            differences = self._latest.compare_to(self._baseline, group_by)
+            lines = [
+                f"Traced memory: {last.traced_bytes:,} B "
+                f"({last.traced_bytes - first.traced_bytes:+,} B) at "
+                f"{last.label!r} since {first.label!r}, peak "
+                f"{self._peak_bytes:,} B, {len(self.checkpoints)} "
+                "checkpoints",
+                "",
+                "Growth by category:",
+            ]
+            for category, size in last.category_bytes.items():
+                growth = size - first.category_bytes.get(category, 0)
+                lines.append(f"  {category}: {size:,} B ({growth:+,} B)")
+
+            lines += ["", f"Top {top_n} differences:"]
+            for difference in differences[:top_n]:
+                frame = difference.traceback[-1]
+                lines.append(
+                    f"  {difference.size_diff:+,} B "
+                    f"({difference.count_diff:+,} blocks) "
+                    f"[{self.category_of(difference.traceback)}] "
+                    f"{frame.filename}:{frame.lineno}"
+                )
+        return "\n".join(lines) + "\n"
+
+    def write_report(
+        self: MemoryProfiler,
+        path: str | os.PathLike,
+        top_n: int = 20,
+        group_by: str = "lineno",
+    ):
+        """
+        Write report to path, see report.
+
+        :param path: report file.
+        :param top_n: number of differences to report.
+        :param group_by: tracemalloc key type to group differences by.
+        """
+        report = self.report(top_n, group_by)
+        with open(path, "w", encoding="utf-8") as report_file:
+            report_file.write(report)
@@ -0,0 +1,18 @@
+"""
+The observation_metrics service collects metrics of AssertiveLoggingObserver
+observations, i.e. observation outcomes, wait latencies, long running command
+durations and change event rates, with an ObservationMetrics hook, and exports
+them in OpenMetrics text format to a file and/or a Prometheus pushgateway with
+an OpenMetricsExporter, so that results of test runs such as nightly hardware
+tests land in Prometheus alongside their logs.
+
+Example::
+
+    metrics = ObservationMetrics(const_labels={"release": "1.0.0"})
+    metrics.attach(observer)
+    with OpenMetricsExporter(metrics, path="build/reports/cti.prom"):
+        ...  # observations
+"""
+
+from .exporter import OpenMetricsExporter  # noqa: F401
+from .metrics import DEFAULT_BUCKETS_SEC, ObservationMetrics  # noqa: F401
@@ -0,0 +1,155 @@
+"""
+Code for the OpenMetricsExporter which periodically exports ObservationMetrics
+to a file, e.g. for a node exporter textfile collector or a Kubernetes job
+artifact, and/or pushes them to a Prometheus pushgateway.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+import threading
+import urllib.parse
+import urllib.request
+from typing import Optional
+
+from .metrics import ObservationMetrics
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_logger = logging.getLogger(__name__)
+
+
+class OpenMetricsExporter:
+    """
+    Exporter of ObservationMetrics every interval_sec from a background
+    thread, and once more when closed so that the final metrics of a test
+    run are exported. Files are written in OpenMetrics text format and
+    replaced atomically so that collectors never read a partial file, pushes
+    use Prometheus text format which pushgateways accept. Failed exports are
+    logged and retried at the next interval.
+    """
+
+    def __init__(
+        self: OpenMetricsExporter,
+        metrics: ObservationMetrics,
+        path: Optional[str | os.PathLike] = None,
+        push_url: Optional[str] = None,
+        job: str = "ska_mid_cbf_cti",
+        grouping_labels: Optional[dict[str, str]] = None,
+        interval_sec: float = 15.0,
+        timeout_sec: float = 5.0,
+    ):
+        """
+        Initialize an OpenMetricsExporter instance, call start to export
+        periodically.
+
+        :param metrics: metrics to export.
+        :param path: file to write metrics to, if any.
+        :param push_url: base URL of pushgateway to push metrics to, if any,
+            e.g. http://pushgateway:9091.
+        :param job: job name to push metrics under.
+        :param grouping_labels: additional pushgateway grouping labels, e.g.
+            the Kubernetes job instance.
+        :param interval_sec: interval between exports (seconds).
+        :param timeout_sec: timeout of pushes (seconds).
+        :raises ValueError: if neither path nor push_url is given.
+        """
+        if path is None and push_url is None:
+            raise ValueError("OpenMetricsExporter needs a path or push_url")
+        self.metrics = metrics
+        self.path = None if path is None else os.fspath(path)
+        self.push_url = None
+        if push_url is not None:
+            grouping = {"job": job, **(grouping_labels or {})}
+            self.push_url = (
+                push_url.rstrip("/")
+                + "/metrics"
+                + "".join(
+                    f"/{urllib.parse.quote(name, safe='')}"
+                    f"/{urllib.parse.quote(value, safe='')}"
+                    for name, value in grouping.items()
+                )
+            )
+        self.interval_sec = interval_sec
+        self.timeout_sec = timeout_sec
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self: OpenMetricsExporter) -> OpenMetricsExporter:
+        self.start()
+        return self
+
+    def __exit__(self: OpenMetricsExporter, *exc_info):
+        self.close()
+
+    def start(self: OpenMetricsExporter):
+        """
+        Start exporting every interval_sec.
+
+        :raises RuntimeError: if already started.
+        """
+        if self._thread is not None:
+            raise RuntimeError("OpenMetricsExporter already started")
+        self._thread = threading.Thread(
+            target=self._run, name="OpenMetricsExporter", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self: OpenMetricsExporter):
+        """Export every interval_sec until closed."""
+        while not self._stop.wait(self.interval_sec):
+            self._export_logging_errors()
+
+    def _export_logging_errors(self: OpenMetricsExporter):
+        """Export, logging rather than raising errors."""
+        try:
+            self.export()
+        except OSError as exception:
+            _logger.warning(
+                f"Failed to export observation metrics: {exception}"
+            )
+
+    def export(self: OpenMetricsExporter):
+        """
+        Export current metrics now.
+
+        :raises OSError: if writing the file or pushing fails.
+        """
+        if self.path is not None:
+            self._write(self.metrics.render(openmetrics=True))
+        if self.push_url is not None:
+            self._push(self.metrics.render(openmetrics=False))
+
+    def _write(self: OpenMetricsExporter, text: str):
+        """Atomically replace file at path with text."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        file_descriptor, temp_path = tempfile.mkstemp(
+            dir=directory, prefix=".metrics", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+                file.write(text)
+            os.replace(temp_path, self.path)
+        except OSError:
+            os.unlink(temp_path)
+            raise
+
+    def _push(self: OpenMetricsExporter, text: str):
+        """Replace metrics of the grouping key on the pushgateway."""
+        request = urllib.request.Request(
+            self.push_url,
+            data=text.encode("utf-8"),
+            method="PUT",
+            headers={"Content-Type": PROMETHEUS_CONTENT_TYPE},
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout_sec):
+            pass
+
+    def close(self: OpenMetricsExporter):
+        """Stop periodic exports and export the final metrics."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._export_logging_errors()
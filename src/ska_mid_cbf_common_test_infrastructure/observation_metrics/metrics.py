@@ -0,0 +1,319 @@
+"""
+Code for ObservationMetrics, counters and histograms of
+AssertiveLoggingObserver observations rendered in OpenMetrics or Prometheus
+text exposition format.
+"""
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+from typing import Any, Optional
+
+from ..assertive_logging_observer import (
+    EventRecord,
+    ObservationContext,
+    ObservationHook,
+    device_timing,
+)
+
+DEFAULT_BUCKETS_SEC = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+)
+"""Default histogram bucket upper bounds of durations (seconds)."""
+
+
+def _escape(value: Any) -> str:
+    """Escape label value for the text exposition formats."""
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+def _format_float(value: float) -> str:
+    """Format sample value or bucket bound for the text exposition formats."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _labels(labels: tuple[tuple[str, Any], ...]) -> str:
+    """Format labels of a sample, empty if there are none."""
+    if not labels:
+        return ""
+    return (
+        "{"
+        + ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+        + "}"
+    )
+
+
+class _Histogram:
+    """Cumulative histogram of observed values of one label set."""
+
+    __slots__ = ("counts", "count", "total")
+
+    def __init__(self: _Histogram, bucket_count: int):
+        self.counts = [0] * bucket_count
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self: _Histogram, bounds: tuple[float, ...], value: float):
+        """Add value to the bucket of the first bound not below it."""
+        index = bisect.bisect_left(bounds, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.count += 1
+        self.total += value
+
+
+class ObservationMetrics(ObservationHook):
+    """
+    Thread safe metrics of observations of the AssertiveLoggingObservers it
+    is added to as a hook, and of change events it is given as event
+    listener of their event tracers:
+
+    - cti_observations_total{observation,result} counts observations.
+    - cti_observation_duration_seconds{observation} histograms observation
+      durations, i.e. wait latencies of event waiting observations.
+    - cti_lrc_duration_seconds{command,result} histograms durations of long
+      running commands of observe_lrc_ok observations, from submission to
+      reception of their result, see device_timing.
+    - cti_change_events_total{device,attribute} counts received events.
+
+    Constant labels, e.g. the release under test, are added to all samples so
+    that command latencies can be compared across releases.
+    """
+
+    def __init__(
+        self: ObservationMetrics,
+        const_labels: Optional[dict[str, str]] = None,
+        buckets_sec: tuple[float, ...] = DEFAULT_BUCKETS_SEC,
+    ):
+        """
+        Initialize an ObservationMetrics instance.
+
+        :param const_labels: labels added to all samples.
+        :param buckets_sec: ascending histogram bucket upper bounds
+            (seconds), a +Inf bucket is always added.
+        """
+        self.const_labels = tuple(sorted((const_labels or {}).items()))
+        self.buckets_sec = tuple(sorted(buckets_sec))
+        self._lock = threading.Lock()
+        self._observations: dict[tuple[str, str], int] = {}
+        self._durations: dict[str, _Histogram] = {}
+        self._lrc_durations: dict[tuple[str, str], _Histogram] = {}
+        self._change_events: dict[tuple[str, str], int] = {}
+
+    def attach(self: ObservationMetrics, observer: Any):
+        """
+        Add metrics as hook of observer and as event listener of its event
+        tracer if it has one.
+
+        :param observer: AssertiveLoggingObserver to collect metrics of.
+        """
+        observer.add_hook(self)
+        if observer.event_tracer is not None:
+            observer.event_tracer.add_event_listener(self.record_change_event)
+
+    def on_event_matched(
+        self: ObservationMetrics,
+        context: ObservationContext,
+        record: EventRecord,
+    ):
+        """
+        Keep reception time of the change event matched by observation.
+
+        :param context: context of the observation.
+        :param record: matched change event.
+        """
+        context.state[self] = record.reception_time
+
+    def on_observation_end(
+        self: ObservationMetrics, context: ObservationContext
+    ):
+        """
+        Count ended observation and add its duration to histograms.
+
+        :param context: context of the observation.
+        """
+        result = "pass" if context.passed else "fail"
+        duration_sec = max(context.end_sec - context.start_sec, 0.0)
+        bucket_count = len(self.buckets_sec)
+        with self._lock:
+            key = (context.function_name, result)
+            self._observations[key] = self._observations.get(key, 0) + 1
+
+            histogram = self._durations.get(context.function_name)
+            if histogram is None:
+                histogram = self._durations[
+                    context.function_name
+                ] = _Histogram(bucket_count)
+            histogram.observe(self.buckets_sec, duration_sec)
+
+            command = context.args.get("command")
+            if context.function_name == "observe_lrc_ok" and command:
+                lrc_key = (command, result)
+                histogram = self._lrc_durations.get(lrc_key)
+                if histogram is None:
+                    histogram = self._lrc_durations[lrc_key] = _Histogram(
+                        bucket_count
+                    )
+                start_sec, end_sec = device_timing(
+                    context, context.state.get(self)
+                )
+                histogram.observe(
+                    self.buckets_sec, max(end_sec - start_sec, 0.0)
+                )
+
+    def record_change_event(
+        self: ObservationMetrics,
+        device_name: str,
+        attr_name: str,
+        attr_value: Any,  # pylint: disable=unused-argument
+        reception_time: Optional[float] = None,  # pylint: disable=W0613
+    ):
+        """
+        Count a received change event, to be added as event listener of an
+        event tracer, see add_event_listener.
+
+        :param device_name: name of device the event is from.
+        :param attr_name: name of attribute the event is for.
+        :param attr_value: value of attribute in the event.
+        :param reception_time: time.time() the event was received.
+        """
+        key = (device_name, attr_name)
+        with self._lock:
+            self._change_events[key] = self._change_events.get(key, 0) + 1
+
+    def _render_histogram(
+        self: ObservationMetrics,
+        lines: list[str],
+        name: str,
+        histograms: dict[tuple[tuple[str, Any], ...], _Histogram],
+    ):
+        """Append samples of histograms of metric name to lines."""
+        for labels, histogram in histograms.items():
+            labels = self.const_labels + labels
+            cumulative = 0
+            # Values above the last bound are only counted in the +Inf bucket
+            for bound, count in zip(
+                self.buckets_sec + (math.inf,),
+                histogram.counts + [histogram.count - sum(histogram.counts)],
+            ):
+                cumulative += count
+                bucket_labels = labels + (("le", _format_float(bound)),)
+                lines.append(
+                    f"{name}_bucket{_labels(bucket_labels)} {cumulative}"
+                )
+            lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+            lines.append(
+                f"{name}_sum{_labels(labels)} "
+                f"{_format_float(histogram.total)}"
+            )
+
+    def render(self: ObservationMetrics, openmetrics: bool = True) -> str:
+        """
+        Render current metrics in text exposition format.
+
+        :param openmetrics: whether to render OpenMetrics text format, else
+            Prometheus text format 0.0.4, e.g. for a pushgateway.
+        :returns: metrics text.
+        """
+        with self._lock:
+            observations = dict(self._observations)
+            change_events = dict(self._change_events)
+            durations = {
+                (("observation", name),): _copy_histogram(histogram)
+                for name, histogram in self._durations.items()
+            }
+            lrc_durations = {
+                (("command", command), ("result", result)): _copy_histogram(
+                    histogram
+                )
+                for (command, result), histogram in self._lrc_durations.items()
+            }
+
+        lines: list[str] = []
+
+        def header(name: str, metric_type: str, help_text: str):
+            # OpenMetrics names counter families without the _total suffix
+            family = (
+                name[: -len("_total")]
+                if openmetrics and metric_type == "counter"
+                else name
+            )
+            lines.append(f"# HELP {family} {help_text}")
+            lines.append(f"# TYPE {family} {metric_type}")
+
+        header(
+            "cti_observations_total",
+            "counter",
+            "AssertiveLoggingObserver observations by result.",
+        )
+        for (observation, result), count in observations.items():
+            labels = self.const_labels + (
+                ("observation", observation),
+                ("result", result),
+            )
+            lines.append(f"cti_observations_total{_labels(labels)} {count}")
+
+        header(
+            "cti_observation_duration_seconds",
+            "histogram",
+            "Durations of AssertiveLoggingObserver observations.",
+        )
+        self._render_histogram(
+            lines, "cti_observation_duration_seconds", durations
+        )
+
+        header(
+            "cti_lrc_duration_seconds",
+            "histogram",
+            "Durations of observed long running commands.",
+        )
+        self._render_histogram(
+            lines, "cti_lrc_duration_seconds", lrc_durations
+        )
+
+        header(
+            "cti_change_events_total",
+            "counter",
+            "Change events received by event tracers.",
+        )
+        for (device, attribute), count in change_events.items():
+            labels = self.const_labels + (
+                ("device", device),
+                ("attribute", attribute),
+            )
+            lines.append(f"cti_change_events_total{_labels(labels)} {count}")
+
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def _copy_histogram(histogram: _Histogram) -> _Histogram:
+    """Copy histogram to render outside the metrics lock."""
+    copy = _Histogram(0)
+    copy.counts = list(histogram.counts)
+    copy.count = histogram.count
+    copy.total = histogram.total
+    return copy
@@ -0,0 +1,31 @@
+"""
+The test_data service exposes the data files shared among test repositories
+in the CTI data directory, such as golden visibilities, delay polynomials and
+channelizer coefficients, as lazily memory mapped read only bytes and NumPy
+array views addressed by content hash. A DataStore maps each file once per
+process and keeps an LRU of open maps, so parallel test workers share the
+pages of large files instead of each reading its own copy, and checks files
+against the SHA-256 digests of the data directory manifest, updated and
+verified with ``python -m ska_mid_cbf_common_test_infrastructure.test_data``.
+
+Example::
+
+    coefficients = default_data_store.array("channelizer/coefficients.npy")
+    digest = default_data_store.digest("channelizer/coefficients.npy")
+    same_coefficients = default_data_store.array(digest)
+"""
+
+from .manifest import (  # noqa: F401
+    DEFAULT_DATA_DIR,
+    MANIFEST_NAME,
+    build_manifest,
+    data_files,
+    file_digest,
+    read_manifest,
+    write_manifest,
+)
+from .store import (  # noqa: F401
+    DataIntegrityError,
+    DataStore,
+    default_data_store,
+)
@@ -0,0 +1,60 @@
+"""
+Update or verify the manifest of a data directory, exiting with status 1 if
+verification fails so that CI jobs fail on stale manifests or corrupt data.
+
+Usage::
+
+    python -m ska_mid_cbf_common_test_infrastructure.test_data update
+    python -m ska_mid_cbf_common_test_infrastructure.test_data verify
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import Optional
+
+from .manifest import DEFAULT_DATA_DIR, write_manifest
+from .store import DataStore
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Run the manifest command.
+
+    :param argv: command line arguments, defaults to sys.argv[1:].
+    :returns: exit status, 1 if verification failed.
+    """
+    parser = argparse.ArgumentParser(
+        prog=f"python -m {__package__}",
+        description="Update or verify the manifest of a data directory.",
+    )
+    parser.add_argument(
+        "command",
+        choices=["update", "verify"],
+        help="update writes the manifest of the current data files, verify "
+        "checks the data files against the manifest",
+    )
+    parser.add_argument(
+        "--data-dir",
+        default=DEFAULT_DATA_DIR,
+        help="data directory, defaults to the CTI data directory",
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "update":
+        manifest = write_manifest(args.data_dir)
+        print(f"Manifest of {len(manifest['files'])} data files written")
+        return 0
+
+    problems = DataStore(args.data_dir).verify()
+    if not problems:
+        print("All data files match the manifest")
+        return 0
+    print(f"{len(problems)} data files do not match the manifest:")
+    for problem in problems:
+        print(f"- {problem}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
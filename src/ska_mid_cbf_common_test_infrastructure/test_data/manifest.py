@@ -0,0 +1,141 @@
+"""
+Code for the manifest of the CTI data directory, recording the SHA-256
+digest and size of every data file so that files can be addressed by content
+hash and checked for integrity.
+
+The manifest is ``manifest.json`` in the data directory::
+
+    {
+        "version": 1,
+        "files": {
+            "schemas/example_payload.json": {
+                "sha256": "9f2c...",
+                "size": 1234
+            }
+        }
+    }
+"""
+from __future__ import annotations
+
+import hashlib
+import importlib.resources
+import json
+import mmap
+import os
+import pathlib
+from typing import Any
+
+DEFAULT_DATA_DIR = pathlib.Path(
+    str(
+        importlib.resources.files("ska_mid_cbf_common_test_infrastructure")
+        / "data"
+    )
+)
+"""
+CTI data directory shared among test repositories, shipped as package data.
+"""
+
+MANIFEST_NAME = "manifest.json"
+"""Name of the manifest file in a data directory."""
+
+MANIFEST_VERSION = 1
+"""Version of the manifest format."""
+
+UNMANAGED_NAMES = frozenset({MANIFEST_NAME, "README.md"})
+"""Names of files in a data directory which are not data files."""
+
+_HASH_CHUNK_BYTES = 1 << 24
+
+
+def file_digest(path: str | os.PathLike) -> str:
+    """
+    Get SHA-256 digest of a file, hashed in chunks of a read only memory map
+    so that large files are not read into memory.
+
+    :param path: file to hash.
+    :returns: hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                view = memoryview(data)
+                for start in range(0, len(view), _HASH_CHUNK_BYTES):
+                    end = start + _HASH_CHUNK_BYTES
+                    digest.update(view[start:end])
+                view.release()
+    return digest.hexdigest()
+
+
+def data_files(data_dir: str | os.PathLike) -> list[str]:
+    """
+    Get data files of a data directory, i.e. all files but hidden files, the
+    manifest and READMEs.
+
+    :param data_dir: data directory.
+    :returns: sorted paths of data files relative to data_dir, with /
+        separators.
+    """
+    data_dir = pathlib.Path(data_dir)
+    return sorted(
+        path.relative_to(data_dir).as_posix()
+        for path in data_dir.rglob("*")
+        if path.is_file()
+        and path.name not in UNMANAGED_NAMES
+        and not any(
+            part.startswith(".") for part in path.relative_to(data_dir).parts
+        )
+    )
+
+
+def build_manifest(data_dir: str | os.PathLike) -> dict[str, Any]:
+    """
+    Build manifest of the data files of a data directory.
+
+    :param data_dir: data directory.
+    :returns: manifest content.
+    """
+    data_dir = pathlib.Path(data_dir)
+    return {
+        "version": MANIFEST_VERSION,
+        "files": {
+            relative_path: {
+                "sha256": file_digest(data_dir / relative_path),
+                "size": (data_dir / relative_path).stat().st_size,
+            }
+            for relative_path in data_files(data_dir)
+        },
+    }
+
+
+def write_manifest(data_dir: str | os.PathLike) -> dict[str, Any]:
+    """
+    Build and write the manifest of a data directory.
+
+    :param data_dir: data directory.
+    :returns: manifest content.
+    """
+    manifest = build_manifest(data_dir)
+    with open(
+        pathlib.Path(data_dir) / MANIFEST_NAME, "w", encoding="utf-8"
+    ) as manifest_file:
+        json.dump(manifest, manifest_file, indent=4, sort_keys=True)
+        manifest_file.write("\n")
+    return manifest
+
+
+def read_manifest(data_dir: str | os.PathLike) -> dict[str, Any]:
+    """
+    Read the manifest of a data directory.
+
+    :param data_dir: data directory.
+    :returns: manifest content.
+    :raises FileNotFoundError: if the data directory has no manifest.
+    :raises ValueError: if the manifest is not a version 1 manifest.
+    """
+    path = pathlib.Path(data_dir) / MANIFEST_NAME
+    with open(path, encoding="utf-8") as manifest_file:
+        manifest = json.load(manifest_file)
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"{path} is not a version 1 manifest")
+    return manifest
@@ -0,0 +1,247 @@
+"""
+Code for the DataStore exposing files of the CTI data directory as read only
+memory mapped bytes and NumPy array views addressed by content hash.
+
+Files are mapped read only and shared, so that every worker process mapping
+the same file shares its pages in the page cache instead of holding its own
+copy. Each process keeps an LRU of open maps, evicted maps stay valid until
+the last view of them is released.
+"""
+from __future__ import annotations
+
+import collections
+import mmap
+import os
+import pathlib
+import re
+import threading
+from typing import Any, Iterable, Optional
+
+from .manifest import DEFAULT_DATA_DIR, data_files, file_digest, read_manifest
+
+_DIGEST_PREFIX = re.compile(r"[0-9a-f]{8,64}")
+
+
+class DataIntegrityError(ValueError):
+    """Data file does not match its manifest entry."""
+
+
+class DataStore:
+    """
+    Thread safe store of the data files of a data directory, addressed by
+    their SHA-256 digest in the data directory manifest, a unique digest
+    prefix of at least 8 characters, or their path relative to the data
+    directory.
+
+    Files are checked against their manifest size when mapped, and against
+    their digest too if verify_on_open, which reads the whole file. Use
+    verify to check all files, e.g. in CI.
+    """
+
+    def __init__(
+        self: DataStore,
+        data_dir: str | os.PathLike = DEFAULT_DATA_DIR,
+        max_open_maps: int = 32,
+        verify_on_open: bool = False,
+    ):
+        """
+        Initialize a DataStore instance, the manifest is read on first use.
+
+        :param data_dir: data directory with a manifest.
+        :param max_open_maps: maximum number of maps kept open.
+        :param verify_on_open: whether to check file digests when mapped.
+        """
+        self.data_dir = pathlib.Path(data_dir)
+        self.max_open_maps = max_open_maps
+        self.verify_on_open = verify_on_open
+        self._lock = threading.Lock()
+        self._files: Optional[dict[str, dict[str, Any]]] = None
+        # Relative path of each digest
+        self._paths: dict[str, str] = {}
+        self._maps: collections.OrderedDict[
+            str, mmap.mmap
+        ] = collections.OrderedDict()
+
+    def _manifest_files(self: DataStore) -> dict[str, dict[str, Any]]:
+        """Get manifest entries per relative path, reading it once."""
+        with self._lock:
+            if self._files is None:
+                files = read_manifest(self.data_dir)["files"]
+                self._paths = {
+                    entry["sha256"]: relative_path
+                    for relative_path, entry in files.items()
+                }
+                self._files = files
+            return self._files
+
+    def digest(self: DataStore, ref: str) -> str:
+        """
+        Get digest of a data file.
+
+        :param ref: digest, unique digest prefix or relative path of file.
+        :returns: SHA-256 hex digest of the file.
+        :raises KeyError: if no data file or several data files match ref.
+        """
+        files = self._manifest_files()
+        if ref in files:
+            return files[ref]["sha256"]
+        if ref in self._paths:
+            return ref
+        if _DIGEST_PREFIX.fullmatch(ref):
+            matches = [
+                digest for digest in self._paths if digest.startswith(ref)
+            ]
+            if len(matches) == 1:
+                return matches[0]
+            if matches:
+                raise KeyError(f"Digest prefix {ref} of several data files")
+        raise KeyError(f"No data file {ref} in {self.data_dir}")
+
+    def path(self: DataStore, ref: str) -> pathlib.Path:
+        """
+        Get path of a data file.
+
+        :param ref: digest, unique digest prefix or relative path of file.
+        :returns: path of the file.
+        :raises KeyError: if no data file matches ref.
+        """
+        return self.data_dir / self._paths[self.digest(ref)]
+
+    def _map(self: DataStore, digest: str) -> Optional[mmap.mmap]:
+        """Get open map of file of digest, None for empty files."""
+        with self._lock:
+            data = self._maps.get(digest)
+            if data is not None:
+                self._maps.move_to_end(digest)
+                return data
+            relative_path = self._paths[digest]
+            entry = self._files[relative_path]
+
+        path = self.data_dir / relative_path
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size != entry["size"]:
+                raise DataIntegrityError(
+                    f"{relative_path} is {size} bytes, manifest records "
+                    f"{entry['size']} bytes"
+                )
+            if not size:
+                return None
+            if self.verify_on_open and file_digest(path) != digest:
+                raise DataIntegrityError(
+                    f"{relative_path} does not match its manifest digest"
+                )
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        with self._lock:
+            data = self._maps.setdefault(digest, data)
+            self._maps.move_to_end(digest)
+            # Evicted maps are not closed, as views of them may still be in
+            # use, they are unmapped once their last view is released
+            while len(self._maps) > self.max_open_maps:
+                self._maps.popitem(last=False)
+            return data
+
+    def bytes(self: DataStore, ref: str) -> memoryview:
+        """
+        Get read only bytes view of a data file, mapping it on first use.
+
+        :param ref: digest, unique digest prefix or relative path of file.
+        :returns: read only view of the file content.
+        :raises KeyError: if no data file matches ref.
+        :raises DataIntegrityError: if the file does not match its manifest.
+        """
+        data = self._map(self.digest(ref))
+        return memoryview(b"" if data is None else data)
+
+    def array(
+        self: DataStore,
+        ref: str,
+        dtype: Any = None,
+        shape: Optional[tuple[int, ...]] = None,
+    ) -> Any:
+        """
+        Get read only NumPy array view of a data file, mapping it on first
+        use. .npy files are viewed with the dtype and shape of their header,
+        other files as raw arrays of dtype.
+
+        :param ref: digest, unique digest prefix or relative path of file.
+        :param dtype: dtype of raw files, uint8 by default.
+        :param shape: optional shape of raw files.
+        :returns: read only numpy.ndarray sharing the mapped pages.
+        :raises KeyError: if no data file matches ref.
+        :raises DataIntegrityError: if the file does not match its manifest.
+        :raises ValueError: if a .npy file holds Python objects.
+        """
+        # Deferred import so numpy is only loaded when arrays are used
+        import numpy  # pylint: disable=import-outside-toplevel
+
+        digest = self.digest(ref)
+        view = self.bytes(digest)
+        if not self._paths[digest].endswith(".npy"):
+            array = numpy.frombuffer(view, dtype=dtype or numpy.uint8)
+            return array if shape is None else array.reshape(shape)
+
+        with open(self.data_dir / self._paths[digest], "rb") as file:
+            version = numpy.lib.format.read_magic(file)
+            shape, fortran_order, dtype = (
+                numpy.lib.format.read_array_header_1_0(file)
+                if version == (1, 0)
+                else numpy.lib.format.read_array_header_2_0(file)
+            )
+            offset = file.tell()
+        if dtype.hasobject:
+            raise ValueError(f"{ref} holds Python objects, can not be mapped")
+        count = 1
+        for length in shape:
+            count *= length
+        array = numpy.frombuffer(view, dtype=dtype, count=count, offset=offset)
+        return array.reshape(shape, order="F" if fortran_order else "C")
+
+    def verify(
+        self: DataStore, refs: Optional[Iterable[str]] = None
+    ) -> list[str]:
+        """
+        Check data files against their manifest digests, reading them whole.
+
+        :param refs: files to check, by default all files in the manifest,
+            also checking that all data files are in the manifest.
+        :returns: descriptions of files which do not match, empty if all do.
+        """
+        files = self._manifest_files()
+        problems = []
+        if refs is None:
+            relative_paths = list(files)
+            problems += [
+                f"{relative_path} is not in the manifest"
+                for relative_path in data_files(self.data_dir)
+                if relative_path not in files
+            ]
+        else:
+            relative_paths = [self._paths[self.digest(ref)] for ref in refs]
+        for relative_path in relative_paths:
+            path = self.data_dir / relative_path
+            if not path.is_file():
+                problems.append(f"{relative_path} is missing")
+            elif file_digest(path) != files[relative_path]["sha256"]:
+                problems.append(
+                    f"{relative_path} does not match its manifest digest"
+                )
+        return problems
+
+    @property
+    def open_maps(self: DataStore) -> int:
+        """Number of maps kept open."""
+        with self._lock:
+            return len(self._maps)
+
+    def clear(self: DataStore):
+        """Forget the manifest and open maps, e.g. after data changed."""
+        with self._lock:
+            self._files = None
+            self._paths = {}
+            self._maps.clear()
+
+
+default_data_store = DataStore()
+"""DataStore of DEFAULT_DATA_DIR shared within a process."""
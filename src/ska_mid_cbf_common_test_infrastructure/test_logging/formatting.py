@@ -1,6 +1,7 @@
 """Log format for all test repositories."""
 
 import logging
+from typing import Optional
 
 LOG_FORMAT = "[%(asctime)s|%(levelname)s|%(filename)s#%(lineno)s] %(message)s"
 
@@ -8,12 +9,19 @@ FORMAT_HANDLER = logging.StreamHandler()
 FORMAT_HANDLER.setFormatter(logging.Formatter(LOG_FORMAT))
 
 
-def setup_logger(logger: logging.Logger):
+def setup_logger(
+    logger: logging.Logger, log_filter: Optional[logging.Filter] = None
+):
     """
     Setup up given logger with format of LOG_FORMAT and INFO logging level.
 
+    :param logger: logger to setup.
+    :param log_filter: optional filter to add to logger, e.g. a
+        ThrottlingFilter to rate limit and sample INFO records.
     :returns: given logger
     """
     logger.addHandler(FORMAT_HANDLER)
     logger.setLevel(logging.INFO)
+    if log_filter is not None:
+        logger.addFilter(log_filter)
     return logger
@@ -0,0 +1,315 @@
+"""
+Rotating log file sink for long running test sessions which compresses closed
+log segments in the background.
+
+Each closed segment is compressed as a sequence of independently decompressible
+blocks (gzip members or zstd frames) alongside a JSON index of the time range
+and compressed byte offset of each block, so that records in a time range can
+be extracted with extract_time_range without decompressing the whole run.
+"""
+
+from __future__ import annotations
+
+import glob
+import gzip
+import json
+import logging
+import os
+import queue
+import re
+import threading
+from typing import Iterator, Optional
+
+from .formatting import LOG_FORMAT
+
+COMPRESSIONS = ("gzip", "zstd")
+"""Supported compressions of closed segments, zstd requires zstandard."""
+
+INDEX_SUFFIX = ".idx.json"
+"""Suffix of segment index files appended to compressed segment paths."""
+
+_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def _compress(compression: str, data: bytes) -> bytes:
+    """Compress data as one gzip member or zstd frame."""
+    if compression == "zstd":
+        import zstandard  # pylint: disable=import-outside-toplevel
+
+        return zstandard.ZstdCompressor().compress(data)
+    return gzip.compress(data)
+
+
+def _decompress(compression: str, data: bytes) -> bytes:
+    """Decompress one gzip member or zstd frame."""
+    if compression == "zstd":
+        import zstandard  # pylint: disable=import-outside-toplevel
+
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class CompressedRotatingFileHandler(logging.Handler):
+    """
+    Logging handler writing records to log segments which are rotated once
+    they exceed max_bytes or are older than interval_sec. Closed segments are
+    compressed by a background thread and their uncompressed file removed.
+
+    Segments are written to ``{base_path}.{sequence:05d}.log`` and compressed
+    to ``{base_path}.{sequence:05d}.log.gz`` (or ``.zst``) with an index in
+    ``{compressed_path}.idx.json``.
+    """
+
+    def __init__(
+        self: CompressedRotatingFileHandler,
+        base_path: str | os.PathLike,
+        max_bytes: Optional[int] = 256 << 20,
+        interval_sec: Optional[float] = None,
+        compression: str = "gzip",
+        block_bytes: int = 1 << 20,
+    ):
+        """
+        Initialize a CompressedRotatingFileHandler instance, formatted with
+        LOG_FORMAT by default.
+
+        :param base_path: path prefix of log segments.
+        :param max_bytes: size in bytes to rotate segments at, None to not
+            rotate by size.
+        :param interval_sec: age in seconds to rotate segments at, None to
+            not rotate by time.
+        :param compression: compression of closed segments, one of
+            COMPRESSIONS.
+        :param block_bytes: approximate uncompressed size of independently
+            compressed blocks, i.e. the granularity of the time index.
+        :raises ValueError: if compression is not supported.
+        :raises ImportError: if zstd compression is used without zstandard
+            installed.
+        """
+        super().__init__()
+        if compression not in COMPRESSIONS:
+            raise ValueError(
+                f"compression must be one of {COMPRESSIONS}, "
+                f"got {compression}"
+            )
+        if compression == "zstd":
+            import zstandard  # noqa: F401 pylint: disable=W0611,C0415
+
+        self.setFormatter(logging.Formatter(LOG_FORMAT))
+        self.base_path = os.fspath(base_path)
+        self.max_bytes = max_bytes
+        self.interval_sec = interval_sec
+        self.compression = compression
+        self.block_bytes = block_bytes
+
+        self._sequence = self._next_sequence()
+        self._segment_file = None
+        self._segment_path = ""
+        self._segment_opened_sec = 0.0
+        self._segment_bytes = 0
+        # Blocks of current segment as [first_ts, last_ts, offset]
+        self._blocks: list[list[float]] = []
+
+        self._compress_queue: queue.Queue = queue.Queue()
+        self._compress_thread = threading.Thread(
+            target=self._compress_worker,
+            name="CompressedRotatingFileHandler",
+            daemon=True,
+        )
+        self._compress_thread.start()
+
+    def _next_sequence(self: CompressedRotatingFileHandler) -> int:
+        """Sequence number following any existing segments of base_path."""
+        segment_pattern = re.compile(
+            re.escape(os.path.basename(self.base_path)) + r"\.(\d+)\.log"
+        )
+        sequences = [
+            int(match.group(1))
+            for match in map(
+                segment_pattern.match,
+                os.listdir(os.path.dirname(self.base_path) or "."),
+            )
+            if match is not None
+        ]
+        return max(sequences, default=-1) + 1
+
+    def _open_segment(self: CompressedRotatingFileHandler, opened_sec: float):
+        """
+        Open a new log segment starting at opened_sec, must be called holding
+        handler lock.
+        """
+        self._segment_path = f"{self.base_path}.{self._sequence:05d}.log"
+        self._sequence += 1
+        self._segment_file = open(  # pylint: disable=consider-using-with
+            self._segment_path, "wb"
+        )
+        self._segment_opened_sec = opened_sec
+        self._segment_bytes = 0
+        self._blocks = []
+
+    def _close_segment(self: CompressedRotatingFileHandler):
+        """
+        Close current log segment and queue it for compression, must be
+        called holding handler lock.
+        """
+        if self._segment_file is None:
+            return
+        self._segment_file.close()
+        self._segment_file = None
+        self._compress_queue.put((self._segment_path, self._blocks))
+
+    def _should_rotate(self: CompressedRotatingFileHandler, now_sec: float):
+        """Whether current segment is due for rotation."""
+        return (
+            self.max_bytes is not None
+            and self._segment_bytes >= self.max_bytes
+        ) or (
+            self.interval_sec is not None
+            and now_sec - self._segment_opened_sec >= self.interval_sec
+        )
+
+    def emit(self: CompressedRotatingFileHandler, record: logging.LogRecord):
+        """
+        Write formatted record to the current segment, rotating first if due.
+
+        :param record: record to write.
+        """
+        try:
+            data = (self.format(record) + "\n").encode("utf-8")
+            if self._segment_file is not None and self._should_rotate(
+                record.created
+            ):
+                self._close_segment()
+            if self._segment_file is None:
+                self._open_segment(record.created)
+
+            if (
+                not self._blocks
+                or self._segment_bytes - self._blocks[-1][2]
+                >= self.block_bytes
+            ):
+                self._blocks.append(
+                    [record.created, record.created, self._segment_bytes]
+                )
+            else:
+                self._blocks[-1][1] = record.created
+
+            self._segment_file.write(data)
+            self._segment_bytes += len(data)
+        except Exception:  # pylint: disable=broad-except
+            self.handleError(record)
+
+    def flush(self: CompressedRotatingFileHandler):
+        """Flush current segment to disk."""
+        with self.lock:
+            if self._segment_file is not None:
+                self._segment_file.flush()
+
+    def rotate(self: CompressedRotatingFileHandler):
+        """
+        Close the current segment for compression, the next record starts a
+        new segment.
+        """
+        with self.lock:
+            self._close_segment()
+
+    def close(self: CompressedRotatingFileHandler):
+        """
+        Close the current segment and wait for all closed segments to be
+        compressed.
+        """
+        with self.lock:
+            self._close_segment()
+        if self._compress_thread.is_alive():
+            self._compress_queue.put(None)
+            self._compress_thread.join()
+        super().close()
+
+    def _compress_worker(self: CompressedRotatingFileHandler):
+        """Compress closed segments queued until None is queued."""
+        while True:
+            item = self._compress_queue.get()
+            if item is None:
+                return
+            try:
+                self._compress_segment(*item)
+            except Exception:  # pylint: disable=broad-except
+                logging.getLogger(__name__).exception(
+                    f"Failed to compress log segment {item[0]}"
+                )
+
+    def _compress_segment(
+        self: CompressedRotatingFileHandler,
+        segment_path: str,
+        blocks: list[list[float]],
+    ):
+        """
+        Compress segment_path block by block, write its index and remove the
+        uncompressed segment.
+        """
+        compressed_path = segment_path + _EXTENSIONS[self.compression]
+        index = {"compression": self.compression, "blocks": []}
+        with open(segment_path, "rb") as segment, open(
+            compressed_path, "wb"
+        ) as compressed:
+            for block_index, (first_ts, last_ts, offset) in enumerate(blocks):
+                end = (
+                    blocks[block_index + 1][2]
+                    if block_index + 1 < len(blocks)
+                    else None
+                )
+                segment.seek(int(offset))
+                data = segment.read(-1 if end is None else int(end - offset))
+                block = _compress(self.compression, data)
+                index["blocks"].append(
+                    {
+                        "first_ts": first_ts,
+                        "last_ts": last_ts,
+                        "offset": compressed.tell(),
+                        "length": len(block),
+                    }
+                )
+                compressed.write(block)
+
+        with open(
+            compressed_path + INDEX_SUFFIX, "w", encoding="utf-8"
+        ) as index_file:
+            json.dump(index, index_file)
+        os.remove(segment_path)
+
+
+def extract_time_range(
+    base_path: str | os.PathLike, start_sec: float, end_sec: float
+) -> Iterator[str]:
+    """
+    Extract log lines of compressed segments of base_path in blocks which
+    overlap the time range [start_sec, end_sec], only decompressing those
+    blocks. Lines are extracted at block granularity, so lines just outside
+    the range may be included.
+
+    :param base_path: path prefix of log segments given to
+        CompressedRotatingFileHandler.
+    :param start_sec: start of time range as time.time() timestamp.
+    :param end_sec: end of time range as time.time() timestamp.
+    :returns: iterator of log lines without line endings.
+    """
+    index_paths = sorted(
+        glob.glob(f"{glob.escape(os.fspath(base_path))}.*{INDEX_SUFFIX}")
+    )
+    for index_path in index_paths:
+        with open(index_path, encoding="utf-8") as index_file:
+            index = json.load(index_file)
+        blocks = [
+            block
+            for block in index["blocks"]
+            if block["last_ts"] >= start_sec and block["first_ts"] <= end_sec
+        ]
+        if not blocks:
+            continue
+
+        with open(index_path[: -len(INDEX_SUFFIX)], "rb") as compressed:
+            for block in blocks:
+                compressed.seek(block["offset"])
+                data = _decompress(
+                    index["compression"], compressed.read(block["length"])
+                )
+                yield from data.decode("utf-8").splitlines()
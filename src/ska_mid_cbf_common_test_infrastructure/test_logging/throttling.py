@@ -0,0 +1,201 @@
+"""Rate limiting and sampling of log records for test repositories."""
+
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+SUMMARY_ATTR = "cti_suppression_summary"
+"""LogRecord attribute marking summaries of suppressed records."""
+
+
+class _TokenBucket:
+    """Token bucket refilling at rate tokens per second up to burst tokens."""
+
+    __slots__ = ("tokens", "last_sec")
+
+    def __init__(self: _TokenBucket, burst: float, now_sec: float):
+        self.tokens = burst
+        self.last_sec = now_sec
+
+    def take(
+        self: _TokenBucket, rate: float, burst: float, now_sec: float
+    ) -> bool:
+        """Take a token if available, returning whether one was taken."""
+        self.tokens = min(
+            burst, self.tokens + (now_sec - self.last_sec) * rate
+        )
+        self.last_sec = now_sec
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class ThrottlingFilter(logging.Filter):
+    """
+    Logging filter applying token bucket rate limiting and probabilistic
+    sampling to records below always_keep_level. Records at or above
+    always_keep_level and ALO FAIL records are always kept.
+
+    Counts of suppressed records are logged as a "N messages suppressed"
+    summary record at most every summary_interval_sec, emitted through the
+    logger of the record that triggered it, and on flush_summary.
+
+    The filter can be added to a logger (see setup_logger) to throttle the
+    records of that logger, or to a handler such as FORMAT_HANDLER to throttle
+    all records passing through it.
+    """
+
+    def __init__(
+        self: ThrottlingFilter,
+        rate_per_sec: Optional[float] = None,
+        burst: int = 10,
+        per_message: bool = False,
+        sample_rate: float = 1.0,
+        summary_interval_sec: float = 60.0,
+        always_keep_level: int = logging.WARNING,
+        seed: Optional[int] = None,
+        max_buckets: int = 10000,
+    ):
+        """
+        Initialize a ThrottlingFilter instance.
+
+        :param rate_per_sec: sustained rate of records kept per logger (or
+            per message if per_message), None for no rate limiting.
+        :param burst: number of records which may be kept in a burst above
+            rate_per_sec.
+        :param per_message: whether to rate limit each distinct message
+            separately rather than each logger.
+        :param sample_rate: probability of keeping an INFO or lower record
+            before rate limiting, 1.0 to keep all records.
+        :param summary_interval_sec: minimum interval between summaries of
+            suppressed records.
+        :param always_keep_level: level at and above which records are never
+            suppressed.
+        :param seed: optional seed of sampling random number generator.
+        :param max_buckets: maximum number of rate limited loggers or
+            messages tracked, the least recently seen is forgotten beyond
+            it so that distinct messages do not grow memory without bound.
+        :raises ValueError: if sample_rate is not within [0, 1].
+        """
+        super().__init__()
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError(
+                f"sample_rate must be within [0, 1], got {sample_rate}"
+            )
+        self.rate_per_sec = rate_per_sec
+        self.burst = burst
+        self.per_message = per_message
+        self.sample_rate = sample_rate
+        self.summary_interval_sec = summary_interval_sec
+        self.always_keep_level = always_keep_level
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.max_buckets = max_buckets
+        self._buckets: OrderedDict[
+            tuple[str, str], _TokenBucket
+        ] = OrderedDict()
+        self._suppressed: dict[str, int] = {}
+        self._last_summary_sec = time.monotonic()
+
+    def _always_keep(
+        self: ThrottlingFilter, record: logging.LogRecord
+    ) -> bool:
+        """Whether record must never be suppressed."""
+        return (
+            record.levelno >= self.always_keep_level
+            or getattr(record, SUMMARY_ATTR, False)
+            or str(record.msg).startswith("FAIL")
+        )
+
+    def _allow(
+        self: ThrottlingFilter, record: logging.LogRecord, now_sec: float
+    ) -> bool:
+        """
+        Whether record passes sampling and rate limiting, must be called
+        holding _lock.
+        """
+        if (
+            self.sample_rate < 1.0
+            and record.levelno <= logging.INFO
+            and self._random.random() >= self.sample_rate
+        ):
+            return False
+
+        if self.rate_per_sec is None:
+            return True
+
+        key = (record.name, str(record.msg) if self.per_message else "")
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _TokenBucket(self.burst, now_sec)
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket.take(self.rate_per_sec, self.burst, now_sec)
+
+    def filter(self: ThrottlingFilter, record: logging.LogRecord) -> bool:
+        """
+        Determine whether record is kept, emitting a summary of suppressed
+        records if one is due.
+
+        :param record: record to filter.
+        :returns: whether to keep the record.
+        """
+        if self._always_keep(record):
+            return True
+
+        now_sec = time.monotonic()
+        with self._lock:
+            keep = self._allow(record, now_sec)
+            if not keep:
+                self._suppressed[record.name] = (
+                    self._suppressed.get(record.name, 0) + 1
+                )
+            summary_due = (
+                self._suppressed
+                and now_sec - self._last_summary_sec
+                >= self.summary_interval_sec
+            )
+
+        if summary_due:
+            self.flush_summary(logging.getLogger(record.name))
+        return keep
+
+    @property
+    def suppressed_count(self: ThrottlingFilter) -> int:
+        """Number of records suppressed since the last summary."""
+        with self._lock:
+            return sum(self._suppressed.values())
+
+    def flush_summary(self: ThrottlingFilter, logger: logging.Logger):
+        """
+        Log a summary of records suppressed since the last summary, if any,
+        to logger and reset suppressed counts.
+
+        :param logger: logger to log summary to.
+        """
+        with self._lock:
+            suppressed = self._suppressed
+            self._suppressed = {}
+            self._last_summary_sec = time.monotonic()
+
+        if not suppressed:
+            return
+
+        by_logger = ", ".join(
+            f"{name}: {count}"
+            for name, count in sorted(
+                suppressed.items(), key=lambda item: item[1], reverse=True
+            )
+        )
+        logger.info(
+            f"{sum(suppressed.values())} messages suppressed ({by_logger})",
+            extra={SUMMARY_ATTR: True},
+        )
@@ -0,0 +1,19 @@
+"""
+The test_sharding service splits long AssertiveLoggingObserver based test
+suites, such as hardware in the loop suites, across shards or pytest-xdist
+workers with longest processing time first scheduling by recorded test
+durations, so that no runner is left idle while another runs the longest
+tests. Test durations, including time spent waiting in observations as
+timed by an AloWaitTimer hook, are recorded in ShardDurations files.
+
+Enable the pytest plugin in conftest.py with::
+
+    pytest_plugins = [
+        "ska_mid_cbf_common_test_infrastructure.test_sharding.plugin"
+    ]
+
+see the plugin module for its options.
+"""
+
+from .durations import AloWaitTimer, ShardDurations  # noqa: F401
+from .scheduling import lpt_schedule  # noqa: F401
@@ -0,0 +1,192 @@
+"""
+Code for recording test durations, including time spent waiting in
+AssertiveLoggingObserver observations, to JSON duration files.
+"""
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Iterable, Optional
+
+from ..assertive_logging_observer import ObservationContext, ObservationHook
+
+DURATIONS_VERSION = 1
+"""Version of the JSON duration file format."""
+
+
+def _current_test_id() -> str:
+    """ID of the running pytest test without its test phase, "" if none."""
+    return os.environ.get("PYTEST_CURRENT_TEST", "").rsplit(" (", 1)[0]
+
+
+class ShardDurations:
+    """
+    Recorded durations of tests by pytest node ID, smoothed over runs with
+    an exponential moving average. Stored as JSON::
+
+        {
+            "version": 1,
+            "tests": {
+                "tests/test_scan.py::test_scan": {
+                    "duration_sec": 312.5,
+                    "alo_wait_sec": 280.1,
+                    "updated_at": 1760000000.0
+                }
+            }
+        }
+    """
+
+    def __init__(self: ShardDurations, weight: float = 0.5):
+        """
+        Initialize an empty ShardDurations instance.
+
+        :param weight: weight of a new duration in the moving average, 1.0
+            keeps only the latest duration.
+        """
+        self.weight = weight
+        self.tests: dict[str, dict[str, float]] = {}
+
+    @classmethod
+    def load(
+        cls: type[ShardDurations],
+        paths: Iterable[str | os.PathLike],
+        weight: float = 0.5,
+    ) -> ShardDurations:
+        """
+        Load durations merged from duration files, e.g. those stored by each
+        shard of a pipeline. Where files have durations of the same test the
+        most recently updated are kept, missing files are ignored.
+
+        :param paths: duration files.
+        :param weight: see __init__.
+        :returns: merged durations.
+        :raises ValueError: if a file is not a duration file.
+        """
+        durations = cls(weight)
+        for path in paths:
+            try:
+                with open(path, encoding="utf-8") as file:
+                    content = json.load(file)
+            except FileNotFoundError:
+                continue
+            if content.get("version") != DURATIONS_VERSION:
+                raise ValueError(f"{path} is not a version 1 duration file")
+            for test_id, entry in content["tests"].items():
+                current = durations.tests.get(test_id)
+                if (
+                    current is None
+                    or entry["updated_at"] > current["updated_at"]
+                ):
+                    durations.tests[test_id] = entry
+        return durations
+
+    def save(self: ShardDurations, path: str | os.PathLike):
+        """
+        Atomically replace duration file at path with these durations.
+
+        :param path: duration file.
+        """
+        text = json.dumps(
+            {"version": DURATIONS_VERSION, "tests": self.tests},
+            indent=2,
+            sort_keys=True,
+        )
+        directory = os.path.dirname(os.path.abspath(path))
+        file_descriptor, temp_path = tempfile.mkstemp(
+            dir=directory, prefix=".durations", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+                file.write(text)
+            os.replace(temp_path, path)
+        except OSError:
+            os.unlink(temp_path)
+            raise
+
+    def update(
+        self: ShardDurations,
+        test_id: str,
+        duration_sec: float,
+        alo_wait_sec: float = 0.0,
+        updated_at: Optional[float] = None,
+    ):
+        """
+        Update durations of a test with the durations of a run.
+
+        :param test_id: pytest node ID of the test.
+        :param duration_sec: duration of setup, call and teardown of the
+            test (seconds).
+        :param alo_wait_sec: part of duration_sec spent in observations
+            (seconds).
+        :param updated_at: time.time() of the run, defaults to now.
+        """
+        entry = self.tests.get(test_id)
+        if entry is not None:
+            duration_sec = self._average(entry["duration_sec"], duration_sec)
+            alo_wait_sec = self._average(entry["alo_wait_sec"], alo_wait_sec)
+        self.tests[test_id] = {
+            "duration_sec": duration_sec,
+            "alo_wait_sec": alo_wait_sec,
+            "updated_at": time.time() if updated_at is None else updated_at,
+        }
+
+    def _average(self: ShardDurations, previous: float, latest: float):
+        return previous + self.weight * (latest - previous)
+
+    def expected_sec(
+        self: ShardDurations, test_ids: Iterable[str]
+    ) -> list[float]:
+        """
+        Get expected durations of tests, the mean recorded duration of the
+        tests for tests without durations, or 1s if none have durations.
+
+        :param test_ids: pytest node IDs of tests.
+        :returns: expected duration of each test (seconds).
+        """
+        recorded = [
+            entry["duration_sec"] if entry is not None else None
+            for entry in map(self.tests.get, test_ids)
+        ]
+        known = [duration for duration in recorded if duration is not None]
+        default_sec = sum(known) / len(known) if known else 1.0
+        return [
+            default_sec if duration is None else duration
+            for duration in recorded
+        ]
+
+
+class AloWaitTimer(ObservationHook):
+    """
+    ObservationHook accumulating time spent in observations per running
+    pytest test, so that recorded test durations show how much of them is
+    spent waiting on devices.
+    """
+
+    def __init__(self: AloWaitTimer):
+        self._lock = threading.Lock()
+        self._wait_sec: dict[str, float] = {}
+
+    def on_observation_end(self: AloWaitTimer, context: ObservationContext):
+        """
+        Add duration of observation to the running test.
+
+        :param context: context of the observation.
+        """
+        test_id = _current_test_id()
+        with self._lock:
+            self._wait_sec[test_id] = self._wait_sec.get(test_id, 0.0) + (
+                context.end_sec - context.start_sec
+            )
+
+    def pop(self: AloWaitTimer, test_id: str) -> float:
+        """
+        Get and reset time spent in observations of a test.
+
+        :param test_id: pytest node ID of the test.
+        :returns: time spent in observations (seconds).
+        """
+        with self._lock:
+            return self._wait_sec.pop(test_id, 0.0)
@@ -0,0 +1,200 @@
+"""
+pytest plugin splitting a suite across shards with longest processing time
+first scheduling by recorded test durations, and recording test durations
+including time spent in AssertiveLoggingObserver observations.
+
+Enable it in the conftest.py of a test repository with::
+
+    pytest_plugins = [
+        "ska_mid_cbf_common_test_infrastructure.test_sharding.plugin"
+    ]
+
+and attach the alo_wait_timer fixture to observers::
+
+    observer.add_hook(alo_wait_timer)
+
+then record durations with ``--cti-store-durations durations.json`` and run
+shard i of n with ``--cti-durations durations.json --cti-shards n
+--cti-shard-index i``. Shards default to the GitLab CI parallel job
+variables CI_NODE_TOTAL and CI_NODE_INDEX. With pytest-xdist, use
+``--cti-longest-first`` to order tests longest first so that load
+distribution schedules them longest processing time first across workers.
+"""
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+import pytest
+
+from .durations import AloWaitTimer, ShardDurations
+from .scheduling import lpt_schedule
+
+PLUGIN_NAME = "cti_sharding"
+"""Name the ShardingPlugin is registered under."""
+
+ALO_WAIT_PROPERTY = "cti_alo_wait_sec"
+"""Test report user property of time spent in observations (seconds)."""
+
+
+def pytest_addoption(parser: pytest.Parser):
+    """Add command line options of the plugin."""
+    group = parser.getgroup(PLUGIN_NAME, "CTI duration aware test sharding")
+    group.addoption(
+        "--cti-durations",
+        action="append",
+        default=[],
+        metavar="PATH",
+        help="duration file to schedule tests by, may be repeated to merge "
+        "the duration files of several shards",
+    )
+    group.addoption(
+        "--cti-store-durations",
+        metavar="PATH",
+        help="duration file to store --cti-durations updated with the "
+        "durations of this run to",
+    )
+    group.addoption(
+        "--cti-shards",
+        type=int,
+        metavar="N",
+        help="number of shards to split tests into, default CI_NODE_TOTAL",
+    )
+    group.addoption(
+        "--cti-shard-index",
+        type=int,
+        metavar="I",
+        help="0-based index of shard to run, default CI_NODE_INDEX - 1",
+    )
+    group.addoption(
+        "--cti-longest-first",
+        action="store_true",
+        help="run tests longest first, e.g. for pytest-xdist load "
+        "distribution",
+    )
+
+
+def pytest_configure(config: pytest.Config):
+    """Register the ShardingPlugin of the session."""
+    config.pluginmanager.register(ShardingPlugin(config), PLUGIN_NAME)
+
+
+@pytest.fixture(scope="session")
+def alo_wait_timer(request: pytest.FixtureRequest) -> AloWaitTimer:
+    """
+    AloWaitTimer to add as hook to AssertiveLoggingObservers so that time
+    spent in their observations is recorded with test durations.
+    """
+    return request.config.pluginmanager.get_plugin(PLUGIN_NAME).wait_timer
+
+
+def _shard_options(config: pytest.Config) -> tuple[int, int]:
+    """Get (shards, shard index) from options or CI variables."""
+    shards = config.getoption("cti_shards")
+    shard_index = config.getoption("cti_shard_index")
+    if shards is None and "CI_NODE_TOTAL" in os.environ:
+        shards = int(os.environ["CI_NODE_TOTAL"])
+        shard_index = int(os.environ.get("CI_NODE_INDEX", "1")) - 1
+    shards = 1 if shards is None else shards
+    shard_index = 0 if shard_index is None else shard_index
+    if shards < 1 or not 0 <= shard_index < shards:
+        raise pytest.UsageError(
+            f"Invalid shard index {shard_index} of {shards} shards"
+        )
+    return shards, shard_index
+
+
+class ShardingPlugin:
+    """
+    Plugin state of a pytest session: scheduled shard, durations measured
+    so far and the AloWaitTimer of the session.
+    """
+
+    def __init__(self: ShardingPlugin, config: pytest.Config):
+        """
+        Initialize a ShardingPlugin instance from the options of config.
+
+        :param config: pytest config of the session.
+        :raises pytest.UsageError: if the shard options are invalid.
+        """
+        self.shards, self.shard_index = _shard_options(config)
+        self.durations = ShardDurations.load(config.getoption("cti_durations"))
+        self.store_path: Optional[str] = config.getoption(
+            "cti_store_durations"
+        )
+        self.longest_first = config.getoption("cti_longest_first")
+        # pytest-xdist workers report to the controller, which stores
+        self.is_worker = hasattr(config, "workerinput")
+        self.wait_timer = AloWaitTimer()
+        self.summary: Optional[str] = None
+        # [duration_sec, alo_wait_sec] measured per test
+        self._measured: dict[str, list[float]] = {}
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(
+        self: ShardingPlugin, config: pytest.Config, items: list[pytest.Item]
+    ):
+        """Deselect tests of other shards and order tests if requested."""
+        expected_sec = self.durations.expected_sec(
+            [item.nodeid for item in items]
+        )
+        if self.shards > 1:
+            selected = lpt_schedule(expected_sec, self.shards)[
+                self.shard_index
+            ]
+            keep = set(selected)
+            deselected = [
+                item for index, item in enumerate(items) if index not in keep
+            ]
+            if deselected:
+                config.hook.pytest_deselected(items=deselected)
+            self.summary = (
+                f"cti shard {self.shard_index + 1}/{self.shards}: "
+                f"{len(selected)} of {len(items)} tests, expected "
+                f"{sum(expected_sec[i] for i in selected):.1f}s of "
+                f"{sum(expected_sec):.1f}s"
+            )
+            items[:] = [items[index] for index in selected]
+            expected_sec = [expected_sec[index] for index in selected]
+        if self.longest_first:
+            order = sorted(
+                range(len(items)), key=lambda i: (-expected_sec[i], i)
+            )
+            items[:] = [items[index] for index in order]
+
+    def pytest_report_collectionfinish(
+        self: ShardingPlugin,
+    ) -> Optional[str]:
+        """Report the scheduled shard."""
+        return self.summary
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_makereport(
+        self: ShardingPlugin, item: pytest.Item, call: pytest.CallInfo
+    ):
+        """Add time spent in observations to the teardown report."""
+        if call.when == "teardown":
+            item.user_properties.append(
+                (ALO_WAIT_PROPERTY, self.wait_timer.pop(item.nodeid))
+            )
+
+    def pytest_runtest_logreport(
+        self: ShardingPlugin, report: pytest.TestReport
+    ):
+        """Measure durations of test phases."""
+        measured = self._measured.setdefault(report.nodeid, [0.0, 0.0])
+        measured[0] += report.duration
+        if report.when == "teardown":
+            measured[1] += sum(
+                value
+                for name, value in report.user_properties
+                if name == ALO_WAIT_PROPERTY
+            )
+
+    def pytest_sessionfinish(self: ShardingPlugin):
+        """Store durations updated with measured durations."""
+        if self.store_path is None or self.is_worker:
+            return
+        for test_id, (duration_sec, alo_wait_sec) in self._measured.items():
+            self.durations.update(test_id, duration_sec, alo_wait_sec)
+        self.durations.save(self.store_path)
@@ -0,0 +1,35 @@
+"""
+Code for longest processing time first (LPT) scheduling of tests to shards
+by their expected durations.
+"""
+from __future__ import annotations
+
+import heapq
+from typing import Sequence
+
+
+def lpt_schedule(durations: Sequence[float], shards: int) -> list[list[int]]:
+    """
+    Schedule tests to shards longest processing time first, i.e. assign
+    each test in order of decreasing duration to the shard with the least
+    total duration so far, which balances total shard durations to within
+    4/3 of optimal.
+
+    :param durations: expected duration of each test (seconds).
+    :param shards: number of shards.
+    :returns: indices of tests scheduled to each shard, in ascending order
+        so that shards keep the collection order of tests.
+    :raises ValueError: if shards is less than 1.
+    """
+    if shards < 1:
+        raise ValueError(f"Need at least 1 shard, got {shards}")
+    # Ties are broken by index and shard so schedules are deterministic,
+    # as every pytest-xdist worker must compute the same schedule
+    order = sorted(range(len(durations)), key=lambda i: (-durations[i], i))
+    loads = [(0.0, shard) for shard in range(shards)]
+    scheduled: list[list[int]] = [[] for _ in range(shards)]
+    for index in order:
+        load, shard = heapq.heappop(loads)
+        scheduled[shard].append(index)
+        heapq.heappush(loads, (load + durations[index], shard))
+    return [sorted(indices) for indices in scheduled]
@@ -156,8 +156,8 @@ class TestAssertiveLoggingObserverLRC:
         Teardown DeviceTestContext of MockTangoDevice for testing and also
         unsubscribing TangoEventTracer.
         """
-        cls.reporter.reset_event_tracer()
-        cls.asserter.reset_event_tracer()
+        cls.reporter.close()
+        cls.asserter.close()
         cls.context.__exit__(None, None, None)
 
     def setup_method(self: TestAssertiveLoggingObserverLRC, method):
@@ -387,20 +387,168 @@ class TestAssertiveLoggingObserverLRC:
             if "Reached past observe_lrc_ok" in str(exception):
                 raise exception
 
-    def test_ALO_destructor(self: TestAssertiveLoggingObserverLRC):
+    def test_ALO_subscription_event_filter(
+        self: TestAssertiveLoggingObserverLRC,
+    ):
         """
-        Test that destructor successfully unsubscribes associated event_tracer.
+        Test that events rejected by a subscription event filter are dropped
+        and counted, while accepted events are still observed.
         """
-        to_destroy = AssertiveLoggingObserver(
-            AssertiveLoggingObserverMode.REPORTING, test_logger
+        filtered = AssertiveLoggingObserver(
+            AssertiveLoggingObserverMode.ASSERTING, test_logger
+        )
+        filtered.subscribe_event_tracer(
+            MockTangoDevice.POWERSWITCH_FQDN,
+            "state",
+            event_filter={DevState.FAULT},
+        )
+        filtered.subscribe_event_tracer(
+            MockTangoDevice.POWERSWITCH_FQDN,
+            "longRunningCommandResult",
+            event_filter=lambda value: "FailOnTurnOn" in str(value),
+        )
+
+        self.proxy.TurnOnImmediately()
+
+        try:
+            filtered.observe_device_attr_change(
+                MockTangoDevice.POWERSWITCH_FQDN,
+                "state",
+                DevState.ON,
+                0.5,
+            )
+            fail("Reached past observe_device_attr_change")
+        except AssertionError as exception:
+            if "Reached past observe_device_attr_change" in str(exception):
+                raise exception
+
+        assert_that(
+            filtered.dropped_event_count(
+                MockTangoDevice.POWERSWITCH_FQDN, "state"
+            )
+        ).is_greater_than(0)
+
+        self.proxy.TurnOff()
+        self.proxy.FailOnTurnOn()
+
+        filtered.observe_device_attr_change(
+            MockTangoDevice.POWERSWITCH_FQDN,
+            "state",
+            DevState.FAULT,
+            1,
+        )
+        # assertpy assertions on the tracer see the kept events
+        assert_that(filtered.event_tracer).has_change_event_occurred(
+            device_name=MockTangoDevice.POWERSWITCH_FQDN,
+            attribute_name="state",
+            attribute_value=DevState.FAULT,
+        )
+        filtered.close()
+
+    def test_ALO_isolated_event_collection(
+        self: TestAssertiveLoggingObserverLRC,
+    ):
+        """
+        Test ALO collecting events in a separate process observes PASS and
+        FAIL the same as with an in-process event tracer.
+        """
+        isolated = AssertiveLoggingObserver(
+            AssertiveLoggingObserverMode.ASSERTING,
+            test_logger,
+            isolate_event_collection=True,
         )
-        to_destroy.subscribe_event_tracer(
+        isolated.subscribe_event_tracer(
+            MockTangoDevice.POWERSWITCH_FQDN, "longRunningCommandResult"
+        )
+        isolated.subscribe_event_tracer(
             MockTangoDevice.POWERSWITCH_FQDN, "state"
         )
-        event_tracer_keep = to_destroy.event_tracer
 
-        # Explicitly call destroyer
-        del to_destroy
+        cmd_result = self.proxy.TurnOnAfter0p3Seconds()
+
+        isolated.observe_device_attr_change(
+            MockTangoDevice.POWERSWITCH_FQDN,
+            "state",
+            DevState.ON,
+            1,
+        )
+        isolated.observe_lrc_ok(
+            MockTangoDevice.POWERSWITCH_FQDN,
+            cmd_result,
+            "TurnOnAfter0p3Seconds",
+            1,
+        )
+
+        try:
+            isolated.observe_device_attr_change(
+                MockTangoDevice.POWERSWITCH_FQDN,
+                "state",
+                DevState.FAULT,
+                0.05,
+            )
+            fail("Reached past observe_device_attr_change")
+        except AssertionError as exception:
+            if "Reached past observe_device_attr_change" in str(exception):
+                raise exception
+
+        isolated.close()
+
+    def test_ALO_isolated_event_collection_filter(
+        self: TestAssertiveLoggingObserverLRC,
+    ):
+        """
+        Test events rejected by a value filter are dropped in the collector
+        process and counted, while accepted events are still observed.
+        """
+        isolated = AssertiveLoggingObserver(
+            AssertiveLoggingObserverMode.ASSERTING,
+            test_logger,
+            isolate_event_collection=True,
+        )
+        isolated.subscribe_event_tracer(
+            MockTangoDevice.POWERSWITCH_FQDN,
+            "state",
+            event_filter={DevState.ON},
+        )
+
+        self.proxy.TurnOnImmediately()
+
+        isolated.observe_device_attr_change(
+            MockTangoDevice.POWERSWITCH_FQDN,
+            "state",
+            DevState.ON,
+            1,
+        )
+        assert_that(
+            isolated.dropped_event_count(
+                MockTangoDevice.POWERSWITCH_FQDN, "state"
+            )
+        ).is_greater_than(0)
+        assert_that(
+            [
+                record.attribute_value
+                for record in isolated.event_tracer.store.records
+            ]
+        ).does_not_contain(DevState.OFF)
+
+        isolated.close()
+
+    def test_ALO_close(self: TestAssertiveLoggingObserverLRC):
+        """
+        Test that closing as a context manager successfully unsubscribes
+        associated event_tracer, and that closed observers can not observe.
+        """
+        with AssertiveLoggingObserver(
+            AssertiveLoggingObserverMode.REPORTING, test_logger
+        ) as to_close:
+            to_close.subscribe_event_tracer(
+                MockTangoDevice.POWERSWITCH_FQDN, "state"
+            )
+            event_tracer_keep = to_close.event_tracer
+
+        assert_that(to_close.closed).is_true()
+        # Closing again does nothing
+        to_close.close()
 
         self.proxy.TurnOnImmediately()
 
@@ -417,6 +565,16 @@ class TestAssertiveLoggingObserverLRC:
         except AssertionError as assertion_err:
             if "Reached past assert_that" in str(assertion_err):
                 raise assertion_err
+        try:
+            to_close.observe_device_attr_change(
+                MockTangoDevice.POWERSWITCH_FQDN,
+                "state",
+                DevState.ON,
+                1,
+            )
+            fail("Reached past observe_device_attr_change")
+        except RuntimeError:
+            pass
 
     def test_ALO_lrc_fail_if_no_event_tracer(
         self: TestAssertiveLoggingObserverLRC,
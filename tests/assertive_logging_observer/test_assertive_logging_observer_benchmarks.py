@@ -0,0 +1,150 @@
+"""
+Benchmarks of AssertiveLoggingObserver hot paths using pytest-benchmark.
+
+Benchmarks are skipped in normal test runs and run with
+``make python-benchmark``, which saves results as JSON for regression
+tracking.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+
+import pytest
+from mock_tango_device import MockTangoDevice
+from tango import DevState
+from tango.test_context import DeviceTestContext
+
+from ska_mid_cbf_common_test_infrastructure.assertive_logging_observer import (
+    AssertiveLoggingObserver,
+    AssertiveLoggingObserverMode,
+    EventRecord,
+)
+from ska_mid_cbf_common_test_infrastructure.test_logging.formatting import (
+    LOG_FORMAT,
+)
+
+BENCH_DEVICE_FQDN = "bench/device/01"
+
+STORED_EVENT_COUNTS = [10**3, 10**4, 10**5, 10**6]
+
+
+def _make_logger(name: str, formatted: bool) -> logging.Logger:
+    """
+    Make a logger with the test_logging format writing to memory if
+    formatted, otherwise a logger which discards all records.
+    """
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.handlers.clear()
+    if formatted:
+        handler = logging.StreamHandler(io.StringIO())
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    else:
+        logger.setLevel(logging.CRITICAL + 1)
+    return logger
+
+
+@pytest.fixture(params=["silenced", "formatted"])
+def reporter(request) -> AssertiveLoggingObserver:
+    """
+    Reporting ALO without event tracer, with a silenced logger to measure
+    observation cost alone or a test_logging formatted logger to measure
+    logger overhead.
+    """
+    logger = _make_logger(
+        f"{__name__}.{request.param}", request.param == "formatted"
+    )
+    return AssertiveLoggingObserver(
+        AssertiveLoggingObserverMode.REPORTING,
+        logger,
+        use_event_tracer=False,
+    )
+
+
+@pytest.fixture(scope="module", params=STORED_EVENT_COUNTS)
+def populated_observer(request) -> AssertiveLoggingObserver:
+    """
+    Reporting ALO with request.param events stored in its tracer, with the
+    only event matching the benchmarked observation stored last.
+    """
+    observer = AssertiveLoggingObserver(
+        AssertiveLoggingObserverMode.REPORTING,
+        _make_logger(f"{__name__}.populated", False),
+    )
+    observer.event_tracer.store.extend(
+        EventRecord(BENCH_DEVICE_FQDN, "healthState", index % 4, 0.0)
+        for index in range(request.param - 1)
+    )
+    observer.event_tracer.store.append(
+        EventRecord(BENCH_DEVICE_FQDN, "state", DevState.ON, 0.0)
+    )
+    yield observer
+    observer.close()
+
+
+@pytest.fixture(scope="module")
+def device_proxy():
+    """DeviceTestContext of MockTangoDevice for subscription benchmarks."""
+    context = DeviceTestContext(
+        MockTangoDevice,
+        device_name=MockTangoDevice.POWERSWITCH_FQDN,
+        process=True,
+    )
+    yield context.__enter__()
+    context.__exit__(None, None, None)
+
+
+@pytest.mark.parametrize("test_bool", [True, False])
+def test_benchmark_observe_true(benchmark, reporter, test_bool):
+    """Benchmark observe_true for PASS and FAIL observations."""
+    benchmark(reporter.observe_true, test_bool)
+
+
+@pytest.mark.parametrize(
+    "test_vals",
+    [("skao", "skao"), ("skao", "ska"), (list(range(64)), list(range(64)))],
+    ids=["str-pass", "str-fail", "list-pass"],
+)
+def test_benchmark_observe_equality(benchmark, reporter, test_vals):
+    """Benchmark observe_equality for PASS and FAIL observations."""
+    benchmark(reporter.observe_equality, *test_vals)
+
+
+def test_benchmark_observe_device_attr_change_match(
+    benchmark, populated_observer
+):
+    """
+    Benchmark match latency of observe_device_attr_change for a matching
+    event stored after 10^3 to 10^6 other events.
+    """
+    benchmark(
+        populated_observer.observe_device_attr_change,
+        BENCH_DEVICE_FQDN,
+        "state",
+        DevState.ON,
+        1,
+    )
+
+
+def test_benchmark_subscription_setup(benchmark, device_proxy):
+    """
+    Benchmark subscribing the ALO event_tracer to an attribute and resetting
+    the subscription.
+    """
+    observer = AssertiveLoggingObserver(
+        AssertiveLoggingObserverMode.REPORTING,
+        _make_logger(f"{__name__}.subscription", False),
+    )
+
+    def subscribe_and_reset():
+        observer.subscribe_event_tracer(
+            MockTangoDevice.POWERSWITCH_FQDN, "state"
+        )
+        observer.reset_event_tracer()
+
+    benchmark(subscribe_and_reset)
+    observer.close()
@@ -0,0 +1,57 @@
+"""
+Test that the assertive_logging_observer service only loads its Tango
+dependencies when they are used.
+
+Imports are checked in a fresh interpreter as other test modules import Tango.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+
+from assertpy import assert_that
+
+TANGO_MODULES = ("tango", "ska_tango_base", "ska_tango_testing")
+
+
+def _modules_loaded_after(code: str) -> list[str]:
+    """
+    Run given code in a fresh interpreter and return which of TANGO_MODULES
+    were imported by it.
+    """
+    check = (
+        f"{code}\n"
+        "import sys\n"
+        f"print(','.join(m for m in {TANGO_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", check],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return [name for name in result.stdout.strip().split(",") if name]
+
+
+def test_ALO_import_without_tango():
+    """
+    Test importing ALO and making basic observations with use_event_tracer
+    False does not import any Tango dependencies.
+    """
+    loaded = _modules_loaded_after(
+        "import logging\n"
+        "from ska_mid_cbf_common_test_infrastructure."
+        "assertive_logging_observer import (\n"
+        "    AssertiveLoggingObserver,\n"
+        "    AssertiveLoggingObserverMode,\n"
+        ")\n"
+        "alo = AssertiveLoggingObserver(\n"
+        "    AssertiveLoggingObserverMode.REPORTING,\n"
+        "    logging.getLogger(),\n"
+        "    use_event_tracer=False,\n"
+        ")\n"
+        "alo.observe_true(True)\n"
+        "alo.observe_equality(1, 2)\n"
+    )
+    assert_that(loaded).is_empty()
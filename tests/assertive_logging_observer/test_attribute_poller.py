@@ -0,0 +1,124 @@
+"""
+Test AssertiveLoggingObserver polling observations with an AttributePoller.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from assertpy import assert_that
+
+from ska_mid_cbf_common_test_infrastructure.assertive_logging_observer import (
+    AssertiveLoggingObserver,
+    AssertiveLoggingObserverMode,
+    AttributePoller,
+)
+
+
+class CountingDevice:
+    """Device whose attribute values advance with every read."""
+
+    def __init__(self: CountingDevice, fail_reads: bool = False):
+        self.reads: list[list[str]] = []
+        self.fail_reads = fail_reads
+
+    def read_attributes(self: CountingDevice, attr_names: list[str]):
+        """Read attributes, counter is the number of reads so far."""
+        if self.fail_reads:
+            raise RuntimeError("device unreachable")
+        self.reads.append(list(attr_names))
+        values = {"counter": len(self.reads), "state": "ON"}
+        return [SimpleNamespace(value=values[name]) for name in attr_names]
+
+
+def test_poll_batches_reads_per_device():
+    """
+    Test attributes of a device are read together, only while awaited, and
+    polling stops once all targets are reached.
+    """
+    devices = {"dev/1": CountingDevice(), "dev/2": CountingDevice()}
+    poller = AttributePoller(devices.__getitem__, initial_interval_sec=0.001)
+
+    results = poller.poll(
+        [
+            ("dev/1", "counter", 3),
+            ("dev/1", "state", "ON"),
+            ("dev/2", "state", "ON"),
+        ],
+        timeout_sec=5,
+    )
+
+    assert_that(results).is_equal_to([None, None, None])
+    assert_that(devices["dev/1"].reads).is_equal_to(
+        [["counter", "state"], ["counter"], ["counter"]]
+    )
+    assert_that(devices["dev/2"].reads).is_length(1)
+
+
+def test_poll_backs_off():
+    """Test poll intervals grow exponentially up to the cap."""
+    device = CountingDevice()
+    poller = AttributePoller(
+        lambda _: device,
+        initial_interval_sec=0.01,
+        max_interval_sec=0.04,
+        jitter=0.0,
+    )
+
+    start = time.monotonic()
+    results = poller.poll([("dev/1", "counter", 0)], timeout_sec=0.2)
+
+    assert_that(time.monotonic() - start).is_greater_than_or_equal_to(0.2)
+    assert_that(results[0]).starts_with("last read value")
+    # Reads at 0, 0.01, 0.03, 0.07, 0.11, 0.15, 0.19 and 0.2
+    assert_that(len(device.reads)).is_between(6, 8)
+
+
+def test_observe_polled_fail(caplog):
+    """Test unreached targets fail with their last read error."""
+    observer = AssertiveLoggingObserver(
+        AssertiveLoggingObserverMode.ASSERTING,
+        logging.getLogger(__name__),
+        use_event_tracer=False,
+        dev_factory=lambda _: CountingDevice(fail_reads=True),
+    )
+    with caplog.at_level(logging.INFO, logger=__name__):
+        with pytest.raises(AssertionError, match="1 of 1"):
+            observer.observe_device_attr_value_polled(
+                "dev/1", "state", "ON", 0.05
+            )
+    assert_that(caplog.records[-1].getMessage()).contains(
+        "FAIL", "device unreachable"
+    )
+
+
+def test_cancel_concurrent_polls():
+    """Test cancel stops the polls of all threads, not only the last."""
+    poller = AttributePoller(
+        lambda device_name: CountingDevice(), initial_interval_sec=0.01
+    )
+    results = {}
+
+    def poll(device_name):
+        results[device_name] = poller.poll(
+            [(device_name, "state", "OFF")], timeout_sec=30
+        )
+
+    threads = [
+        threading.Thread(target=poll, args=(f"dev/{index}",))
+        for index in range(4)
+    ]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    poller.cancel()
+    for thread in threads:
+        thread.join(5)
+
+    assert_that(time.monotonic() - start).is_less_than(5)
+    assert_that(results).is_length(4)
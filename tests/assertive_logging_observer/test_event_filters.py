@@ -0,0 +1,59 @@
+"""
+Test subscription time event filters of the EventFilterRegistry.
+"""
+
+from __future__ import annotations
+
+import pytest
+from assertpy import assert_that
+
+from ska_mid_cbf_common_test_infrastructure.assertive_logging_observer import (
+    EventFilterRegistry,
+)
+
+DEVICE_FQDN = "test/device/1"
+
+
+def test_value_filter():
+    """Test events are kept for filter values and others are counted."""
+    registry = EventFilterRegistry()
+    registry.register(DEVICE_FQDN, "obsState", {"READY", "FAULT"})
+
+    assert_that(
+        registry.should_keep(DEVICE_FQDN.upper(), "obsstate", "READY")
+    ).is_true()
+    assert_that(
+        registry.should_keep(DEVICE_FQDN, "obsState", "IDLE")
+    ).is_false()
+    assert_that(registry.dropped_events).is_equal_to(
+        {(DEVICE_FQDN, "obsstate"): 1}
+    )
+
+
+def test_value_filter_of_spectrum_attribute():
+    """Test numpy array values are compared as a whole to filter values."""
+    numpy = pytest.importorskip("numpy")
+    registry = EventFilterRegistry()
+    registry.register(DEVICE_FQDN, "delays", [[1.0, 2.0], (3.0, 4.0)])
+
+    assert_that(
+        registry.should_keep(DEVICE_FQDN, "delays", numpy.array([3.0, 4.0]))
+    ).is_true()
+    assert_that(
+        registry.should_keep(DEVICE_FQDN, "delays", numpy.array([1.0, 4.0]))
+    ).is_false()
+    assert_that(
+        registry.should_keep(DEVICE_FQDN, "delays", numpy.zeros(3))
+    ).is_false()
+
+
+def test_add_dropped():
+    """Test events dropped elsewhere, e.g. by a collector, are counted."""
+    registry = EventFilterRegistry()
+    registry.register(DEVICE_FQDN, "obsState", {"READY"})
+    registry.should_keep(DEVICE_FQDN, "obsState", "IDLE")
+    registry.add_dropped(DEVICE_FQDN.upper(), "obsState", 2)
+
+    assert_that(registry.dropped_events).is_equal_to(
+        {(DEVICE_FQDN, "obsstate"): 3}
+    )
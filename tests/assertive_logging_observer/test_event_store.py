@@ -0,0 +1,158 @@
+"""
+Test EventStore storage and waiting on change event records.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+from assertpy import assert_that
+
+from ska_mid_cbf_common_test_infrastructure.assertive_logging_observer import (
+    EventRecord,
+    EventStore,
+)
+
+DEVICE_FQDN = "test/device/1"
+
+
+def test_wait_for_stored_event():
+    """
+    Test waiting finds an already stored matching event, comparing names case
+    insensitively and sequence values regardless of list or tuple type.
+    """
+    store = EventStore()
+    store.append(EventRecord(DEVICE_FQDN, "obsState", 1, time.time()))
+    store.append(
+        EventRecord(DEVICE_FQDN, "longRunningCommandResult", ["1", "OK"], 0)
+    )
+
+    assert_that(
+        store.wait_for_change_event(DEVICE_FQDN.upper(), "obsstate", 1, 0)
+    ).is_not_none()
+    assert_that(
+        store.wait_for_change_event(
+            DEVICE_FQDN, "longRunningCommandResult", ("1", "OK"), 0
+        )
+    ).is_not_none()
+    assert_that(
+        store.wait_for_change_event(DEVICE_FQDN, "obsState", 2, 0.05)
+    ).is_none()
+
+
+def test_wait_for_arriving_event():
+    """
+    Test waiting returns an event stored from another thread while waiting,
+    before the timeout expires.
+    """
+    store = EventStore()
+
+    def deliver():
+        time.sleep(0.05)
+        store.extend(
+            EventRecord(DEVICE_FQDN, "obsState", value, time.time())
+            for value in range(4)
+        )
+
+    threading.Thread(target=deliver).start()
+    start = time.monotonic()
+    record = store.wait_for_change_event(DEVICE_FQDN, "obsState", 3, 5)
+
+    assert_that(record.attribute_value).is_equal_to(3)
+    assert_that(time.monotonic() - start).is_less_than(1)
+
+
+def test_clear_events():
+    """
+    Test cleared events are no longer matched.
+    """
+    store = EventStore()
+    store.append(EventRecord(DEVICE_FQDN, "obsState", 1, time.time()))
+    store.clear()
+
+    assert_that(store).is_length(0)
+    assert_that(
+        store.wait_for_change_event(DEVICE_FQDN, "obsState", 1, 0)
+    ).is_none()
+
+
+def test_clear_events_of_devices():
+    """
+    Test clearing events of some devices keeps events of other devices.
+    """
+    store = EventStore()
+    store.append(EventRecord(DEVICE_FQDN, "obsState", 1, time.time()))
+    store.append(EventRecord("test/device/2", "obsState", 1, time.time()))
+
+    store.clear([DEVICE_FQDN.upper()])
+
+    assert_that(
+        [record.device_name for record in store.cursor().next_records()]
+    ).is_equal_to(["test/device/2"])
+    assert_that(
+        store.wait_for_change_event(DEVICE_FQDN, "obsState", 1, 0)
+    ).is_none()
+
+
+def test_clear_events_keeps_cursor_position():
+    """
+    Test clearing events of a device while a cursor of another device is
+    mid-stream neither replays nor skips records of the kept device.
+    """
+    store = EventStore()
+    cursor = store.cursor()
+    store.extend(
+        [
+            EventRecord("test/device/2", "obsState", "READY", 0),
+            EventRecord(DEVICE_FQDN, "obsState", "READY", 1),
+            EventRecord("test/device/2", "obsState", "IDLE", 2),
+        ]
+    )
+    assert_that(cursor.next_records()).is_length(3)
+    store.append(EventRecord(DEVICE_FQDN, "obsState", "IDLE", 3))
+    store.append(EventRecord("test/device/2", "obsState", "SCANNING", 4))
+
+    store.clear([DEVICE_FQDN])
+    store.append(EventRecord("test/device/2", "obsState", "READY", 5))
+
+    assert_that(
+        [record.reception_time for record in cursor.next_records()]
+    ).is_equal_to([4, 5])
+    assert_that(cursor.next_records()).is_empty()
+
+    store.clear()
+    store.append(EventRecord("test/device/2", "obsState", "IDLE", 6))
+    assert_that(
+        [record.reception_time for record in cursor.next_records()]
+    ).is_equal_to([6])
+
+
+def test_event_record_compact():
+    """
+    Test EventRecords have no instance dict and share interned names.
+    """
+    first = EventRecord("".join(["test/", "device/1"]), "obsState", 1, 0)
+    second = EventRecord("".join(["test/", "device/1"]), "obsState", 2, 0)
+
+    assert_that(hasattr(first, "__dict__")).is_false()
+    assert_that(first.device_name is second.device_name).is_true()
+
+
+def test_event_record_received_event_compatible():
+    """
+    Test EventRecords match devices and attributes case insensitively, like
+    ska_tango_testing ReceivedEvents, for assertpy assertions on tracers.
+    """
+
+    class _Proxy:
+        def dev_name(self: _Proxy) -> str:
+            return DEVICE_FQDN.upper()
+
+    record = EventRecord(DEVICE_FQDN, "obsState", 1, 0)
+
+    assert_that(record.has_device(DEVICE_FQDN.upper())).is_true()
+    assert_that(record.has_device(_Proxy())).is_true()
+    assert_that(record.has_device("test/device/2")).is_false()
+    assert_that(record.has_attribute("obsstate")).is_true()
+    assert_that(record.has_attribute("state")).is_false()
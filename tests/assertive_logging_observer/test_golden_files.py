@@ -0,0 +1,144 @@
+"""
+Test chunked golden file comparison and
+AssertiveLoggingObserver.observe_golden_file.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+
+import pytest
+from assertpy import assert_that
+
+from ska_mid_cbf_common_test_infrastructure.assertive_logging_observer import (
+    AssertiveLoggingObserver,
+    AssertiveLoggingObserverMode,
+    compare_golden,
+)
+
+GOLDEN = bytes(range(256)) * 40
+
+
+class TrickleStream(io.RawIOBase):
+    """Non seekable stream returning at most 7 bytes per read, like a pipe."""
+
+    def __init__(self: TrickleStream, data: bytes):
+        self._data = io.BytesIO(data)
+
+    def readable(self: TrickleStream) -> bool:
+        return True
+
+    def readinto(self: TrickleStream, buffer) -> int:
+        return self._data.readinto(memoryview(buffer)[:7])
+
+
+@pytest.fixture(name="asserter")
+def fixture_asserter():
+    """Asserting observer without event tracer."""
+    return AssertiveLoggingObserver(
+        AssertiveLoggingObserverMode.ASSERTING,
+        logging.getLogger(__name__),
+        use_event_tracer=False,
+    )
+
+
+def test_equal_sources(asserter, tmp_path, caplog):
+    """Test equal files, bytes and streams pass over several chunks."""
+    golden_path = tmp_path / "golden.bin"
+    golden_path.write_bytes(GOLDEN)
+    actual_path = tmp_path / "actual.bin"
+    actual_path.write_bytes(GOLDEN)
+
+    with caplog.at_level(logging.INFO):
+        asserter.observe_golden_file(actual_path, golden_path, chunk_bytes=999)
+    assert_that(caplog.text).contains(f"{len(GOLDEN)} bytes match")
+
+    for actual in (GOLDEN, io.BytesIO(GOLDEN), TrickleStream(GOLDEN)):
+        comparison = compare_golden(actual, golden_path, chunk_bytes=1000)
+        assert_that(comparison.equal).is_true()
+        assert_that(comparison.bytes_compared).is_equal_to(len(GOLDEN))
+
+
+def test_first_divergent_chunk_reported(asserter):
+    """Test comparison stops at the first divergent chunk, bounded report."""
+    actual = bytearray(GOLDEN)
+    for offset in (2500, 2600, 2700, 2800, 9000):
+        actual[offset] ^= 0xFF
+
+    comparison = compare_golden(
+        actual, GOLDEN, chunk_bytes=1000, max_reported_diffs=3
+    )
+    assert_that(comparison.equal).is_false()
+    assert_that(comparison.bytes_compared).is_equal_to(3000)
+    assert_that(comparison.report).is_equal_to(
+        "chunk at bytes [2000, 3000) differs, first 3: "
+        "byte 2500: 0x3b != 0xc4; byte 2600: 0xd7 != 0x28; "
+        "byte 2700: 0x73 != 0x8c"
+    )
+    with pytest.raises(AssertionError, match="byte 2500"):
+        asserter.observe_golden_file(actual, GOLDEN, chunk_bytes=1000)
+
+
+def test_length_mismatch():
+    """Test a truncated product fails after its equal prefix."""
+    comparison = compare_golden(GOLDEN[:5000], GOLDEN, chunk_bytes=1000)
+
+    assert_that(comparison.equal).is_false()
+    assert_that(comparison.report).starts_with(
+        "actual ends at byte 5000 before the other"
+    )
+
+
+def test_numeric_tolerance(asserter):
+    """Test elements are compared within tolerance, reporting elements."""
+    numpy = pytest.importorskip("numpy")
+    golden = numpy.arange(1000, dtype=numpy.complex64) * (1 + 1j)
+    actual = golden + 1e-4
+    actual[123] += 1
+
+    comparison = compare_golden(
+        actual.tobytes(),
+        golden.tobytes(),
+        dtype=numpy.complex64,
+        atol=1e-3,
+        chunk_bytes=1001,
+    )
+    assert_that(comparison.equal).is_false()
+    assert_that(comparison.report).contains("1 differences")
+    assert_that(comparison.report).contains("element 123: ")
+
+    actual[123] -= 1
+    asserter.observe_golden_file(
+        actual.tobytes(), golden.tobytes(), dtype="complex64", atol=1e-3
+    )
+    with pytest.raises(AssertionError, match="element 0"):
+        asserter.observe_golden_file(
+            actual.tobytes(), golden.tobytes(), dtype="complex64"
+        )
+
+
+def test_hash_pre_check(tmp_path):
+    """Test golden is not read if the digest of actual matches."""
+    golden_sha256 = hashlib.sha256(GOLDEN).hexdigest()
+
+    comparison = compare_golden(
+        GOLDEN, tmp_path / "not_read.bin", golden_sha256=golden_sha256
+    )
+    assert_that(comparison.hash_matched).is_true()
+    assert_that(comparison.equal).is_true()
+
+    # Differences are still located for rereadable actual products
+    actual = bytearray(GOLDEN)
+    actual[10] = 0
+    comparison = compare_golden(
+        io.BytesIO(actual), GOLDEN, golden_sha256=golden_sha256
+    )
+    assert_that(comparison.report).contains("byte 10: 0x00 != 0x0a")
+
+    comparison = compare_golden(
+        TrickleStream(bytes(actual)), GOLDEN, golden_sha256=golden_sha256
+    )
+    assert_that(comparison.equal).is_false()
+    assert_that(comparison.report).contains("can not be reread")
@@ -0,0 +1,95 @@
+"""
+Test AssertiveLoggingObserver observation of JSON values against schemas of a
+SchemaRegistry.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+
+import pytest
+from assertpy import assert_that
+
+from ska_mid_cbf_common_test_infrastructure.assertive_logging_observer import (
+    AssertiveLoggingObserver,
+    AssertiveLoggingObserverMode,
+    SchemaRegistry,
+)
+
+DELAY_MODEL_SCHEMA = {
+    "type": "object",
+    "required": ["start_validity_sec", "receptor_delays"],
+    "properties": {
+        "start_validity_sec": {"type": "number"},
+        "receptor_delays": {"type": "array"},
+    },
+}
+
+
+@pytest.fixture(name="registry")
+def fixture_registry(tmp_path):
+    """SchemaRegistry with a versioned delay model schema."""
+    (tmp_path / "delay_model").mkdir()
+    (tmp_path / "delay_model" / "1.0.json").write_text(
+        json.dumps(DELAY_MODEL_SCHEMA), encoding="utf-8"
+    )
+    return SchemaRegistry(tmp_path)
+
+
+def make_observer(mode, registry=None):
+    """Make an ALO without event tracer using registry."""
+    return AssertiveLoggingObserver(
+        mode,
+        logging.getLogger(__name__),
+        use_event_tracer=False,
+        schema_registry=registry,
+    )
+
+
+def test_validator_compiled_once(registry):
+    """Test validators are compiled once per schema ID and version."""
+    validator = registry.validator("delay_model", "1.0")
+    assert_that(registry.validator("delay_model", "1.0")).is_same_as(validator)
+    with pytest.raises(FileNotFoundError):
+        registry.validator("delay_model")
+
+
+def test_observe_default_schema(caplog):
+    """Test observing against a schema of the CTI data directory."""
+    observer = make_observer(AssertiveLoggingObserverMode.ASSERTING)
+    with caplog.at_level(logging.INFO, logger=__name__):
+        observer.observe_json_schema(
+            '{"config_id": "scan_1", "values": [1, 2.5]}', "example_payload"
+        )
+    assert_that(caplog.records[-1].getMessage()).starts_with("PASS")
+
+    with pytest.raises(AssertionError, match="config_id"):
+        observer.observe_json_schema({"values": []}, "example_payload")
+    with pytest.raises(AssertionError, match="invalid JSON"):
+        observer.observe_json_schema("{", "example_payload")
+
+
+def test_observe_bulk(registry, caplog):
+    """
+    Test bulk observation is a single observation reporting a bounded number
+    of invalid values.
+    """
+    valid = json.dumps({"start_validity_sec": 1.0, "receptor_delays": []})
+    values = [valid] * 100 + ['{"start_validity_sec": "soon"}'] * 10
+    observer = make_observer(AssertiveLoggingObserverMode.REPORTING, registry)
+
+    with caplog.at_level(logging.INFO, logger=__name__):
+        caplog.clear()
+        observer.observe_json_schema_bulk(values[:100], "delay_model", "1.0")
+        observer.observe_json_schema_bulk(
+            values, "delay_model", "1.0", max_reported_errors=2
+        )
+
+    assert_that(caplog.records).is_length(2)
+    assert_that(caplog.records[0].getMessage()).contains(
+        "PASS", "100 values valid against delay_model/1.0"
+    )
+    message = caplog.records[1].getMessage()
+    assert_that(message).contains("FAIL", "10 of 110 values invalid", "[101]")
+    assert_that(message).does_not_contain("[102]")
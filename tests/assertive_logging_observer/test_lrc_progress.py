@@ -0,0 +1,117 @@
+"""
+Test LRC progress tracking and stall detection of
+AssertiveLoggingObserver.observe_lrc_ok.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+
+import pytest
+from assertpy import assert_that
+
+from ska_mid_cbf_common_test_infrastructure.assertive_logging_observer import (
+    EventRecord,
+)
+
+DEVICE = "mid/fsp/1"
+COMMAND_ID = "1700000000.0_1_ConfigureScan"
+LRC_RESULT = ([0], [COMMAND_ID])
+OK_RESULT = (COMMAND_ID, '[0, "ConfigureScan completed OK"]')
+
+
+def event(attr_name: str, value) -> EventRecord:
+    """Make change event of DEVICE received now."""
+    return EventRecord(DEVICE, attr_name, value, time.time())
+
+
+def test_progress_logged_until_result(make_observer, caplog):
+    """
+    Test progress and status changes of the command are logged once each
+    while waiting for its result, ignoring other commands.
+    """
+    observer = make_observer()
+    store = observer.event_tracer.store
+
+    def deliver():
+        for record in (
+            event("longRunningCommandStatus", (COMMAND_ID, "IN_PROGRESS")),
+            event("longRunningCommandProgress", ("other", "50")),
+            event("longRunningCommandProgress", (COMMAND_ID, "10")),
+            event("longRunningCommandProgress", (COMMAND_ID, "10")),
+            event("longRunningCommandProgress", (COMMAND_ID, "90")),
+            event("longRunningCommandResult", OK_RESULT),
+        ):
+            time.sleep(0.01)
+            store.append(record)
+
+    thread = threading.Thread(target=deliver)
+    thread.start()
+    with caplog.at_level(logging.INFO):
+        caplog.clear()
+        observer.observe_lrc_ok(
+            DEVICE, LRC_RESULT, "ConfigureScan", 5, stall_timeout_sec=1
+        )
+    thread.join()
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert_that(messages).is_length(4)
+    assert_that(messages[0]).contains("longRunningCommandStatus: IN_PROGRESS")
+    assert_that(messages[1]).contains("longRunningCommandProgress: 10 at")
+    assert_that(messages[2]).contains("longRunningCommandProgress: 90 at")
+    assert_that(messages[3]).starts_with("PASS")
+
+
+def test_stalled_command_fails_early(make_observer):
+    """Test a command without progress fails after the stall timeout."""
+    observer = make_observer()
+    observer.event_tracer.store.append(
+        event("longRunningCommandProgress", (COMMAND_ID, "10"))
+    )
+
+    start = time.monotonic()
+    with pytest.raises(AssertionError, match="stalled.*last progress: 10"):
+        observer.observe_lrc_ok(
+            DEVICE, LRC_RESULT, "ConfigureScan", 60, stall_timeout_sec=0.1
+        )
+    assert_that(time.monotonic() - start).is_between(0.1, 1)
+
+
+def test_failed_status_fails_early(make_observer):
+    """Test a command with a failed status fails without waiting."""
+    observer = make_observer()
+    observer.event_tracer.store.append(
+        event("longRunningCommandStatus", (COMMAND_ID, "FAILED"))
+    )
+
+    start = time.monotonic()
+    with pytest.raises(AssertionError, match="failed with status FAILED"):
+        observer.observe_lrc_ok(DEVICE, LRC_RESULT, "ConfigureScan", 60)
+    assert_that(time.monotonic() - start).is_less_than(1)
+
+
+def test_other_result_fails_early(make_observer):
+    """Test a result of the command other than OK fails without waiting."""
+    observer = make_observer()
+    observer.event_tracer.store.append(
+        event(
+            "longRunningCommandResult",
+            ("1700000000.0_2_Scan", '[0, "Scan completed OK"]'),
+        )
+    )
+    observer.event_tracer.store.append(
+        event(
+            "longRunningCommandResult",
+            (COMMAND_ID, '[3, "ConfigureScan failed: invalid delay model"]'),
+        )
+    )
+
+    start = time.monotonic()
+    with pytest.raises(
+        AssertionError,
+        match=r"completed with result \[3, \"ConfigureScan failed",
+    ):
+        observer.observe_lrc_ok(DEVICE, LRC_RESULT, "ConfigureScan", 60)
+    assert_that(time.monotonic() - start).is_less_than(1)
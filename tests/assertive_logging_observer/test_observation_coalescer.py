@@ -0,0 +1,86 @@
+"""
+Test ObservationCoalescer collapsing of repeated AssertiveLoggingObserver
+observations.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from assertpy import assert_that, fail
+
+from ska_mid_cbf_common_test_infrastructure.assertive_logging_observer import (
+    AssertiveLoggingObserver,
+    AssertiveLoggingObserverMode,
+    ObservationCoalescer,
+)
+
+
+def test_coalescer_repeats_logged_once(caplog):
+    """
+    Test repeated identical observations are logged once and summarized with
+    their repeat count on flush, while distinct observations are logged.
+    """
+    logger = logging.getLogger(f"{__name__}.repeats")
+    reporter = AssertiveLoggingObserver(
+        AssertiveLoggingObserverMode.REPORTING,
+        logger,
+        use_event_tracer=False,
+        coalesce_max_entries=8,
+    )
+
+    with caplog.at_level(logging.INFO, logger=logger.name):
+        caplog.clear()
+        for _ in range(5):
+            reporter.observe_equality("OFF", "ON")
+        reporter.observe_equality("ON", "ON")
+        assert_that(caplog.records).is_length(2)
+
+        reporter.observation_coalescer.flush()
+        assert_that(caplog.records).is_length(3)
+        assert_that(caplog.records[-1].levelno).is_equal_to(logging.ERROR)
+        assert_that(caplog.records[-1].getMessage()).contains(
+            "observed 5 times"
+        )
+
+
+def test_coalescer_lru_bound(caplog):
+    """
+    Test the coalescer tracks at most max_entries observations, summarizing
+    repeated observations as they are evicted.
+    """
+    logger = logging.getLogger(f"{__name__}.lru")
+    coalescer = ObservationCoalescer(logger, max_entries=2)
+
+    with caplog.at_level(logging.INFO, logger=logger.name):
+        assert_that(coalescer.should_log(logging.INFO, "a")).is_true()
+        assert_that(coalescer.should_log(logging.INFO, "a")).is_false()
+        assert_that(coalescer.should_log(logging.INFO, "b")).is_true()
+        assert_that(coalescer.should_log(logging.INFO, "c")).is_true()
+
+        assert_that(coalescer.records).is_length(2)
+        assert_that(caplog.records).is_length(1)
+        assert_that(caplog.records[0].getMessage()).contains(
+            "a (observed 2 times"
+        )
+        assert_that(coalescer.should_log(logging.INFO, "a")).is_true()
+
+
+def test_coalescer_asserting_still_fails():
+    """
+    Test coalesced FAIL observations still raise AssertionError in asserting
+    mode.
+    """
+    asserter = AssertiveLoggingObserver(
+        AssertiveLoggingObserverMode.ASSERTING,
+        logging.getLogger(f"{__name__}.asserting"),
+        use_event_tracer=False,
+        coalesce_max_entries=8,
+    )
+    for _ in range(2):
+        try:
+            asserter.observe_true(False)
+            fail("Reached past observe_true")
+        except AssertionError as exception:
+            if "Reached past observe_true" in str(exception):
+                raise exception
@@ -0,0 +1,117 @@
+"""
+Test observation expressions and AssertiveLoggingObserver.observe_expression.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+from assertpy import assert_that
+
+from ska_mid_cbf_common_test_infrastructure.assertive_logging_observer import (
+    EventRecord,
+    EventStore,
+    all_of,
+    any_of,
+    change_event,
+    not_within,
+)
+
+FSP = "mid/fsp/1"
+VCC = "mid/vcc/1"
+
+
+def deliver_later(store: EventStore, *records: EventRecord):
+    """Store records from another thread after a short delay."""
+
+    def deliver():
+        time.sleep(0.02)
+        store.extend(records)
+
+    threading.Thread(target=deliver, daemon=True).start()
+
+
+def test_any_of_decided_by_first_event(make_observer):
+    """Test any_of passes on the first true operand without its timeout."""
+    observer = make_observer()
+    record = EventRecord(FSP, "obsState", "READY", time.time())
+    deliver_later(observer.event_tracer.store, record)
+
+    start = time.monotonic()
+    decisive = observer.observe_expression(
+        any_of(
+            change_event(FSP, "obsState", "FAULT"),
+            change_event(FSP, "obsState", "READY"),
+        ),
+        timeout_sec=5,
+    )
+
+    assert_that(time.monotonic() - start).is_less_than(1)
+    assert_that(decisive).is_same_as(record)
+
+
+def test_all_of_stops_on_fault(make_observer):
+    """Test all_of fails as soon as a not_within operand sees FAULT."""
+    observer = make_observer()
+    store = observer.event_tracer.store
+    store.append(EventRecord(VCC, "obsState", "READY", time.time()))
+    fault = EventRecord(FSP, "obsState", "FAULT", time.time())
+    deliver_later(store, fault)
+
+    expression = all_of(
+        change_event(VCC, "obsState", "READY"),
+        change_event(FSP, "obsState", "READY"),
+        not_within(change_event(FSP, "obsState", "FAULT")),
+    )
+    start = time.monotonic()
+    with pytest.raises(AssertionError, match="decided by"):
+        observer.observe_expression(expression, timeout_sec=5)
+    assert_that(time.monotonic() - start).is_less_than(1)
+
+
+def test_all_of_guarded_passes_early(make_observer):
+    """
+    Test all_of with a not_within guard passes as soon as its other
+    operands are true, without waiting for its timeout.
+    """
+    observer = make_observer()
+    store = observer.event_tracer.store
+    store.append(EventRecord(VCC, "obsState", "READY", time.time()))
+    ready = EventRecord(FSP, "obsState", "READY", time.time())
+    deliver_later(store, ready)
+
+    start = time.monotonic()
+    decisive = observer.observe_expression(
+        all_of(
+            change_event(VCC, "obsState", "READY"),
+            change_event(FSP, "obsState", "READY"),
+            not_within(change_event(FSP, "obsState", "FAULT")),
+        ),
+        timeout_sec=5,
+    )
+
+    assert_that(time.monotonic() - start).is_less_than(1)
+    assert_that(decisive).is_same_as(ready)
+
+
+def test_not_within_decided_at_deadline(make_observer):
+    """
+    Test not_within alone passes at the shared deadline, and expressions
+    are reset for every observation.
+    """
+    observer = make_observer()
+    store = observer.event_tracer.store
+    store.append(EventRecord(FSP, "obsState", "READY", time.time()))
+    guard = not_within(change_event(FSP, "obsState", "FAULT"))
+
+    start = time.monotonic()
+    assert_that(observer.observe_expression(guard, 0.05)).is_none()
+    assert_that(time.monotonic() - start).is_between(0.05, 0.5)
+
+    expression = all_of(change_event(FSP, "obsState", "READY"), guard)
+    observer.observe_expression(expression, 0.01)
+    store.clear()
+    with pytest.raises(AssertionError, match="timeout"):
+        observer.observe_expression(expression, 0.01)
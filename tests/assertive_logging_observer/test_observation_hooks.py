@@ -0,0 +1,73 @@
+"""
+Test ObservationHooks called around AssertiveLoggingObserver observations.
+"""
+
+from __future__ import annotations
+
+import time
+
+import pytest
+from assertpy import assert_that
+
+from ska_mid_cbf_common_test_infrastructure.assertive_logging_observer import (
+    AssertiveLoggingObserverMode,
+    EventRecord,
+    ObservationHook,
+)
+
+
+class RecordingHook(ObservationHook):
+    """Hook recording the calls made to it."""
+
+    def __init__(self: RecordingHook):
+        self.calls: list[tuple] = []
+
+    def on_observation_start(self: RecordingHook, context):
+        self.calls.append(("start", context.function_name))
+
+    def on_event_matched(self: RecordingHook, context, record):
+        self.calls.append(("matched", record.attribute_value))
+
+    def on_observation_end(self: RecordingHook, context):
+        assert_that(context.end_sec).is_greater_than_or_equal_to(
+            context.start_sec
+        )
+        self.calls.append(("end", context.passed))
+
+
+def test_hooks_called_around_observations(make_observer):
+    """Test hooks are called in order and stop once removed."""
+    observer = make_observer(AssertiveLoggingObserverMode.REPORTING)
+    hook = RecordingHook()
+    observer.add_hook(hook)
+
+    observer.observe_true(True)
+    observer.observe_equality(1, 2)
+    observer.remove_hook(hook)
+    observer.observe_false(False)
+
+    assert_that(hook.calls).is_equal_to(
+        [("start", "observe_true"), ("end", True)]
+        + [("start", "observe_equality"), ("end", False)]
+    )
+    with pytest.raises(ValueError):
+        observer.remove_hook(hook)
+
+
+def test_hooks_notified_of_matched_events(make_observer):
+    """Test event waiting observations notify hooks of matched events."""
+    observer = make_observer(AssertiveLoggingObserverMode.REPORTING)
+    observer.event_tracer.store.append(
+        EventRecord("test/device/1", "obsState", 2, time.time())
+    )
+    hook = RecordingHook()
+    observer.add_hook(hook)
+
+    observer.observe_device_attr_change("test/device/1", "obsState", 2, 0.1)
+    observer.observe_device_attr_change("test/device/1", "obsState", 3, 0.01)
+
+    assert_that(hook.calls).is_equal_to(
+        [("start", "observe_device_attr_change"), ("matched", 2)]
+        + [("end", True), ("start", "observe_device_attr_change")]
+        + [("end", False)]
+    )
@@ -0,0 +1,134 @@
+"""
+Test loading observation plans and observing them with
+AssertiveLoggingObserver.observe_plan.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import pathlib
+import threading
+import time
+
+import jsonschema
+import pytest
+from assertpy import assert_that
+
+from ska_mid_cbf_common_test_infrastructure.assertive_logging_observer import (
+    EventRecord,
+    load_observation_plan,
+)
+
+EXAMPLE_PLAN = (
+    pathlib.Path(__file__).parents[2]
+    / "src"
+    / "ska_mid_cbf_common_test_infrastructure"
+    / "data"
+    / "observation_plans"
+    / "example_plan.yaml"
+)
+
+PLAN = {
+    "timeout_sec": 0.5,
+    "device_classes": {
+        "fsp": {
+            "sequences": {"obsState": ["CONFIGURING", "READY"]},
+            "tolerances": {
+                "delayModelValidity": {"value": 10.0, "abs_tol": 1}
+            },
+            "lrc_timeouts_sec": {"ConfigureScan": 60},
+        },
+        "vcc": {"timeout_sec": 0.2, "sequences": {"obsState": [2]}},
+    },
+}
+
+
+def write_plan(tmp_path: pathlib.Path, plan: dict) -> pathlib.Path:
+    """Write plan as JSON file in tmp_path."""
+    path = tmp_path / "plan.json"
+    path.write_text(json.dumps(plan), encoding="utf-8")
+    return path
+
+
+def test_load_example_plan():
+    """Test the example plan in the data directory is valid."""
+    pytest.importorskip("yaml")
+    plan = load_observation_plan(EXAMPLE_PLAN)
+    assert_that(plan.lrc_timeout("fsp", "ConfigureScan")).is_equal_to(60)
+    assert_that(plan.device_classes).contains_key("fsp", "vcc")
+
+
+def test_plan_compiled_once_per_content(tmp_path):
+    """
+    Test plans with the same content are compiled once, and LRC timeouts
+    fall back to the given default.
+    """
+    plan = load_observation_plan(write_plan(tmp_path, PLAN))
+    copy_path = tmp_path / "copy.json"
+    copy_path.write_text(json.dumps(PLAN), encoding="utf-8")
+
+    assert_that(load_observation_plan(copy_path)).is_same_as(plan)
+    assert_that(plan.lrc_timeout("vcc", "Scan", default=5.0)).is_equal_to(5.0)
+    with pytest.raises(KeyError):
+        plan.lrc_timeout("vcc", "Scan")
+
+
+def test_invalid_plan_rejected(tmp_path):
+    """Test plans not matching the plan schema are rejected."""
+    invalid = {"device_classes": {"fsp": {"sequences": {"obsState": []}}}}
+    with pytest.raises(jsonschema.ValidationError):
+        load_observation_plan(write_plan(tmp_path, invalid))
+
+
+def test_observe_plan_pass(make_observer, tmp_path, caplog):
+    """
+    Test all expectations of a plan are observed together, from events
+    stored before and during the observation.
+    """
+    plan = load_observation_plan(write_plan(tmp_path, PLAN))
+    observer = make_observer()
+    store = observer.event_tracer.store
+    store.append(EventRecord("mid/fsp/1", "obsState", "CONFIGURING", 0))
+    store.append(EventRecord("mid/vcc/1", "obsState", 2, time.time()))
+
+    def deliver():
+        time.sleep(0.05)
+        store.extend(
+            [
+                EventRecord("mid/fsp/1", "delayModelValidity", 9.5, 0),
+                EventRecord("mid/fsp/1", "obsState", "READY", time.time()),
+            ]
+        )
+
+    delivery = threading.Thread(target=deliver)
+    delivery.start()
+    with caplog.at_level(logging.INFO):
+        start = time.monotonic()
+        observer.observe_plan(
+            plan, {"fsp": ["mid/fsp/1"], "vcc": ["mid/vcc/1"]}
+        )
+        elapsed = time.monotonic() - start
+    delivery.join()
+
+    assert_that(elapsed).is_less_than(0.4)
+    passes = [r for r in caplog.records if r.getMessage().startswith("PASS")]
+    assert_that(passes).is_length(3)
+
+
+def test_observe_plan_fail(make_observer, tmp_path):
+    """
+    Test unmet expectations fail the observation once timed out, and events
+    received after the timeout of an expectation do not satisfy it.
+    """
+    plan = load_observation_plan(write_plan(tmp_path, PLAN))
+    observer = make_observer()
+    store = observer.event_tracer.store
+    late = time.time() + 10
+    store.append(EventRecord("mid/vcc/1", "obsState", 2, late))
+    store.append(EventRecord("mid/vcc/2", "obsState", 1, time.time()))
+
+    start = time.monotonic()
+    with pytest.raises(AssertionError, match="2 of 2"):
+        observer.observe_plan(plan, {"vcc": ["mid/vcc/1", "mid/vcc/2"]})
+    assert_that(time.monotonic() - start).is_between(0.2, 0.4)
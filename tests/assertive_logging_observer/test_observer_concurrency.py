@@ -0,0 +1,97 @@
+"""
+Test concurrent use of an AssertiveLoggingObserver from many threads and its
+close lifecycle.
+"""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+from assertpy import assert_that
+
+from ska_mid_cbf_common_test_infrastructure.assertive_logging_observer import (
+    EventRecord,
+    ObservationHook,
+)
+
+SUBARRAYS = 8
+
+
+@pytest.fixture(name="observer")
+def fixture_observer(make_observer):
+    """Asserting observer with a StoreEventTracer."""
+    return make_observer()
+
+
+def test_concurrent_observations(observer):
+    """
+    Test threads driving one subarray each observe all their events while
+    other threads clear the events of their own subarrays.
+    """
+    errors = []
+
+    def drive_subarray(index):
+        device_name = f"mid_csp_cbf/sub_elt/subarray_{index:02d}"
+        try:
+            for obs_state in range(20):
+                observer.clear_events([device_name])
+                observer.event_tracer.store.append(
+                    EventRecord(device_name, "obsState", obs_state, 0)
+                )
+                observer.observe_device_attr_change(
+                    device_name, "obsState", obs_state, 5
+                )
+        except AssertionError as exception:
+            errors.append(exception)
+
+    threads = [
+        threading.Thread(target=drive_subarray, args=(index,))
+        for index in range(SUBARRAYS)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+
+    assert_that(errors).is_empty()
+
+
+def test_concurrent_add_hook(observer):
+    """Test hooks added concurrently are all kept."""
+    hooks = [ObservationHook() for _ in range(SUBARRAYS * 50)]
+
+    def add_hooks(index):
+        for hook in hooks[index::SUBARRAYS]:
+            observer.add_hook(hook)
+
+    threads = [
+        threading.Thread(target=add_hooks, args=(index,))
+        for index in range(SUBARRAYS)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+
+    # pylint: disable=protected-access
+    assert_that(set(map(id, observer._hooks))).is_equal_to(set(map(id, hooks)))
+
+
+def test_close(observer):
+    """
+    Test close closes the event tracer once, and that closed observers can
+    not observe events.
+    """
+    event_tracer = observer.event_tracer
+    observer.close()
+    observer.close()
+
+    assert_that(observer.closed).is_true()
+    assert_that(event_tracer.closes).is_equal_to(1)
+    with pytest.raises(RuntimeError, match="closed"):
+        observer.observe_device_attr_change("dev/1", "obsState", 1, 0)
+    with pytest.raises(RuntimeError, match="closed"):
+        observer.clear_events()
+    # Observations without the event tracer still work
+    observer.observe_true(True)
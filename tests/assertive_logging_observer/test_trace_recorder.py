@@ -0,0 +1,113 @@
+"""
+Test ChromeTraceRecorder timelines of AssertiveLoggingObserver observations.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+
+from assertpy import assert_that
+
+from ska_mid_cbf_common_test_infrastructure.assertive_logging_observer import (
+    AssertiveLoggingObserver,
+    AssertiveLoggingObserverMode,
+    ChromeTraceRecorder,
+    EventRecord,
+)
+from ska_mid_cbf_common_test_infrastructure.test_logging.formatting import (
+    setup_logger,
+)
+
+test_logger = setup_logger(logging.getLogger(__name__))
+
+
+def _load_trace(path) -> list[dict]:
+    """Load trace events from given trace file."""
+    with open(path, encoding="utf-8") as trace_file:
+        return json.load(trace_file)
+
+
+def test_trace_observations(tmp_path):
+    """
+    Test observations made by ALO are recorded as complete spans with their
+    result and the written trace is a valid JSON array.
+    """
+    trace_path = tmp_path / "trace.json"
+    with ChromeTraceRecorder(trace_path) as recorder:
+        reporter = AssertiveLoggingObserver(
+            AssertiveLoggingObserverMode.REPORTING,
+            test_logger,
+            use_event_tracer=False,
+            trace_recorder=recorder,
+        )
+        reporter.observe_true(True)
+        reporter.observe_equality(1, 2)
+
+    spans = [event for event in _load_trace(trace_path) if event["ph"] == "X"]
+    assert_that([span["name"] for span in spans]).is_equal_to(
+        ["observe_true", "observe_equality"]
+    )
+    assert_that([span["args"]["result"] for span in spans]).is_equal_to(
+        ["PASS", "FAIL"]
+    )
+
+
+def test_trace_change_events_and_lrc(tmp_path):
+    """
+    Test change events are recorded as instant events on a named track per
+    device and LRCs as matching async begin and end events.
+    """
+    trace_path = tmp_path / "trace.json"
+    with ChromeTraceRecorder(trace_path) as recorder:
+        recorder.record_change_event("test/device/1", "state", "ON", 10.0)
+        recorder.record_change_event("test/device/2", "state", "OFF", 10.5)
+        recorder.record_lrc("test/device/1", "1_2_TurnOn", 9.0, 11.0, True)
+
+    events = _load_trace(trace_path)
+    track_names = {
+        event["tid"]: event["args"]["name"]
+        for event in events
+        if event["ph"] == "M"
+    }
+    instants = [event for event in events if event["ph"] == "i"]
+    assert_that([track_names[event["tid"]] for event in instants]).is_equal_to(
+        ["test/device/1", "test/device/2"]
+    )
+    assert_that(instants[0]["ts"]).is_equal_to(10_000_000)
+
+    lrc = [event for event in events if event["ph"] in ("b", "e")]
+    assert_that([event["ph"] for event in lrc]).is_equal_to(["b", "e"])
+    assert_that(lrc[1]["ts"] - lrc[0]["ts"]).is_equal_to(2_000_000)
+    assert_that({event["id"] for event in lrc}).is_equal_to({"1_2_TurnOn"})
+
+
+def test_trace_lrc_device_timing(make_observer, tmp_path):
+    """
+    Test the LRC span of observe_lrc_ok runs from the submission time in the
+    LRC ID to the reception of its result, rather than the observation.
+    """
+    submitted_sec = round(time.time()) - 2.0
+    command_id = f"{submitted_sec}_1_TurnOn"
+    trace_path = tmp_path / "trace.json"
+    with ChromeTraceRecorder(trace_path) as recorder:
+        observer = make_observer()
+        observer.add_hook(recorder)
+        observer.event_tracer.store.append(
+            EventRecord(
+                "test/device/1",
+                "longRunningCommandResult",
+                (command_id, '[0, "TurnOn completed OK"]'),
+                submitted_sec + 0.5,
+            )
+        )
+        observer.observe_lrc_ok(
+            "test/device/1", ([0], [command_id]), "TurnOn", 1
+        )
+
+    events = _load_trace(trace_path)
+    lrc = [event for event in events if event["ph"] in ("b", "e")]
+    assert_that([event["ts"] for event in lrc]).is_equal_to(
+        [int(submitted_sec * 1e6), int((submitted_sec + 0.5) * 1e6)]
+    )
@@ -0,0 +1,67 @@
+"""
+Fixtures shared by CTI service tests.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Iterable, Optional
+
+import pytest
+
+from ska_mid_cbf_common_test_infrastructure.assertive_logging_observer import (
+    AssertiveLoggingObserver,
+    AssertiveLoggingObserverMode,
+    EventStore,
+)
+
+
+class StoreEventTracer:
+    """
+    Event tracer exposing an EventStore filled by the test, so that
+    observations can be tested without Tango devices.
+    """
+
+    def __init__(self: StoreEventTracer):
+        self.store = EventStore()
+        self.closes = 0
+
+    def clear_events(
+        self: StoreEventTracer, device_names: Optional[Iterable[str]] = None
+    ):
+        """Clear stored events, of all devices or only of device_names."""
+        self.store.clear(device_names)
+
+    def unsubscribe_all(self: StoreEventTracer):
+        """Nothing is subscribed to."""
+
+    def close(self: StoreEventTracer):
+        """Count closes."""
+        self.closes += 1
+
+
+@pytest.fixture(name="make_observer")
+def fixture_make_observer():
+    """
+    Factory of AssertiveLoggingObservers, asserting by default, observing
+    events of a StoreEventTracer, closed after the test. Keyword arguments
+    are passed on to AssertiveLoggingObserver.
+    """
+    observers = []
+
+    def make_observer(
+        mode: AssertiveLoggingObserverMode = (
+            AssertiveLoggingObserverMode.ASSERTING
+        ),
+        **kwargs,
+    ) -> AssertiveLoggingObserver:
+        observer = AssertiveLoggingObserver(
+            mode, logging.getLogger(__name__), use_event_tracer=False, **kwargs
+        )
+        observer.event_tracer = StoreEventTracer()
+        observers.append(observer)
+        return observer
+
+    yield make_observer
+    for observer in observers:
+        observer.close()
@@ -0,0 +1,164 @@
+"""
+Test AdaptiveTimeoutPolicy timeouts chosen from a LatencyHistory.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+
+import pytest
+from assertpy import assert_that
+
+from ska_mid_cbf_common_test_infrastructure.assertive_logging_observer import (
+    AssertiveLoggingObserverMode,
+    EventRecord,
+)
+from ska_mid_cbf_common_test_infrastructure.latency_history import (
+    AdaptiveTimeoutPolicy,
+    LatencyHistory,
+    LatencyRecord,
+    LatencyRecorder,
+    quantile,
+)
+
+FSP = "mid_csp_cbf/fsp/01"
+
+
+@pytest.fixture(name="history")
+def fixture_history(tmp_path):
+    """History of 40 obsState changes of fsp taking 0.1s to 0.49s."""
+    with LatencyHistory(tmp_path / "history.sqlite") as history:
+        history.append(
+            LatencyRecord(
+                "sha1",
+                "test_scan",
+                "fsp",
+                "obsState",
+                "observe_device_attr_change",
+                FSP,
+                0.1 + index / 100,
+                True,
+                recorded_at=100 + index,
+            )
+            for index in range(40)
+        )
+        yield history
+
+
+def test_quantile():
+    """Test linear interpolation between closest ranks."""
+    assert_that(quantile([3.0, 1.0, 2.0], 0.5)).is_equal_to(2.0)
+    assert_that(quantile([1.0, 2.0], 0.25)).is_equal_to(1.25)
+    assert_that(quantile([1.0, 2.0], 1.0)).is_equal_to(2.0)
+    assert_that(quantile([5.0], 0.999)).is_equal_to(5.0)
+
+
+def test_timeout_sec(history):
+    """Test timeouts are bounded quantiles, or given without history."""
+    policy = AdaptiveTimeoutPolicy(history, fraction=1.0, margin=2.0)
+
+    # 0.49s * 2.0 is below the floor
+    assert_that(
+        policy.timeout_sec("observe_device_attr_change", FSP, "obsState", 60)
+    ).is_equal_to(1.0)
+    # No latencies of other keys
+    assert_that(
+        policy.timeout_sec("observe_lrc_ok", FSP, "obsState", 60)
+    ).is_equal_to(60)
+
+    policy = AdaptiveTimeoutPolicy(history, fraction=1.0, floor_sec=0.1)
+    assert_that(
+        policy.timeout_sec("observe_device_attr_change", FSP, "obsState", 60)
+    ).is_close_to(0.735, 1e-9)
+    # The given timeout is the ceiling by default
+    assert_that(
+        policy.timeout_sec("observe_device_attr_change", FSP, "obsState", 0.5)
+    ).is_equal_to(0.5)
+
+    policy = AdaptiveTimeoutPolicy(history, min_samples=41)
+    assert_that(
+        policy.timeout_sec("observe_device_attr_change", FSP, "obsState", 60)
+    ).is_equal_to(60)
+
+
+def test_refresh(history):
+    """Test latencies are cached until refreshed."""
+    policy = AdaptiveTimeoutPolicy(history, min_samples=1)
+    assert_that(
+        policy.timeout_sec("observe_lrc_ok", FSP, "Scan", 60)
+    ).is_equal_to(60)
+
+    history.append(
+        [LatencyRecord("sha2", "", "fsp", "Scan", "observe_lrc_ok", FSP, 5, 1)]
+    )
+    assert_that(
+        policy.timeout_sec("observe_lrc_ok", FSP, "Scan", 60)
+    ).is_equal_to(60)
+    policy.refresh()
+    assert_that(
+        policy.timeout_sec("observe_lrc_ok", FSP, "Scan", 60)
+    ).is_equal_to(7.5)
+
+
+def test_observer_uses_policy(make_observer, history, caplog):
+    """Test the observer waits for and logs the adapted timeout."""
+    observer = make_observer(
+        AssertiveLoggingObserverMode.REPORTING,
+        timeout_policy=AdaptiveTimeoutPolicy(history),
+    )
+
+    start = time.monotonic()
+    with caplog.at_level(logging.INFO):
+        observer.observe_device_attr_change(FSP, "obsState", "READY", 60)
+
+    assert_that(time.monotonic() - start).is_less_than(5)
+    assert_that(caplog.text).contains(
+        "AssertiveLoggingObserver.observe_device_attr_change timeout for "
+        f"{FSP} obsState: 1.000s (given 60s)"
+    )
+
+    observer.event_tracer.store.append(
+        EventRecord(FSP, "obsState", "READY", time.time())
+    )
+    with caplog.at_level(logging.INFO):
+        observer.observe_device_attr_change(FSP, "obsState", "READY", 60)
+    assert_that(caplog.text).contains("PASS")
+
+
+def test_pre_arrived_events_do_not_shrink_timeout(make_observer, tmp_path):
+    """
+    Test timeouts of a key observed both after its event arrived and while
+    waiting for it are adapted from the waited latencies only.
+    """
+    with LatencyHistory(tmp_path / "history.sqlite") as history:
+        recorder = LatencyRecorder(history, git_sha="sha1")
+        observer = make_observer()
+        observer.add_hook(recorder)
+        store = observer.event_tracer.store
+
+        def change_obs_state():
+            store.append(EventRecord(FSP, "obsState", "READY", time.time()))
+
+        for index in range(20):
+            store.clear()
+            if index % 4:
+                change_obs_state()
+            else:
+                threading.Timer(0.05, change_obs_state).start()
+            observer.observe_device_attr_change(FSP, "obsState", "READY", 5)
+        recorder.close()
+
+        latencies = history.durations(["sha1"])[
+            ("observe_device_attr_change", "fsp", "obsState")
+        ]
+        assert_that(latencies).is_length(5)
+        policy = AdaptiveTimeoutPolicy(
+            history, fraction=0.5, floor_sec=0.01, min_samples=5
+        )
+        assert_that(
+            policy.timeout_sec(
+                "observe_device_attr_change", FSP, "obsState", 5
+            )
+        ).is_greater_than_or_equal_to(0.05)
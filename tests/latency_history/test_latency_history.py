@@ -0,0 +1,237 @@
+"""
+Test LatencyHistory recording and regression detection.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+
+import pytest
+from assertpy import assert_that
+
+from ska_mid_cbf_common_test_infrastructure.assertive_logging_observer import (
+    AssertiveLoggingObserver,
+    AssertiveLoggingObserverMode,
+    EventRecord,
+    ObservationContext,
+)
+from ska_mid_cbf_common_test_infrastructure.latency_history import (
+    LatencyHistory,
+    LatencyRecord,
+    LatencyRecorder,
+    detect_regressions,
+    device_family,
+    mann_whitney_greater,
+)
+from ska_mid_cbf_common_test_infrastructure.latency_history.__main__ import (
+    main,
+)
+
+
+def make_records(git_sha, durations, recorded_at, command="ConfigureScan"):
+    """Make observe_lrc_ok records of fsp command with durations."""
+    return [
+        LatencyRecord(
+            git_sha,
+            "test_scan",
+            "fsp",
+            command,
+            "observe_lrc_ok",
+            "mid_csp_cbf/fsp/01",
+            duration,
+            True,
+            recorded_at=recorded_at + index,
+        )
+        for index, duration in enumerate(durations)
+    ]
+
+
+@pytest.fixture(name="history")
+def fixture_history(tmp_path):
+    """History of 3 git SHAs, of which the last slowed down ConfigureScan."""
+    with LatencyHistory(tmp_path / "history.sqlite") as history:
+        baseline = [1.0, 1.1, 0.9, 1.05, 0.95, 1.02]
+        history.append(make_records("sha1", baseline, 100))
+        history.append(make_records("sha2", baseline, 200))
+        history.append(make_records("sha3", [1.5, 1.6, 1.4, 1.55, 1.7], 300))
+        history.append(make_records("sha3", baseline, 300, command="Scan"))
+        yield history
+
+
+def test_mann_whitney_greater():
+    """Test p-values of shifted, identical and empty samples."""
+    baseline = [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert_that(
+        mann_whitney_greater([11.0, 12.0, 13.0, 14.0, 15.0], baseline)
+    ).is_close_to(0.0061, 0.0005)
+    assert_that(mann_whitney_greater(baseline, baseline)).is_greater_than(0.5)
+    assert_that(mann_whitney_greater([], baseline)).is_equal_to(1.0)
+
+
+def test_detect_regressions(history):
+    """Test only the slowed down key of the latest git SHA is flagged."""
+    regressions = detect_regressions(history)
+
+    assert_that(regressions).is_length(1)
+    assert_that(regressions[0].key).is_equal_to(
+        ("observe_lrc_ok", "fsp", "ConfigureScan")
+    )
+    assert_that(regressions[0].slowdown).is_greater_than(1.4)
+    assert_that(detect_regressions(history, "sha2")).is_empty()
+    with pytest.raises(ValueError):
+        detect_regressions(history, "unknown")
+
+
+def test_detect_timed_out_regression(history):
+    """
+    Test a key whose observations all time out at the latest git SHA is
+    flagged, with the count of timed out observations.
+    """
+    history.append(
+        LatencyRecord(
+            "sha4",
+            "test_scan",
+            "fsp",
+            "ConfigureScan",
+            "observe_lrc_ok",
+            "mid_csp_cbf/fsp/01",
+            5.0,
+            False,
+            recorded_at=400 + index,
+            timed_out=True,
+        )
+        for index in range(5)
+    )
+
+    regressions = detect_regressions(history)
+
+    assert_that(regressions).is_length(1)
+    assert_that(regressions[0].median_sec).is_equal_to(5.0)
+    assert_that(regressions[0].describe()).contains("timed out: 5 vs 0")
+    # Timed out observations are not latencies of passed observations
+    assert_that(history.durations(["sha4"])).is_empty()
+
+
+def test_history_without_timed_out_column(tmp_path):
+    """Test histories recorded before timeouts were flagged are migrated."""
+    path = tmp_path / "history.sqlite"
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute(
+            "CREATE TABLE latencies (recorded_at REAL NOT NULL, "
+            "git_sha TEXT NOT NULL, test_id TEXT NOT NULL, "
+            "device_class TEXT NOT NULL, command TEXT NOT NULL, "
+            "observation TEXT NOT NULL, device TEXT NOT NULL, "
+            "duration_sec REAL NOT NULL, passed INTEGER NOT NULL)"
+        )
+        connection.execute(
+            "INSERT INTO latencies VALUES "
+            "(1, 'sha1', '', 'fsp', 'Scan', 'observe_lrc_ok', '', 2.0, 1)"
+        )
+    connection.close()
+
+    with LatencyHistory(path) as history:
+        history.append(make_records("sha1", [3.0], 2, command="Scan"))
+        assert_that(history.durations(["sha1"], timed_out=True)).is_equal_to(
+            {("observe_lrc_ok", "fsp", "Scan"): [2.0, 3.0]}
+        )
+        assert_that(history.timed_out_counts(["sha1"])).is_empty()
+
+
+def test_report_exit_status(history, capsys):
+    """Test the report exits with status 1 on regressions."""
+    assert_that(main([history.path])).is_equal_to(1)
+    assert_that(capsys.readouterr().out).contains("command: ConfigureScan")
+    assert_that(main([history.path, "--git-sha", "sha2"])).is_equal_to(0)
+
+
+def test_recorder_hook(tmp_path):
+    """
+    Test recorder buffers records of recorded observations only, keyed by
+    device class, command and test ID.
+    """
+    with LatencyHistory(tmp_path / "history.sqlite") as history:
+        recorder = LatencyRecorder(history, git_sha="sha1", flush_every=10)
+        observer = AssertiveLoggingObserver(
+            AssertiveLoggingObserverMode.REPORTING,
+            logging.getLogger(__name__),
+            use_event_tracer=False,
+        )
+        observer.add_hook(recorder)
+        observer.observe_true(True)
+        context = ObservationContext(
+            "observe_lrc_ok",
+            10.0,
+            {"device": "mid_csp_cbf/fsp/01", "command": "ConfigureScan"},
+        )
+        context.end_sec, context.passed = 12.5, True
+        recorder.on_observation_end(context)
+
+        assert_that(history.git_shas()).is_empty()
+        recorder.close()
+        assert_that(history.durations(["sha1"])).is_equal_to(
+            {("observe_lrc_ok", "fsp", "ConfigureScan"): [2.5]}
+        )
+
+
+def test_recorder_device_latency(tmp_path):
+    """
+    Test recorder records latencies from LRC submission or observation start
+    to reception of the matched event, and skips observations satisfied by
+    events received before they started.
+    """
+    fsp = "mid_csp_cbf/fsp/01"
+    with LatencyHistory(tmp_path / "history.sqlite") as history:
+        recorder = LatencyRecorder(history, git_sha="sha1")
+
+        def observe(function_name, args, reception_time):
+            context = ObservationContext(function_name, 10.0, args)
+            recorder.on_event_matched(
+                context,
+                EventRecord(fsp, "obsState", "READY", reception_time),
+            )
+            context.end_sec, context.passed = 12.5, True
+            recorder.on_observation_end(context)
+
+        lrc_args = {"device": fsp, "command": "Scan"}
+        # Result received before the observation started
+        observe(
+            "observe_lrc_ok", {**lrc_args, "command_id": "9.0_1_Scan"}, 9.5
+        )
+        observe(
+            "observe_lrc_ok", {**lrc_args, "command_id": "9.0_2_Scan"}, 11.0
+        )
+        # Result not received within the timeout of the observation
+        context = ObservationContext(
+            "observe_lrc_ok",
+            10.0,
+            {**lrc_args, "command_id": "9.0_3_Scan", "timeout_sec": 2.5},
+        )
+        context.end_sec, context.passed = 12.5, False
+        recorder.on_observation_end(context)
+        attr_args = {"device": fsp, "attr": "obsState"}
+        observe("observe_device_attr_change", attr_args, 9.5)
+        observe("observe_device_attr_change", attr_args, 10.25)
+        recorder.close()
+
+        assert_that(history.durations(["sha1"])).is_equal_to(
+            {
+                ("observe_lrc_ok", "fsp", "Scan"): [0.5, 2.0],
+                ("observe_device_attr_change", "fsp", "obsState"): [0.25],
+            }
+        )
+        assert_that(
+            history.durations(["sha1"], timed_out=True)
+        ).contains_entry({("observe_lrc_ok", "fsp", "Scan"): [0.5, 2.0, 3.5]})
+        assert_that(history.timed_out_counts(["sha1"])).is_equal_to(
+            {("observe_lrc_ok", "fsp", "Scan"): 1}
+        )
+
+
+def test_device_family():
+    """Test device class defaults to the Tango family of the FQDN."""
+    assert_that(device_family("mid_csp_cbf/FSP/01")).is_equal_to("fsp")
+    assert_that(
+        device_family("tango://host:10000/mid_csp_cbf/vcc/001")
+    ).is_equal_to("vcc")
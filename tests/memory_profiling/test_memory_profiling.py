@@ -0,0 +1,194 @@
+"""
+Test the MemoryProfiler hook and the memory_profiling pytest plugin.
+"""
+
+from __future__ import annotations
+
+import logging
+import tracemalloc
+
+from assertpy import assert_that
+
+from ska_mid_cbf_common_test_infrastructure.assertive_logging_observer import (
+    AssertiveLoggingObserver,
+    AssertiveLoggingObserverMode,
+    EventRecord,
+    EventStore,
+)
+from ska_mid_cbf_common_test_infrastructure.memory_profiling import (
+    CALLER_CATEGORY,
+    FORMATTING_CATEGORY,
+    MemoryProfiler,
+)
+
+pytest_plugins = ["pytester"]
+
+PLUGIN = "ska_mid_cbf_common_test_infrastructure.memory_profiling.plugin"
+
+SUITE = """
+import logging
+
+from ska_mid_cbf_common_test_infrastructure.assertive_logging_observer import (
+    AssertiveLoggingObserver,
+    AssertiveLoggingObserverMode,
+)
+
+LEAK = []
+
+def test_leak():
+    LEAK.extend(bytearray(1000) for _ in range(1000))
+
+def test_observe(memory_profiler):
+    observer = AssertiveLoggingObserver(
+        AssertiveLoggingObserverMode.REPORTING,
+        logging.getLogger(__name__),
+        use_event_tracer=False,
+    )
+    observer.add_hook(memory_profiler)
+    for _ in range(4):
+        observer.observe_true(True)
+"""
+
+
+def test_growth_attributed_to_categories():
+    """
+    Test growth of event storage, i.e. the list of records, and caller
+    code, i.e. records created by the test, are reported apart.
+    """
+    profiler = MemoryProfiler()
+    profiler.start()
+    try:
+        store = EventStore()
+        store.extend(
+            EventRecord("mid_csp_cbf/fsp/01", "obsState", index, float(index))
+            for index in range(20000)
+        )
+        leak = [bytearray(100) for _ in range(10000)]
+        checkpoint = profiler.checkpoint("leaked")
+    finally:
+        profiler.stop()
+
+    first = profiler.checkpoints[0]
+    assert_that(
+        checkpoint.category_bytes["event storage"]
+        - first.category_bytes["event storage"]
+    ).is_greater_than(20000 * 8)
+    assert_that(
+        checkpoint.category_bytes[CALLER_CATEGORY]
+        - first.category_bytes[CALLER_CATEGORY]
+    ).is_greater_than(len(leak) * 100)
+    assert_that(tracemalloc.is_tracing()).is_false()
+
+    report = profiler.report(top_n=5)
+    assert_that(report).contains("'stop' since 'start'", "Top 5 differences")
+    assert_that(report).matches(r"\[event storage\] .*event_store\.py:\d+")
+    assert_that(report).matches(r"\[caller\] .*test_memory_profiling\.py")
+
+
+def test_log_messages_attributed_to_formatting():
+    """
+    Test retained f-string log messages of the observer are attributed to
+    message formatting rather than other observer internals with frames=1.
+    """
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger = logging.getLogger(f"{__name__}.messages")
+    logger.addHandler(handler)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    observer = AssertiveLoggingObserver(
+        AssertiveLoggingObserverMode.REPORTING,
+        logger,
+        use_event_tracer=False,
+    )
+    records.clear()
+
+    profiler = MemoryProfiler(frames=1)
+    profiler.start()
+    try:
+        for index in range(2000):
+            observer.observe_equality(index, index)
+        checkpoint = profiler.checkpoint("logged")
+    finally:
+        profiler.stop()
+        logger.removeHandler(handler)
+
+    first = profiler.checkpoints[0]
+    growth = {
+        category: size - first.category_bytes[category]
+        for category, size in checkpoint.category_bytes.items()
+    }
+    assert_that(records).is_length(2000)
+    # Each message is a str of more than 50 characters
+    assert_that(growth[FORMATTING_CATEGORY]).is_greater_than(2000 * 50)
+    assert_that(growth["alo other"]).is_less_than(
+        growth[FORMATTING_CATEGORY] // 10
+    )
+
+
+def test_snapshot_taken_without_lock(monkeypatch):
+    """Test observers are not blocked while a snapshot is taken."""
+    profiler = MemoryProfiler()
+    take_snapshot = tracemalloc.take_snapshot
+    locked = []
+
+    def checked_take_snapshot():
+        locked.append(profiler._lock.locked())
+        return take_snapshot()
+
+    monkeypatch.setattr(tracemalloc, "take_snapshot", checked_take_snapshot)
+    profiler.start()
+    profiler.stop()
+
+    assert_that(locked).is_equal_to([False, False])
+    assert_that(profiler.checkpoints).is_length(2)
+
+
+def test_observation_sampling():
+    """Test every nth observation end is snapshotted while started."""
+    profiler = MemoryProfiler(observation_sample_every=2)
+    observer = AssertiveLoggingObserver(
+        AssertiveLoggingObserverMode.REPORTING,
+        logging.getLogger(__name__),
+        use_event_tracer=False,
+    )
+    observer.add_hook(profiler)
+    observer.observe_true(True)
+    assert_that(profiler.checkpoints).is_empty()
+
+    profiler.start()
+    for _ in range(5):
+        observer.observe_true(True)
+    profiler.stop()
+
+    assert_that([c.label for c in profiler.checkpoints]).is_equal_to(
+        ["start", "observe_true", "observe_true", "stop"]
+    )
+
+
+def test_plugin_report(pytester):
+    """Test the plugin reports growth of a leaking test at teardown."""
+    pytester.makepyfile(test_suite=SUITE)
+    report_path = pytester.path / "memory_report.txt"
+    result = pytester.runpytest(
+        "-p",
+        PLUGIN,
+        "--cti-memory-report",
+        str(report_path),
+        "--cti-memory-sample-observations",
+        "2",
+    )
+    result.assert_outcomes(passed=2)
+    result.stdout.fnmatch_lines(
+        ["cti memory growth: *caller +*, report written to *"]
+    )
+
+    report = report_path.read_text()
+    assert_that(report).contains("checkpoints", "Growth by category:")
+    assert_that(report).matches(r"\[caller\] .*test_suite\.py:\d+")
+    assert_that(tracemalloc.is_tracing()).is_false()
+
+    result = pytester.runpytest("-p", PLUGIN)
+    result.assert_outcomes(passed=2)
+    assert_that(result.stdout.str()).does_not_contain("cti memory")
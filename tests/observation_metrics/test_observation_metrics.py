@@ -0,0 +1,155 @@
+"""
+Test ObservationMetrics collection and OpenMetricsExporter exports.
+"""
+
+from __future__ import annotations
+
+import http.server
+import logging
+import threading
+import time
+
+from assertpy import assert_that
+
+from ska_mid_cbf_common_test_infrastructure.assertive_logging_observer import (
+    AssertiveLoggingObserver,
+    AssertiveLoggingObserverMode,
+    EventRecord,
+    ObservationContext,
+)
+from ska_mid_cbf_common_test_infrastructure.observation_metrics import (
+    ObservationMetrics,
+    OpenMetricsExporter,
+)
+
+
+def make_context(function_name, duration_sec, passed, **args):
+    """Make context of an ended observation."""
+    context = ObservationContext(function_name, 100.0, args)
+    context.end_sec = 100.0 + duration_sec
+    context.passed = passed
+    return context
+
+
+def test_render_openmetrics():
+    """
+    Test observations and change events are rendered as OpenMetrics counters
+    and cumulative histograms with constant labels.
+    """
+    metrics = ObservationMetrics({"release": "1.0.0"}, buckets_sec=(1, 10))
+    metrics.on_observation_end(
+        make_context("observe_lrc_ok", 2.0, True, command="ConfigureScan")
+    )
+    metrics.on_observation_end(make_context("observe_true", 0.0, False))
+    metrics.on_observation_end(make_context("observe_true", 20.0, True))
+    metrics.record_change_event("mid/fsp/1", "obsState", 2)
+    metrics.record_change_event("mid/fsp/1", "obsState", 3)
+
+    lines = metrics.render().splitlines()
+
+    assert_that(lines).contains(
+        "# TYPE cti_observations counter",
+        'cti_observations_total{release="1.0.0",observation="observe_true",'
+        'result="fail"} 1',
+        'cti_observation_duration_seconds_bucket{release="1.0.0",'
+        'observation="observe_true",le="1.0"} 1',
+        'cti_observation_duration_seconds_bucket{release="1.0.0",'
+        'observation="observe_true",le="10.0"} 1',
+        'cti_observation_duration_seconds_bucket{release="1.0.0",'
+        'observation="observe_true",le="+Inf"} 2',
+        'cti_observation_duration_seconds_sum{release="1.0.0",'
+        'observation="observe_true"} 20.0',
+        'cti_lrc_duration_seconds_count{release="1.0.0",'
+        'command="ConfigureScan",result="pass"} 1',
+        'cti_change_events_total{release="1.0.0",device="mid/fsp/1",'
+        'attribute="obsState"} 2',
+    )
+    assert_that(lines[-1]).is_equal_to("# EOF")
+    assert_that(metrics.render(openmetrics=False)).contains(
+        "# TYPE cti_observations_total counter"
+    ).does_not_contain("# EOF")
+
+
+def test_lrc_duration_of_stored_result(make_observer):
+    """
+    Test LRC durations run from submission to reception of the result, also
+    when the result was received before the observation started.
+    """
+    metrics = ObservationMetrics(buckets_sec=(1, 10))
+    observer = make_observer()
+    observer.add_hook(metrics)
+    submitted_sec = round(time.time()) - 5.0
+    command_id = f"{submitted_sec}_1_Scan"
+    observer.event_tracer.store.append(
+        EventRecord(
+            "mid/fsp/1",
+            "longRunningCommandResult",
+            (command_id, '[0, "Scan completed OK"]'),
+            submitted_sec + 2.0,
+        )
+    )
+    observer.observe_lrc_ok("mid/fsp/1", ([0], [command_id]), "Scan", 1)
+
+    assert_that(metrics.render().splitlines()).contains(
+        'cti_lrc_duration_seconds_bucket{command="Scan",result="pass",'
+        'le="1.0"} 0',
+        'cti_lrc_duration_seconds_sum{command="Scan",result="pass"} 2.0',
+    )
+
+
+def test_export_file_on_close(tmp_path):
+    """Test metrics of an attached observer are exported on close."""
+    metrics = ObservationMetrics()
+    observer = AssertiveLoggingObserver(
+        AssertiveLoggingObserverMode.REPORTING,
+        logging.getLogger(__name__),
+        use_event_tracer=False,
+    )
+    metrics.attach(observer)
+    path = tmp_path / "cti.prom"
+
+    with OpenMetricsExporter(metrics, path=path, interval_sec=60):
+        observer.observe_equality(1, 1)
+
+    assert_that(path.read_text(encoding="utf-8")).contains(
+        'cti_observations_total{observation="observe_equality",'
+        'result="pass"} 1'
+    )
+    assert_that(list(tmp_path.iterdir())).is_length(1)
+
+
+def test_push_to_gateway():
+    """Test metrics are pushed to the pushgateway URL of the job."""
+    pushes = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        """Pushgateway recording pushes."""
+
+        def do_PUT(self):  # pylint: disable=invalid-name
+            """Record push."""
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            pushes.append((self.path, body.decode()))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):  # pylint: disable=arguments-differ
+            """Do not log requests."""
+
+    server = http.server.HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        exporter = OpenMetricsExporter(
+            ObservationMetrics(),
+            push_url=f"http://127.0.0.1:{server.server_port}/",
+            job="nightly",
+            grouping_labels={"instance": "run 1"},
+        )
+        exporter.export()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert_that(pushes).is_length(1)
+    path, body = pushes[0]
+    assert_that(path).is_equal_to("/metrics/job/nightly/instance/run%201")
+    assert_that(body).contains("# TYPE cti_observations_total counter")
@@ -0,0 +1,122 @@
+"""
+Test DataStore memory mapped views of data files and manifest checks.
+"""
+
+from __future__ import annotations
+
+import pytest
+from assertpy import assert_that
+
+from ska_mid_cbf_common_test_infrastructure.test_data import (
+    DataIntegrityError,
+    DataStore,
+    file_digest,
+    read_manifest,
+    write_manifest,
+)
+from ska_mid_cbf_common_test_infrastructure.test_data.__main__ import main
+
+
+@pytest.fixture(name="data_dir")
+def fixture_data_dir(tmp_path):
+    """Data directory of raw and empty files with a manifest."""
+    (tmp_path / "golden").mkdir()
+    (tmp_path / "golden" / "raw.bin").write_bytes(bytes(range(12)))
+    (tmp_path / "golden" / "other.bin").write_bytes(b"other")
+    (tmp_path / "empty.bin").write_bytes(b"")
+    (tmp_path / "README.md").write_text("Not data")
+    write_manifest(tmp_path)
+    return tmp_path
+
+
+def test_manifest(data_dir):
+    """Test manifest records digests and sizes of data files only."""
+    files = read_manifest(data_dir)["files"]
+
+    assert_that(sorted(files)).is_equal_to(
+        ["empty.bin", "golden/other.bin", "golden/raw.bin"]
+    )
+    assert_that(files["golden/raw.bin"]).is_equal_to(
+        {"sha256": file_digest(data_dir / "golden/raw.bin"), "size": 12}
+    )
+
+
+def test_bytes_by_path_and_digest(data_dir):
+    """Test files are addressed by path, digest or digest prefix."""
+    store = DataStore(data_dir)
+    digest = store.digest("golden/raw.bin")
+
+    view = store.bytes("golden/raw.bin")
+    assert_that(bytes(view)).is_equal_to(bytes(range(12)))
+    assert_that(view.readonly).is_true()
+    assert_that(bytes(store.bytes(digest[:8]))).is_equal_to(bytes(view))
+    assert_that(store.path(digest)).is_equal_to(data_dir / "golden/raw.bin")
+    assert_that(bytes(store.bytes("empty.bin"))).is_equal_to(b"")
+    with pytest.raises(KeyError):
+        store.bytes("golden/missing.bin")
+
+
+def test_arrays(data_dir):
+    """Test .npy and raw files are viewed as read only arrays."""
+    numpy = pytest.importorskip("numpy")
+    expected = numpy.arange(6, dtype=numpy.complex64).reshape(2, 3)
+    numpy.save(data_dir / "golden" / "c.npy", expected)
+    numpy.save(data_dir / "golden" / "f.npy", numpy.asfortranarray(expected))
+    write_manifest(data_dir)
+    store = DataStore(data_dir)
+
+    for name in ("golden/c.npy", "golden/f.npy"):
+        array = store.array(name)
+        numpy.testing.assert_array_equal(array, expected)
+        assert_that(array.flags.writeable).is_false()
+    numpy.testing.assert_array_equal(
+        store.array("golden/raw.bin", dtype=numpy.uint16, shape=(2, 3)),
+        numpy.frombuffer(bytes(range(12)), numpy.uint16).reshape(2, 3),
+    )
+
+
+def test_lru_of_open_maps(data_dir):
+    """Test least recently used maps are evicted, keeping views valid."""
+    store = DataStore(data_dir, max_open_maps=1)
+    view = store.bytes("golden/raw.bin")
+    store.bytes("golden/other.bin")
+
+    assert_that(store.open_maps).is_equal_to(1)
+    assert_that(bytes(view)).is_equal_to(bytes(range(12)))
+
+
+def test_integrity(data_dir):
+    """Test changed files fail size checks, digest checks and verify."""
+    (data_dir / "golden" / "raw.bin").write_bytes(bytes(13))
+    (data_dir / "golden" / "other.bin").write_bytes(b"OTHER")
+    (data_dir / "golden" / "new.bin").write_bytes(b"new")
+
+    with pytest.raises(DataIntegrityError, match="13 bytes"):
+        DataStore(data_dir).bytes("golden/raw.bin")
+    assert_that(
+        bytes(DataStore(data_dir).bytes("golden/other.bin"))
+    ).is_equal_to(b"OTHER")
+    with pytest.raises(DataIntegrityError, match="digest"):
+        DataStore(data_dir, verify_on_open=True).bytes("golden/other.bin")
+    assert_that(DataStore(data_dir).verify()).is_equal_to(
+        [
+            "golden/new.bin is not in the manifest",
+            "golden/other.bin does not match its manifest digest",
+            "golden/raw.bin does not match its manifest digest",
+        ]
+    )
+    assert_that(main(["verify", "--data-dir", str(data_dir)])).is_equal_to(1)
+    assert_that(main(["update", "--data-dir", str(data_dir)])).is_equal_to(0)
+    assert_that(main(["verify", "--data-dir", str(data_dir)])).is_equal_to(0)
+
+
+def test_cti_data_manifest_up_to_date():
+    """
+    Test the CTI data directory shipped with the package matches its
+    manifest.
+    """
+    store = DataStore()
+    assert_that(store.verify()).is_empty()
+    assert_that(str(store.path("schemas/example_payload.json"))).contains(
+        "ska_mid_cbf_common_test_infrastructure"
+    )
@@ -0,0 +1,85 @@
+"""
+Test CompressedRotatingFileHandler rotation, compression and time range
+extraction.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from assertpy import assert_that
+
+from ska_mid_cbf_common_test_infrastructure.test_logging.rotating_sink import (
+    INDEX_SUFFIX,
+    CompressedRotatingFileHandler,
+    extract_time_range,
+)
+
+
+def _log_records(
+    handler: logging.Handler, count: int, start_sec: float
+) -> None:
+    """Emit count records to handler one second apart from start_sec."""
+    for index in range(count):
+        record = logging.LogRecord(
+            __name__, logging.INFO, __file__, 0, f"record {index}", None, None
+        )
+        record.created = start_sec + index
+        handler.handle(record)
+
+
+def test_rotation_and_compression(tmp_path):
+    """
+    Test segments are rotated by size, compressed with an index and the
+    uncompressed segments removed once the handler is closed.
+    """
+    base_path = tmp_path / "soak"
+    handler = CompressedRotatingFileHandler(
+        base_path, max_bytes=2000, block_bytes=500
+    )
+    _log_records(handler, 100, 1000.0)
+    handler.close()
+
+    compressed = sorted(tmp_path.glob("soak.*.log.gz"))
+    assert_that(len(compressed)).is_greater_than(1)
+    assert_that(list(tmp_path.glob("soak.*.log"))).is_empty()
+    for path in compressed:
+        assert_that(
+            (tmp_path / f"{path.name}{INDEX_SUFFIX}").exists()
+        ).is_true()
+
+    lines = list(extract_time_range(base_path, 0, 2000))
+    assert_that(lines).is_length(100)
+    assert_that(lines[-1]).ends_with("record 99")
+
+
+def test_rotation_by_time(tmp_path):
+    """
+    Test segments are rotated once older than interval_sec.
+    """
+    base_path = tmp_path / "timed"
+    handler = CompressedRotatingFileHandler(
+        base_path, max_bytes=None, interval_sec=0
+    )
+    _log_records(handler, 3, 0.0)
+    handler.close()
+
+    assert_that(list(tmp_path.glob("timed.*.log.gz"))).is_length(3)
+
+
+def test_extract_time_range_reads_overlapping_blocks(tmp_path):
+    """
+    Test extract_time_range only returns lines of blocks overlapping the
+    requested time range.
+    """
+    base_path = tmp_path / "range"
+    handler = CompressedRotatingFileHandler(
+        base_path, max_bytes=None, block_bytes=1
+    )
+    _log_records(handler, 50, 1000.0)
+    handler.close()
+
+    lines = list(extract_time_range(base_path, 1010.0, 1012.0))
+    assert_that([line.split("] ")[-1] for line in lines]).is_equal_to(
+        ["record 10", "record 11", "record 12"]
+    )
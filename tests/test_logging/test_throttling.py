@@ -0,0 +1,121 @@
+"""
+Test ThrottlingFilter rate limiting and sampling of log records.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from assertpy import assert_that
+
+from ska_mid_cbf_common_test_infrastructure.test_logging.formatting import (
+    setup_logger,
+)
+from ska_mid_cbf_common_test_infrastructure.test_logging.throttling import (
+    ThrottlingFilter,
+)
+
+
+def test_rate_limit_keeps_warnings_and_fail(caplog):
+    """
+    Test INFO records beyond the burst are suppressed while WARNING+ and FAIL
+    records are always kept, and suppressed records are summarized.
+    """
+    throttle = ThrottlingFilter(
+        rate_per_sec=0.001, burst=3, summary_interval_sec=3600
+    )
+    logger = setup_logger(
+        logging.getLogger(f"{__name__}.rate"), log_filter=throttle
+    )
+
+    with caplog.at_level(logging.INFO, logger=logger.name):
+        for index in range(10):
+            logger.info(f"PASS: {index}")
+        logger.info("FAIL: always kept")
+        logger.warning("always kept")
+        assert_that([r.getMessage() for r in caplog.records]).is_equal_to(
+            [
+                "PASS: 0",
+                "PASS: 1",
+                "PASS: 2",
+                "FAIL: always kept",
+                "always kept",
+            ]
+        )
+        assert_that(throttle.suppressed_count).is_equal_to(7)
+
+        throttle.flush_summary(logger)
+        assert_that(caplog.records[-1].getMessage()).starts_with(
+            "7 messages suppressed"
+        )
+        assert_that(throttle.suppressed_count).is_equal_to(0)
+
+    logger.removeFilter(throttle)
+
+
+def test_rate_limit_per_message(caplog):
+    """
+    Test per_message rate limiting limits each distinct message separately.
+    """
+    throttle = ThrottlingFilter(
+        rate_per_sec=0.001,
+        burst=1,
+        per_message=True,
+        summary_interval_sec=3600,
+    )
+    logger = logging.getLogger(f"{__name__}.per_message")
+    logger.addFilter(throttle)
+
+    with caplog.at_level(logging.INFO, logger=logger.name):
+        for _ in range(3):
+            logger.info("a")
+            logger.info("b")
+        assert_that([r.getMessage() for r in caplog.records]).is_equal_to(
+            ["a", "b"]
+        )
+
+
+def test_rate_limit_per_message_bounded(caplog):
+    """
+    Test per_message buckets are bounded, forgetting the least recently
+    seen message first.
+    """
+    throttle = ThrottlingFilter(
+        rate_per_sec=0.001,
+        burst=1,
+        per_message=True,
+        summary_interval_sec=3600,
+        max_buckets=2,
+    )
+    logger = logging.getLogger(f"{__name__}.bounded")
+    logger.addFilter(throttle)
+
+    with caplog.at_level(logging.INFO, logger=logger.name):
+        for message in ["a", "b", "a", "c", "a", "b"]:
+            logger.info(message)
+        for index in range(1000):
+            logger.info(f"PASS: {index}")
+        assert_that([r.getMessage() for r in caplog.records][:5]).is_equal_to(
+            ["a", "b", "c", "b", "PASS: 0"]
+        )
+
+
+def test_sampling_and_periodic_summary(caplog):
+    """
+    Test INFO records are sampled at roughly sample_rate and a summary is
+    emitted once summary_interval_sec has elapsed.
+    """
+    throttle = ThrottlingFilter(
+        sample_rate=0.25, summary_interval_sec=0, seed=1234
+    )
+    logger = logging.getLogger(f"{__name__}.sampling")
+    logger.addFilter(throttle)
+
+    with caplog.at_level(logging.INFO, logger=logger.name):
+        for index in range(1000):
+            logger.info(f"PASS: {index}")
+
+    kept = [r for r in caplog.records if r.getMessage().startswith("PASS")]
+    summaries = [r for r in caplog.records if "suppressed" in r.getMessage()]
+    assert_that(len(kept)).is_between(150, 350)
+    assert_that(summaries).is_not_empty()
@@ -0,0 +1,136 @@
+"""
+Test LPT scheduling, duration files and the test_sharding pytest plugin.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+
+import pytest
+from assertpy import assert_that
+
+from ska_mid_cbf_common_test_infrastructure.assertive_logging_observer import (
+    AssertiveLoggingObserver,
+    AssertiveLoggingObserverMode,
+)
+from ska_mid_cbf_common_test_infrastructure.test_sharding import (
+    AloWaitTimer,
+    ShardDurations,
+    lpt_schedule,
+)
+
+pytest_plugins = ["pytester"]
+
+PLUGIN = "ska_mid_cbf_common_test_infrastructure.test_sharding.plugin"
+
+SUITE = """
+import time
+
+def test_long():
+    time.sleep(0.3)
+
+def test_medium():
+    time.sleep(0.2)
+
+def test_short_1():
+    pass
+
+def test_short_2():
+    pass
+
+def test_alo_wait(alo_wait_timer):
+    pass
+"""
+
+
+def test_lpt_schedule():
+    """Test longest tests are spread over shards in collection order."""
+    assert_that(lpt_schedule([1, 5, 2, 4, 3, 3], 2)).is_equal_to(
+        [[0, 1, 5], [2, 3, 4]]
+    )
+    assert_that(lpt_schedule([1, 2], 3)).is_equal_to([[1], [0], []])
+    with pytest.raises(ValueError):
+        lpt_schedule([1], 0)
+
+
+def test_durations_merge_and_average(tmp_path):
+    """Test files merge by most recent update and durations average."""
+    first, second = tmp_path / "first.json", tmp_path / "second.json"
+    durations = ShardDurations()
+    durations.update("test_a", 10.0, 8.0, updated_at=1)
+    durations.update("test_b", 2.0, updated_at=1)
+    durations.save(first)
+    durations.update("test_a", 20.0, 4.0, updated_at=2)
+    durations.save(second)
+
+    merged = ShardDurations.load([first, second, tmp_path / "missing.json"])
+    assert_that(merged.tests["test_a"]).is_equal_to(
+        {"duration_sec": 15.0, "alo_wait_sec": 6.0, "updated_at": 2}
+    )
+    assert_that(
+        merged.expected_sec(["test_a", "test_b", "test_new"])
+    ).is_equal_to([15.0, 2.0, 8.5])
+    assert_that(ShardDurations().expected_sec(["test_new"])).is_equal_to([1.0])
+
+
+def test_alo_wait_timer(monkeypatch):
+    """Test observation durations are accumulated per running test."""
+    timer = AloWaitTimer()
+    observer = AssertiveLoggingObserver(
+        AssertiveLoggingObserverMode.REPORTING,
+        logging.getLogger(__name__),
+        use_event_tracer=False,
+    )
+    observer.add_hook(timer)
+    monkeypatch.setenv("PYTEST_CURRENT_TEST", "tests/test_a.py::test (call)")
+    observer.observe_true(True)
+    observer.observe_true(True)
+
+    assert_that(timer.pop("tests/test_a.py::test")).is_greater_than(0.0)
+    assert_that(timer.pop("tests/test_a.py::test")).is_equal_to(0.0)
+
+
+def test_plugin_shards(pytester):
+    """Test shards run disjoint tests balanced by stored durations."""
+    pytester.makepyfile(test_suite=SUITE)
+    durations_path = pytester.path / "durations.json"
+    result = pytester.runpytest(
+        "-p", PLUGIN, "--cti-store-durations", str(durations_path)
+    )
+    result.assert_outcomes(passed=5)
+
+    stored = json.loads(durations_path.read_text())["tests"]
+    assert_that(stored).is_length(5)
+    assert_that(
+        stored["test_suite.py::test_long"]["duration_sec"]
+    ).is_greater_than(0.25)
+
+    for shard_index, tests in enumerate(
+        [["test_long"], ["test_medium", "test_short"]]
+    ):
+        result = pytester.runpytest(
+            "-p",
+            PLUGIN,
+            "-v",
+            "--cti-durations",
+            str(durations_path),
+            "--cti-shards",
+            "2",
+            "--cti-shard-index",
+            str(shard_index),
+        )
+        result.stdout.fnmatch_lines([f"cti shard {shard_index + 1}/2: *"])
+        passed = result.parseoutcomes()["passed"]
+        assert_that(passed).is_equal_to(1 if shard_index == 0 else 4)
+        for test in tests:
+            result.stdout.fnmatch_lines([f"*::{test}* PASSED*"])
+
+
+def test_plugin_invalid_shard(pytester):
+    """Test invalid shard options are usage errors."""
+    pytester.makepyfile(test_suite=SUITE)
+    result = pytester.runpytest(
+        "-p", PLUGIN, "--cti-shards", "2", "--cti-shard-index", "2"
+    )
+    assert_that(result.ret).is_equal_to(pytest.ExitCode.USAGE_ERROR)